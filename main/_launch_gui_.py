@@ -18,6 +18,8 @@ import Tkinter, ttk
 import gui_components.event_handlers as event_handlers
 import gui_components.update_gui as update_gui
 import external_devices._navigation_management_system_ as _navigation_management_system_
+import external_devices.shared_telemetry as shared_telemetry
+import external_devices.gui_commands as gui_commands
 import gui_components.mission_selector_system as mission_selector_system
 import ctypes
 import gui_components.previous_state_logging_system as previous_state_logging_system
@@ -743,6 +745,8 @@ class GuiCreation:
         '''   
         self.parent_conn = parent_conn
         self.process = process
+        self.telemetryBlock = None #Shared memory the NMS process publishes its data to
+        self.commandPublisher = None #Sends GUI commands to the NMS process when they change
         
     def setQuitFlag(self):
         '''
@@ -774,8 +778,8 @@ class GuiCreation:
         
     def updateGUI(self, window):
         '''
-        Sends and receives data from the internal_navigation_system process through the pipe, updates the GUI accordingly and prevents the GUI from
-        getting stuck.
+        Reads the latest data the internal_navigation_system process published to shared memory, sends it any commands that changed through the
+        pipe, updates the GUI accordingly and prevents the GUI from getting stuck. Never waits on the internal_navigation_system process.
         
         **Parameters**: \n
         * **window** - The main TKinter program window.
@@ -796,7 +800,8 @@ class GuiCreation:
             if not window.DEBUG:
                 mainProcessReadyFlag, turnOffDirtyPower = True, True
                 
-                self.parent_conn.send([mainProcessReadyFlag, window.startVehicle, turnOffDirtyPower, window.manualModeEnabled, None, None, setWaypointToggle, removeWaypointToggle, window.resetDVL, pidSliderValues])
+                self.commandPublisher.publish([mainProcessReadyFlag, window.startVehicle, turnOffDirtyPower, window.manualModeEnabled, None, None, setWaypointToggle, removeWaypointToggle, window.resetDVL, pidSliderValues], True)
+                print "GUI commands:", self.commandPublisher.stats(), "telemetry:", self.telemetryBlock.stats()
     
         else:
             missionSelectorData, imageProcValues = GUI.run()
@@ -809,29 +814,30 @@ class GuiCreation:
                 window.sendMissionSelectorData = False #Makes it so I dont keep sending mission selector data through pipe (only need it once)
                 
             if not window.DEBUG:
+                externalDevicesData = self.telemetryBlock.readNew() #Newest snapshot, or None if the NMS process hasn't published since the last update
+                if externalDevicesData != None:
+                    window.externalDevicesData = externalDevicesData
+                    
+                    #WAYPOINT CREATION 
+                    if window.externalDevicesData[7] == True and setWaypointToggle == False: #if setWaypoint is true and waypointtoggle is false
+                        setWaypointToggle = True
+                        dvlPositionData, orientationData, depth = window.externalDevicesData[5][0], window.externalDevicesData[1], window.externalDevicesData[0][2]
+                        createWaypoint(dvlPositionData, orientationData, depth)
+                        
+                    #WAYPOINT REMOVAL
+                    if window.externalDevicesData[8] == True and removeWaypointToggle == False:#if removeWaypoint is true and removewaypoint toggle is false
+                        removeWaypointToggle = True
+                        removeWaypoint()
+                        
                 mainProcessReadyFlag, turnOffDirtyPower = True, False
                 
-                self.parent_conn.send([mainProcessReadyFlag, window.startVehicle, turnOffDirtyPower, window.manualModeEnabled, missionSelectorData, imageProcValues, setWaypointToggle, removeWaypointToggle, window.resetDVL, pidSliderValues])
-                    
-                #if self.parent_conn.poll() == True: #If there is data to receive #WARNING: poll() sometimes skips a few thus making the graphic gauges off sync
-                window.externalDevicesData = self.parent_conn.recv() #Instead of checking if there is data in the pipe to get, waiting until there is data allows the graphic gauges to react faster to change, but the rest of the gui might slow down
+                self.commandPublisher.publish([mainProcessReadyFlag, window.startVehicle, turnOffDirtyPower, window.manualModeEnabled, missionSelectorData, imageProcValues, setWaypointToggle, removeWaypointToggle, window.resetDVL, pidSliderValues]) #Only sent if something changed
                    
-                #WAYPOINT CREATION 
-                if window.externalDevicesData[7] == True and setWaypointToggle == False: #if setWaypoint is true and waypointtoggle is false
-                    setWaypointToggle = True
-                    dvlPositionData, orientationData, depth = window.externalDevicesData[5][0], window.externalDevicesData[1], window.externalDevicesData[0][2]
-                    createWaypoint(dvlPositionData, orientationData, depth)
-                    
-                #WAYPOINT REMOVAL
-                if window.externalDevicesData[8] == True and removeWaypointToggle == False:#if removeWaypoint is true and removewaypoint toggle is false
-                    removeWaypointToggle = True
-                    removeWaypoint()
-                    
                 #DVL Reset Toggle
                 if window.resetDVL == True:#If a command to reset the DVL was sent, toggle it off
                     window.resetDVL = False
                     
-            window.after(0, func=lambda: self.updateGUI(window))
+            window.after(20, func=lambda: self.updateGUI(window)) #Telemetry is read without blocking now, so wait one navigation loop period (50 Hz) instead of spinning a core
         
     def guiSetup(self):
         '''
@@ -1865,10 +1871,13 @@ class GuiCreation:
         if not window.DEBUG:
             #START ALL EXTERNAL PROCESSES
             self.parent_conn, child_conn = multiprocessing.Pipe() 
-            self.process = multiprocessing.Process(target=NMS.start, args=(child_conn,))
+            telemetry = shared_telemetry.createSharedTelemetry() #NMS data comes back through shared memory, the pipe only carries commands to NMS
+            self.telemetryBlock = shared_telemetry.TelemetryBlock(telemetry)
+            self.commandPublisher = gui_commands.CommandPublisher(self.parent_conn)
+            self.process = multiprocessing.Process(target=NMS.start, args=(child_conn, telemetry))
             self.process.start()
             self.parent_conn.send(window.comPortList) #Tell NMS process all the COMs of each of the devices that are connected
-            initialData = self.parent_conn.recv()
+            initialData = self.telemetryBlock.waitForSnapshot()
         else:
             initialData = None
             
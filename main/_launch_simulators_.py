@@ -0,0 +1,118 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: _launch_simulators_
+   :synopsis: Runs the navigation process against simulated boards without the GUI.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Starts a pseudo-terminal simulator for every board and sensor, starts the navigation process pointed at them,
+              and stands in for the GUI side of the pipe so the whole stack can be load tested and profiled on a Linux or
+              Mac laptop. Run from the main folder like _launch_gui_.
+'''
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) #So "main." imports work when run from the main folder
+import external_devices._navigation_management_system_ as _navigation_management_system_
+import external_devices.shared_telemetry as shared_telemetry
+import external_devices.gui_commands as gui_commands
+import main.simulators.board_simulators as board_simulators
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def guiData(turnOffDirtyPower=False):
+    '''
+    Builds the command list the GUI publishes to the navigation process, with nothing changed by the user.
+
+    **Parameters**: \n
+    * **turnOffDirtyPower** - True to tell the navigation process the GUI was closed.
+
+    **Returns**: \n
+    * **guiData** - [mainProcessReadyFlag, startVehicle, turnOffDirtyPower, manualModeEnabled, missionSelectorData, imageProcValues, setWaypoint, removeWaypoint, resetDVL, pidSliderValues].\n
+    '''
+    return [True, False, turnOffDirtyPower, False, None, None, False, False, False, [0]*108]
+
+def printReport(simulators, telemetryCount, elapsedTime, nmsProcess):
+    '''
+    Prints how fast the navigation process is answering and what every simulator has seen.
+
+    **Parameters**: \n
+    * **simulators** - Dictionary from board_simulators.createSimulators.
+    * **telemetryCount** - Telemetry snapshots published by the navigation process during the interval.
+    * **elapsedTime** - Length of the interval in seconds.
+    * **nmsProcess** - psutil.Process for the navigation process, or None.
+
+    **Returns**: \n
+    * **No Return.**\n
+    '''
+    cpuUsage = ""
+    if nmsProcess != None:
+        cpuUsage = ", navigation process CPU %.1f%%" % nmsProcess.cpu_percent()
+    print "Telemetry %.1f/s%s" % (telemetryCount/elapsedTime, cpuUsage)
+    for name in sorted(simulators):
+        simulator = simulators[name]
+        print "    %-8s in %6d packets %8d bytes | out %6d packets %8d bytes (%d corrupted)" % (name, simulator.dataPacketsReceived, simulator.bytesReceived,
+                                                                                         simulator.dataPacketsSent, simulator.bytesSent, simulator.dataPacketsCorrupted)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the navigation process against simulated boards.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run for")
+    parser.add_argument("--rate-scale", type=float, default=1.0, help="Multiplies the DVL and DVL AHRS output rates")
+    parser.add_argument("--board-stream-rate", type=float, default=0, help="Unsolicited telemetry bursts per second from each STM32 board")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Largest random reply delay in seconds")
+    parser.add_argument("--corruption", type=float, default=0.0, help="Chance (0-1) of a bit flip in each sent data packet")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    parser.add_argument("--loop-rate", type=float, default=50, help="Rate in Hz the navigation loop runs at")
+    parser.add_argument("--report-interval", type=float, default=5, help="Seconds between reports")
+    args = parser.parse_args()
+
+    simulators = board_simulators.createSimulators(args.rate_scale, args.board_stream_rate, args.jitter, args.corruption, args.seed)
+    for simulator in simulators.values():
+        simulator.start()
+    comPortList = board_simulators.comPortMap(simulators)
+
+    NMS = _navigation_management_system_.NavigationManagementSystem()
+    NMS.loopRate = args.loop_rate
+    parent_conn, child_conn = multiprocessing.Pipe()
+    telemetry = shared_telemetry.createSharedTelemetry()
+    telemetryBlock = shared_telemetry.TelemetryBlock(telemetry)
+    commandPublisher = gui_commands.CommandPublisher(parent_conn)
+    process = multiprocessing.Process(target=NMS.start, args=(child_conn, telemetry))
+    process.start()
+    parent_conn.send(comPortList)
+    initialData = telemetryBlock.waitForSnapshot()
+
+    nmsProcess = None
+    if psutil != None:
+        nmsProcess = psutil.Process(process.pid)
+        nmsProcess.cpu_percent() #First call only sets the starting point
+
+    startTime = reportTime = time.time()
+    reportPublished = telemetryBlock.stats()["published"]
+    try:
+        while time.time() - startTime < args.duration and process.is_alive():
+            if telemetryBlock.readNew() == None:
+                time.sleep(0.001)
+            commandPublisher.publish(guiData()) #Only the first one is sent, nothing changes
+
+            if time.time() - reportTime >= args.report_interval:
+                published = telemetryBlock.stats()["published"]
+                printReport(simulators, published - reportPublished, time.time() - reportTime, nmsProcess)
+                reportTime, reportPublished = time.time(), published
+    except KeyboardInterrupt:
+        pass
+
+    if process.is_alive():
+        commandPublisher.publish(guiData(turnOffDirtyPower=True), True)
+        process.join(5)
+    printReport(simulators, telemetryBlock.stats()["published"] - reportPublished, max(time.time() - reportTime, 1e-6), None)
+    print "GUI commands:", commandPublisher.stats(), "telemetry:", telemetryBlock.stats()
+    for simulator in simulators.values():
+        simulator.killThread()
@@ -20,6 +20,14 @@ import copy
 from main.external_devices import microcontroller_wcb
 import main.gui_components.previous_state_logging_system as previous_state_logging_system
 import inspect, kinematics
+import microcontroller_pmud
+import microcontroller_tcb
+import outbound_queue
+import fixed_rate_executive
+import shared_telemetry
+import gui_commands
+import orientation_voter
+import dvl
 from main.external_devices import callback_functions as CF
 from main.external_devices import IP_movement_algorithms
 
@@ -94,7 +102,7 @@ class NavigationManagementSystem():
         '''
         #For NMS
         self.runProcess = True
-        self.guiData = [True, None, None, None, None] #True initially. The size of self.guiData will dynamically update later in the code depending on how big the array is that the GUI side is sending over
+        self.guiData = gui_commands.emptyCommands() #Replaced by the GUI's command list as soon as the first message arrives
         self.missionSelectorData = None
         self.missions = None
         self.loggerIterationCounter = 0
@@ -112,22 +120,18 @@ class NavigationManagementSystem():
         self.ahrsData2 = [0, 0, 0]
         self.ahrsData3 = [0, 0, 0]
         self.ahrsDataMedian = [0, 0, 0]
+        self.ahrsDataSeq = [0, 0, 0] #Sequence number of the last sample read from each AHRS mailbox
+        self.ahrsTimestamps = [None, None, None] #When the last sample from each AHRS arrived
+        self.orientationVoter = orientation_voter.OrientationVoter(3) #Leaves out stale and disagreeing AHRS
         
         #For TCB
         self.thrusterPWMs = [0, 0, 0, 0, 0, 0, 0, 0]
-        self.tcb1Motor1Payload = [0, 0, 0]
-        self.tcb1Motor2Payload = [0, 0, 0]
-        self.tcb1Motor3Payload = [0, 0, 0]
-        self.tcb1Motor4Payload = [0, 0, 0]
-        self.tcb2Motor1Payload = [0, 0, 0]
-        self.tcb2Motor2Payload = [0, 0, 0]
-        self.tcb2Motor3Payload = [0, 0, 0]
-        self.tcb2Motor4Payload = [0, 0, 0]
-        self.thrusterPWMs = [0, 0, 0, 0, 0, 0, 0, 0]
+        self.tcbTelemetry = microcontroller_tcb.TCBTelemetryTable(2) #Desired PWM, actual PWM and hall effect sensor of all eight motors
         
         #For PMUD
         self.pmudGuiData = [0, 0]
         self.powerStatus = 0
+        self.previousPowerStatus = None #Power status the telemetry phase last saw, so missions are only reset when power goes off
         self.battery1 = [0, 0]
         self.battery2 = [0, 0]
         
@@ -140,6 +144,8 @@ class NavigationManagementSystem():
         self.externalPressure1, self.externalPressure2, self.externalPressure3 = 0, 0, 0
         self.internalDigitalHumidity1, self.internalDigitalHumidity2 = 0, 0
         
+        self.sibDataSeq = dict((frameID, 0) for frameID in range(106, 112)) #Sequence number of the last data packet read from each SIB mailbox
+        
         self.medianInternalAnalogTemp, self.medianInternalDigitalTemp, self.medianInternalAnalogPressure, self.medianInternalDigitalPressure, self.medianExternalDepth, self.medianInternalDigitalHumidity = 0, 0, 0, 0, 0, 0
         
         #For HYDRAS
@@ -170,89 +176,121 @@ class NavigationManagementSystem():
         self.desiredMissionOrientation = [False, 0, 0, 0, 0, 0, 0, 0]
         self.desiredMissionPosition = [False, 0, 0, 0]
         
+        self.loopRate = 50 #Hz the sense, estimate, plan, actuate and telemetry phases run at
+        
         #Main process ready flag
         self.mainProccessReady = True #This flag will be set true every time the main process is ready to receive more data from pipe.send
         
-    def start(self, pipe):
+    def start(self, pipe, telemetry):
         '''
         Communicates with the boards to accept sensor feedback, control the Sub's movement, and communicates with the GUI.
         
         **Parameters**: \n
-        * **pipe** - Child connection for Multiprocessing pipe.
+        * **pipe** - Child connection for Multiprocessing pipe. Carries the COM port list, then versioned GUI commands.
+        * **telemetry** - Shared TelemetryStruct from shared_telemetry.createSharedTelemetry, published to every cycle.
         
         **Returns**: \n
         * **No Return.**\n
         '''
-        import microcontroller_sib, microcontroller_pmud, microcontroller_tcb, microcontroller_hydras
+        import microcontroller_sib, microcontroller_tcb, microcontroller_hydras
         import dvl
         import sparton_ahrs
         import joystick_controller
         import movement
+        import serial_reactor
+        import polling_scheduler
 
         comPortList = pipe.recv() #First time a receive data from the pipe, its going to be com data
         print comPortList
         
         if useArduino:
             try:
-                self.arduinoCom = serial.Serial("COM53", 9600)
+                self.arduinoCom = serial.Serial(comPortList.get("ARDUINO", "COM53"), 9600)
             except:
                 self.arduinoCom = serial.Serial(comPortList["AUX"], 9600)
                 print "Arduino not Working!!!!!!!!!!"
         #else:
         #    self.arduinoCom = serial.Serial(comPortList["WCB"], 9600)
         
+        #All of the devices are serviced by one reactor thread that only wakes up when a port has data or a request is due
+        self.serialReactor = serial_reactor.SerialReactor()
+        self.pollingScheduler = polling_scheduler.PollingScheduler() #Board getters, each on its own period and staggered per port
+        self.serialReactor.registerScheduler(self.pollingScheduler)
+        self.outboundQueues = [] #Board ports are wrapped so commands are sent by priority with one write per flush
+        
         #Microcontroller initializing
-        PMUDComPort = serial.Serial(comPortList["PMUD"], 9600)
+        PMUDComPort = outbound_queue.OutboundQueue(serial.Serial(comPortList["PMUD"], 9600))
+        self.outboundQueues.append(PMUDComPort)
         self.pmudDataPackets = microcontroller_pmud.PMUDDataPackets(PMUDComPort)
         self.pmudResponseThread = microcontroller_pmud.PMUDResponse(PMUDComPort)
         self.pmudDataPackets.setPowerStatus(1) #Turns dirty power on (ONLY UNCOMMENT FOR DEBUGGING PURPOSES ONLY)
-        self.pmudResponseThread.start()
+        self.serialReactor.registerDevice(PMUDComPort, self.pmudResponseThread.handleData)
+        self.pollingScheduler.registerDevice(PMUDComPort, self.pmudResponseThread.pollingCommands("PMUD"))
         
-        DVLComPort = serial.Serial("COM21", 115200)
+        DVLComPort = serial.Serial(comPortList.get("DVL", "COM21"), 115200)
         self.dvlDataPackets = dvl.DVLDataPackets(DVLComPort)
         self.dvlResponseThread = dvl.DVLResponse(DVLComPort)
-        self.dvlResponseThread.start()
-        dvlAhrsComPort = serial.Serial("COM22", 38400)
+        self.serialReactor.registerDevice(DVLComPort, self.dvlResponseThread.handleData)
+        dvlAhrsComPort = serial.Serial(comPortList.get("DVLAHRS", "COM22"), 38400)
         self.dvlAhrsDummyThread = dvl.AHRSDummyCommunicator(dvlAhrsComPort)
-        self.dvlAhrsDummyThread.start()
+        self.serialReactor.registerDevice(dvlAhrsComPort, self.dvlAhrsDummyThread.handleData)
         
-        TCB1ComPort = serial.Serial(comPortList["TCB1"], 9600)
+        TCB1ComPort = outbound_queue.OutboundQueue(serial.Serial(comPortList["TCB1"], 9600))
+        self.outboundQueues.append(TCB1ComPort)
         self.tcb1DataPackets = microcontroller_tcb.TCBDataPackets(TCB1ComPort)
+        self.tcb1DataPackets.outputStage.setAllSupported = comPortList.get("TCBSETALL", False) #Only the simulated TCBs take all four motors in one data packet so far
         self.tcb1ResponseThread = microcontroller_tcb.TCBResponse(TCB1ComPort)
-        self.tcb1ResponseThread.start()
+        self.serialReactor.registerDevice(TCB1ComPort, self.tcb1ResponseThread.handleData)
+        self.pollingScheduler.registerDevice(TCB1ComPort, self.tcb1ResponseThread.pollingCommands("TCB1"))
         
-        TCB2ComPort = serial.Serial(comPortList["TCB2"], 9600)
+        TCB2ComPort = outbound_queue.OutboundQueue(serial.Serial(comPortList["TCB2"], 9600))
+        self.outboundQueues.append(TCB2ComPort)
         self.tcb2DataPackets = microcontroller_tcb.TCBDataPackets(TCB2ComPort)
+        self.tcb2DataPackets.outputStage.setAllSupported = comPortList.get("TCBSETALL", False) #Only the simulated TCBs take all four motors in one data packet so far
         self.tcb2ResponseThread = microcontroller_tcb.TCBResponse(TCB2ComPort)
-        self.tcb2ResponseThread.start()
+        self.serialReactor.registerDevice(TCB2ComPort, self.tcb2ResponseThread.handleData)
+        self.pollingScheduler.registerDevice(TCB2ComPort, self.tcb2ResponseThread.pollingCommands("TCB2"))
         
-        WCBComPort = serial.Serial(comPortList["WCB"], 9600)
+        WCBComPort = outbound_queue.OutboundQueue(serial.Serial(comPortList["WCB"], 9600))
+        self.outboundQueues.append(WCBComPort)
         #WCBComPort = serial.Serial("COM53", 9600)
         self.wcbDataPackets = microcontroller_wcb.WCBDataPackets(WCBComPort)
         self.wcbResponseThread = microcontroller_wcb.WCBResponse(WCBComPort)
-        self.wcbResponseThread.start()
+        self.serialReactor.registerDevice(WCBComPort, self.wcbResponseThread.handleData)
+        self.pollingScheduler.registerDevice(WCBComPort, self.wcbResponseThread.pollingCommands("WCB"))
 
-        SIBComPort = serial.Serial(comPortList["SIB"], 9600)
+        SIBComPort = outbound_queue.OutboundQueue(serial.Serial(comPortList["SIB"], 9600))
+        self.outboundQueues.append(SIBComPort)
         self.sibDataPackets = microcontroller_sib.SIBDataPackets(SIBComPort)
         self.sibResponseThread = microcontroller_sib.SIBResponse(SIBComPort)
-        self.sibResponseThread.start()
+        self.serialReactor.registerDevice(SIBComPort, self.sibResponseThread.handleData)
+        self.pollingScheduler.registerDevice(SIBComPort, self.sibResponseThread.pollingCommands("SIB"))
         
-        HYDRASComPort = serial.Serial(comPortList["HYDRAS"], 115200)
+        HYDRASComPort = outbound_queue.OutboundQueue(serial.Serial(comPortList["HYDRAS"], 115200))
+        self.outboundQueues.append(HYDRASComPort)
         self.hydrasDataPackets = microcontroller_hydras.HydrasDataPackets(HYDRASComPort)
         self.hydrasResponseThread = microcontroller_hydras.HydrasResponse(HYDRASComPort)
-        self.hydrasResponseThread.start()
+        self.serialReactor.registerDevice(HYDRASComPort, self.hydrasResponseThread.handleData)
+        self.pollingScheduler.registerDevice(HYDRASComPort, self.hydrasResponseThread.pollingCommands("HYDRAS"))
         
         #AHRS initializing
-        self.spartonResponseThread1 = sparton_ahrs.SpartonAhrsResponse(comPortList["AHRS1"])
-        self.spartonResponseThread1.start()
-        self.spartonResponseThread2 = sparton_ahrs.SpartonAhrsResponse(comPortList["AHRS2"])
-        self.spartonResponseThread2.start()
-        self.spartonResponseThread3 = sparton_ahrs.SpartonAhrsResponse(comPortList["AHRS3"])
-        self.spartonResponseThread3.start()
+        self.spartonResponseThread1 = sparton_ahrs.SpartonAhrsResponse(comPortList["AHRS1"], streaming=True)
+        self.serialReactor.registerDevice(self.spartonResponseThread1.spartonAhrs.SPARTON_AHRS, self.spartonResponseThread1.handleData)
+        self.serialReactor.registerTimer(self.spartonResponseThread1.requestTime, self.spartonResponseThread1.requestData)
+        self.spartonResponseThread2 = sparton_ahrs.SpartonAhrsResponse(comPortList["AHRS2"], streaming=True)
+        self.serialReactor.registerDevice(self.spartonResponseThread2.spartonAhrs.SPARTON_AHRS, self.spartonResponseThread2.handleData)
+        self.serialReactor.registerTimer(self.spartonResponseThread2.requestTime, self.spartonResponseThread2.requestData)
+        self.spartonResponseThread3 = sparton_ahrs.SpartonAhrsResponse(comPortList["AHRS3"], streaming=True)
+        self.serialReactor.registerDevice(self.spartonResponseThread3.spartonAhrs.SPARTON_AHRS, self.spartonResponseThread3.handleData)
+        self.serialReactor.registerTimer(self.spartonResponseThread3.requestTime, self.spartonResponseThread3.requestData)
         
         #Controller Initalizing
         self.controllerResponseThread = joystick_controller.controllerResponse()
-        self.controllerResponseThread.start()
+        self.serialReactor.registerDevice(self.controllerResponseThread.sock, self.controllerResponseThread.handleData)
+        self.serialReactor.registerTimer(self.controllerResponseThread.requestTime, self.controllerResponseThread.requestData)
+        
+        self.serialReactor.registerTimer(0.01, self.flushOutboundQueues) #Get requests sent by the reactor
+        self.serialReactor.start()
         
         #Movement initializing
         thruster1, thruster2, thruster3, thruster4 = movement.BrushedThruster(1, [0, 1, 0], [1, 0, 1]), movement.BrushedThruster(2, [0, 1, 0], [-1, 0, 1]), movement.BrushedThruster(3, [0, 1, 0], [1, 0, -1]), movement.BrushedThruster(4, [0, 1, 0], [-1, 0, -1])   #Up/Down thruster
@@ -262,127 +300,196 @@ class NavigationManagementSystem():
         self.joystickMoveController = movement.JoystickMovementController(self.tcb1DataPackets, self.tcb2DataPackets, thruster1, thruster2, thruster3, thruster4, thruster5, thruster6, thruster7, thruster8)
         self.lockedMoveController = movement.LockedController(self.tcb1DataPackets, self.tcb2DataPackets, thruster1, thruster2, thruster3, thruster4, thruster5, thruster6, thruster7, thruster8)
         
+        #The loop runs at a fixed rate in phases instead of as fast as the CPU allows
+        self.telemetryBlock = shared_telemetry.TelemetryBlock(telemetry)
+        self.commandReceiver = gui_commands.CommandReceiver(pipe)
+        self.executive = fixed_rate_executive.FixedRateExecutive(self.loopRate)
+        self.executive.addPhase("sense", self.sensePhase)
+        self.executive.addPhase("estimate", self.estimatePhase)
+        self.executive.addPhase("plan", self.planPhase)
+        self.executive.addPhase("actuate", self.actuatePhase)
+        self.executive.addPhase("telemetry", self.telemetryPhase)
         while self.runProcess:
-            #AHRS
-            self.ahrsData1 = self.spartonAhrsData1()
-            self.ahrsData2 = self.spartonAhrsData2()
-            self.ahrsData3 = self.spartonAhrsData3()
-            self.ahrsDataMedian = self.calculateMedianAhrs(self.ahrsData1, self.ahrsData2, self.ahrsData3)
-            #self.ahrsDataMedian = [0, 0, 0]
+            self.executive.runCycle()
+        self.executive.printReport()
             
-            self.dvlAhrsDummyThread.updateAhrsValues(self.ahrsDataMedian)
+    def sensePhase(self):
+        '''
+        Reads in everything the sensors and boards have sent since the last cycle.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        #AHRS
+        self.ahrsData1 = self.spartonAhrsData1()
+        self.ahrsData2 = self.spartonAhrsData2()
+        self.ahrsData3 = self.spartonAhrsData3()
+        
+        #DVL 
+        self.dvlGuiData = self.dvlData(self.ahrsDataMedian) 
+        #self.dvlGuiData = [[0, 0, 0, 0], [0, 0, 0], [0, 0, 0, 0], [0, 0, 0]]   
+          
+        #TCB 
+        tcbData, tcbAlertData = self.tcbData()
+        #tcbData, tcbAlertData = [[0, 0, 0], [0, 0, 0], [0, 0, 0], [0, 0, 0]], None
+        #PMUD
+        self.pmudGuiData = self.pmudData()
+        #self.pmudGuiData = [0, [[0, 0], [0, 0]]]
+        
+        #SIB
+        self.sibGuiData = self.sibData()  
+        #self.sibGuiData = [0, 0, 0]   
+        
+        self.hydrasPingerData = self.hydrasData()
+        #hydrasData = [[0, 0, 0], [0, 0, 0], [0, 0, 0, 0]]
+        
+        self.wcbGuiData = self.wcbData()
             
-            #JOYSTICK
-            self.controllerResponseThread.updateManualControlMode(self.guiData[3])
-            if self.guiData[3] == True: #Tells whether manual control is enabled or not (True = enabled)
-                if self.powerOnJoystickLock == False: #Dont want to tell PMUD to turn power on multiple times when joystick control mode is activated
-                    self.pmudDataPackets.setPowerStatus(1) #Turn dirty power on
-                    self.powerOnJoystickLock = True
-                self.joystickGuiData = self.controllerData(self.ahrsDataMedian)
-                self.motorOffJoystickLock = False
-                
-            if self.guiData[3] == False and self.motorOffJoystickLock == False: #Dont want to tell TCB to constantly turn motors off when joystick control mode is deactivated
+    def estimatePhase(self):
+        '''
+        Combines the AHRS readings into one orientation.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.ahrsDataMedian = self.calculateMedianAhrs(self.ahrsData1, self.ahrsData2, self.ahrsData3)
+        #self.ahrsDataMedian = [0, 0, 0]
+        
+        self.dvlAhrsDummyThread.updateAhrsValues(self.ahrsDataMedian)
+            
+    def planPhase(self):
+        '''
+        Runs manual control or the missions, which queue the thruster commands.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        #JOYSTICK
+        self.controllerResponseThread.updateManualControlMode(self.guiData[3])
+        if self.guiData[3] == True: #Tells whether manual control is enabled or not (True = enabled)
+            if self.powerOnJoystickLock == False: #Dont want to tell PMUD to turn power on multiple times when joystick control mode is activated
+                self.pmudDataPackets.setPowerStatus(1) #Turn dirty power on
+                self.powerOnJoystickLock = True
+            self.joystickGuiData = self.controllerData(self.ahrsDataMedian)
+            self.motorOffJoystickLock = False
+            
+        if self.guiData[3] == False and self.motorOffJoystickLock == False: #Dont want to tell TCB to constantly turn motors off when joystick control mode is deactivated
+            self.thrusterPWMs = [0, 0, 0, 0, 0, 0, 0, 0]
+            self.tcb1DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(2, 0, 1)
+            self.tcb1DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(4, 0, 1)
+            self.tcb2DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(2, 0, 1)
+            self.tcb2DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(4, 0, 1)
+            self.pmudDataPackets.setPowerStatus(0) #Turn dirty power off
+            self.motorOffJoystickLock = True
+            self.powerOnJoystickLock = False
+         
+        #MISSIONS
+        if self.guiData[1] == True and self.powerStatus == 1 and self.guiData[3] == False: #If the GUI's "Start Vehicle" button is pushed and dirty power is on and manual control mode is off
+            if self.clearDVLDataInitial == True:
+                self.dvlResponseThread.clearDistanceTraveled()
+                self.clearDVLDataInitial = False
+            
+            self.missions.updateMissions(copy.deepcopy(self.missionSelectorData), self.moveController, self.joystickMoveController, self.lockedMoveController, self.guiData[5], self.dvlGuiData, self.ahrsDataMedian, self.medianExternalDepth, self.arduinoCom) #Mission params from user, Image processing values, orientation data, depth from pressure transducers
+            self.thrusterPWMs, self.currentMission, self.desiredMissionOrientation = self.missions.executeMissions()
+            self.powerOffMissionLock = False
+            
+        
+            
+        if self.guiData[1] == False: #If user presses "Stop Vehicle"
+            self.currentMission = "None"
+            if self.powerOffMissionLock == False:
                 self.thrusterPWMs = [0, 0, 0, 0, 0, 0, 0, 0]
-                self.joystickMoveController.previousPwm = [-1, -1, -1, -1, -1, -1, -1, -1] #Upon turning manual mode off, the up and down thrusters wouldnt got back on because the pwm lock would register that it was that same previous values, need this to make the values diffrent upon turning off manual control mode
+                self.desiredMissionOrientation = [False, 0, 0, 0, 0, 0, 0, 0]
                 self.tcb1DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(2, 0, 1)
                 self.tcb1DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(4, 0, 1)
                 self.tcb2DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(2, 0, 1)
                 self.tcb2DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(4, 0, 1)
                 self.pmudDataPackets.setPowerStatus(0) #Turn dirty power off
-                self.motorOffJoystickLock = True
-                self.powerOnJoystickLock = False
-             
-            #MISSIONS
-            if self.guiData[1] == True and self.powerStatus == 1 and self.guiData[3] == False: #If the GUI's "Start Vehicle" button is pushed and dirty power is on and manual control mode is off
-                if self.clearDVLDataInitial == True:
-                    self.dvlResponseThread.clearDistanceTraveled()
-                    self.clearDVLDataInitial = False
-                
-                self.missions.updateMissions(copy.deepcopy(self.missionSelectorData), self.moveController, self.joystickMoveController, self.lockedMoveController, self.guiData[5], self.dvlGuiData, self.ahrsDataMedian, self.medianExternalDepth, self.arduinoCom) #Mission params from user, Image processing values, orientation data, depth from pressure transducers
-                self.thrusterPWMs, self.currentMission, self.desiredMissionOrientation = self.missions.executeMissions()
-                self.powerOffMissionLock = False
-                
+                self.powerOffMissionLock = True
             
-                
-            if self.guiData[1] == False: #If user presses "Stop Vehicle"
-                self.currentMission = "None"
-                if self.powerOffMissionLock == False:
-                    self.thrusterPWMs = [0, 0, 0, 0, 0, 0, 0, 0]
-                    self.desiredMissionOrientation = [False, 0, 0, 0, 0, 0, 0, 0]
-                    self.tcb1DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(2, 0, 1)
-                    self.tcb1DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(4, 0, 1)
-                    self.tcb2DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(2, 0, 1)
-                    self.tcb2DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(4, 0, 1)
-                    self.pmudDataPackets.setPowerStatus(0) #Turn dirty power off
-                    self.powerOffMissionLock = True
-                    
-                      
-            #DVL 
-            self.dvlGuiData = self.dvlData(self.ahrsDataMedian) 
-            #self.dvlGuiData = [[0, 0, 0, 0], [0, 0, 0], [0, 0, 0, 0], [0, 0, 0]]   
-              
-            #TCB 
-            tcbData, tcbAlertData = self.tcbData()
-            #tcbData, tcbAlertData = [[0, 0, 0], [0, 0, 0], [0, 0, 0], [0, 0, 0]], None
-            #PMUD
-            self.pmudGuiData = self.pmudData()
-            #self.pmudGuiData = [0, [[0, 0], [0, 0]]]
+    def actuatePhase(self):
+        '''
+        Sends everything this cycle commanded, one write per port.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.flushOutboundQueues()
             
-            #SIB
-            self.sibGuiData = self.sibData()  
-            #self.sibGuiData = [0, 0, 0]   
+    def telemetryPhase(self):
+        '''
+        Sends data to the GUI and handles anything the GUI sent.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        #SENDING/RECIEVING
+        #Written in place every cycle, the GUI reads the latest snapshot whenever it is ready
+        self.telemetryBlock.publish(self.sibGuiData, self.ahrsDataMedian, self.thrusterPWMs, self.joystickGuiData, self.pmudGuiData, self.dvlGuiData, self.currentMission, self.setWaypoint, self.removeWaypoint, self.desiredMissionOrientation)
+         
+        if self.powerStatus == 0 and self.previousPowerStatus != 0: #If the dirty power is killed, start the missions over again (once, rebuilding them reads the previous state logs)
+            self.missions = mission_planner.missions() #Creates a new instance of missions if the missions selector data is changed
+            self.clearDVLDataInitial = True
+        self.previousPowerStatus = self.powerStatus
             
-            self.hydrasPingerData = self.hydrasData()
-            #hydrasData = [[0, 0, 0], [0, 0, 0], [0, 0, 0, 0]]
+        if self.guiData[6] == True: #Turn off waypoints so that I only record waypoints one at a time
+            self.setWaypoint = False
+        if self.guiData[7] == True:
+            self.removeWaypoint = False
             
-            self.wcbGuiData = self.wcbData()
-
-            #SENDING/RECIEVING PIPE
-            if self.guiData[0] == True: #If the main process is ready to receive more data, send more data
-                pipe.send([self.sibGuiData, self.ahrsDataMedian, self.thrusterPWMs, self.joystickGuiData, self.pmudGuiData, self.dvlGuiData, self.currentMission, self.setWaypoint, self.removeWaypoint, self.desiredMissionOrientation])
-                self.guiData[0] = False #In order to not overflow the main process buffer, I can only send data when the main process is ready. The main process will update self.guiData[0] to True when it is ready to receive more data
-             
-            if pipe.poll() == True: #If there is data to receive...(This thread would just be paused on pipe.recv() if I didn't put this if statement here)
-                self.guiData = pipe.recv() #[mainProcessReadyFlag, window.startVehicle, turnOffDirtyPower, window.manualModeEnabled, missionSelectorData, imageProcValues, setWaypoint, removewaypoint, reset DVL, pidScales]
+        guiData, changedFields = self.commandReceiver.receive() #The GUI only sends the fields that changed, so there usually isn't anything
+        if guiData != None:
+            self.guiData = guiData #[mainProcessReadyFlag (unused), window.startVehicle, turnOffDirtyPower, window.manualModeEnabled, missionSelectorData, imageProcValues, setWaypoint, removewaypoint, reset DVL, pidScales]
+            
+            if gui_commands.PID_SLIDER_VALUES in changedFields: #Only rebuild the PID controllers when a gain actually changed
                 movement.autonomousPIDSliderValues(self.guiData[9])
                 movement.joystickPIDSliderValues(self.guiData[9])
                 movement.lockedPIDSliderValues(self.guiData[9])
-                
-                if self.guiData[2] == True: #If the GUI is terminated
-                    self.dvlResponseThread.killThread(); self.dvlAhrsDummyThread.killThread(); self.pmudResponseThread.killThread(); 
-                    self.tcb1ResponseThread.killThread(); self.tcb2ResponseThread.killThread(); self.sibResponseThread.killThread(); self.wcbResponseThread.killThread(); 
-                    self.spartonResponseThread1.killThread(); self.spartonResponseThread2.killThread(); self.spartonResponseThread3.killThread()
-                    self.hydrasResponseThread.killThread(); self.controllerResponseThread.killThread(); 
-                    self.tcb1DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(2, 0, 1)
-                    self.tcb1DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(4, 0, 1)
-                    self.tcb2DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(2, 0, 1)
-                    self.tcb2DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(4, 0, 1)
-                    self.pmudDataPackets.setPowerStatus(0) #Turn dirty power off
-                    self.runProcess = False
-                    
-                if self.guiData[4] != None: #The missionSelectorData will always send a none if the user does not update the mission selector list or click the "start vehicle" button
-                    self.missionSelectorData = self.guiData[4]
-                    self.missions = mission_planner.missions() #Creates a new instance of missions if the missions selector data is changed
-                if self.powerStatus == 0: #If the dirty power is killed, start the missions over again
-                    self.missions = mission_planner.missions() #Creates a new instance of missions if the missions selector data is changed
-                    self.clearDVLDataInitial = True
-                if self.guiData[6] == True: #Turn off waypoints so that I only record waypoints one at a time
-                    self.setWaypoint = False
-                if self.guiData[7] == True:
-                    self.removeWaypoint = False
-                    
-                if self.guiData[8] == True:
-                    #dvl.reset or something
-                    self.dvlResponseThread.clearDistanceTraveled()
-
-                
                 self.joystickMoveController.setPID()
                 self.moveController.setPID()
                 self.lockedMoveController.setPID()
+            
+            if self.guiData[2] == True: #If the GUI is terminated
+                self.serialReactor.killThread()
+                self.pmudDataPackets.setPowerStatus(0) #Turn dirty power off first, safety commands are sent as soon as they are queued
+                self.tcb1DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(2, 0, 1)
+                self.tcb1DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb1DataPackets.setMotorDirectionSpeed(4, 0, 1)
+                self.tcb2DataPackets.setMotorDirectionSpeed(1, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(2, 0, 1)
+                self.tcb2DataPackets.setMotorDirectionSpeed(3, 0, 1); self.tcb2DataPackets.setMotorDirectionSpeed(4, 0, 1)
+                self.flushOutboundQueues() #One write per TCB
+                self.pollingScheduler.printReport() #Achieved request rates since start up
+                self.printOutboundQueueStats()
+                print "GUI commands:", self.commandReceiver.stats()
+                self.orientationVoter.printReport() #How far each AHRS was from the vote
+                print "PMUD power status data packets let through with a bad CRC:", self.pmudResponseThread.packetFramer.crcExemptions
+                self.runProcess = False
+                
+            if self.guiData[4] != None: #The missionSelectorData will always send a none if the user does not update the mission selector list or click the "start vehicle" button
+                self.missionSelectorData = self.guiData[4]
+                self.missions = mission_planner.missions() #Creates a new instance of missions if the missions selector data is changed
+                
+            if self.guiData[8] == True:
+                #dvl.reset or something
+                self.dvlResponseThread.clearDistanceTraveled()
 
-                    
-                    
-            sys.stdout.flush() #Allows me to print
+                
+                
+        sys.stdout.flush() #Allows me to print
             
     def dvlData(self, ahrsData):
         '''
@@ -394,43 +501,21 @@ class NavigationManagementSystem():
         **Returns**: \n
         * **[self.position, self.velocity, self.orientation, self.dvlMiscData]** - Position, velocity, orientation and other data detected by the DVL.\n
         '''
-        while len(self.dvlResponseThread.getList) > 0:
-            ensemble = self.dvlResponseThread.getList.pop(0)
-            
+        ensembles = self.dvlResponseThread.getList.drain()
+        if len(ensembles) > 0:
             try:
-                northPosition = (struct.unpack('i', struct.pack('I', ensemble[61] << 24 | ensemble[60] << 16 | ensemble[59] << 8 | ensemble[58]))[0])*0.00328084 #mm to feet
-                eastPosition = (struct.unpack('i', struct.pack('I', ensemble[57] << 24 | ensemble[56] << 16 | ensemble[55] << 8 | ensemble[54]))[0])*0.00328084 #mm to feet
-                upPosition = (struct.unpack('i', struct.pack('I', ensemble[65] << 24 | ensemble[64] << 16 | ensemble[63] << 8 | ensemble[62]))[0])*0.00328084 #mm to feet
-                positionError = struct.unpack('i', struct.pack('I', ensemble[69] << 24 | ensemble[68] << 16 | ensemble[67] << 8 | ensemble[66]))[0]
-                self.position = [northPosition, eastPosition, upPosition, positionError]
-                
-                xVel = (struct.unpack('h', struct.pack('H', ensemble[6] << 8 | ensemble[5]))[0])*0.00328084 #mm/s to feet/s
-                yVel = (struct.unpack('h', struct.pack('H', ensemble[8] << 8 | ensemble[7]))[0])*0.00328084 #mm/s to feet/s
-                zVel = (struct.unpack('h', struct.pack('H', ensemble[10] << 8 | ensemble[9]))[0])*0.00328084 #mm/s to feet/s
-                self.velocity = [xVel, yVel, zVel] #East, North, Up
-                
-                heading = (ensemble[53] << 8 | ensemble[52])/100.0
-                pitch = struct.unpack('h', struct.pack('H', ensemble[49] << 8 | ensemble[48]))[0]/100.0
-                roll = struct.unpack('h', struct.pack('H', ensemble[51] << 8 | ensemble[50]))[0]/100.0
-                depth = struct.unpack('h', struct.pack('H', ensemble[47] << 8 | ensemble[46]))[0]/100.0
-                self.orientation = [heading, pitch, roll, depth]
-                
-                elevation = struct.unpack('h', struct.pack('H', ensemble[12] << 8 | ensemble[11]))[0]
-                speedOfSound = struct.unpack('h', struct.pack('H', ensemble[42] << 8 | ensemble[41]))[0]
-                waterTemp = struct.unpack('h', struct.pack('H', ensemble[44] << 8 | ensemble[43]))[0]/100.0 #deg c
-                self.dvlMiscData = [elevation, speedOfSound, waterTemp]
-                
-            except:
-                northPosition, eastPosition, upPosition, positionError = 0, 0, 0, 0
-                xVel, yVel, zVel = 0, 0, 0
-                heading, pitch, roll, depth = 0, 0, 0, 0
-                elevation, speedOfSound, waterTemp = 0, 0, 0
-                
-            
-            #print "Positions(ft) (North, East, Up, Error)", northPosition, eastPosition, upPosition, positionError
-            #print "Velocities(ft/s) (X, Y, Z):", xVel, yVel, zVel
-            #print "Yaw, Pitch, Roll, Depth (deg, deg, deg, m):", heading, pitch, roll, depth
-            #print "Elevation Velocity, Speed Of Sound, Water Temp: (mm/s, m/s, deg C)", elevation, speedOfSound, waterTemp
+                ensemble = dvl.decodePD5(ensembles[-1]) #Only the newest ensemble is needed
+                self.position = [ensemble.northPosition, ensemble.eastPosition, ensemble.upPosition, ensemble.positionError] #Feet
+                self.velocity = [ensemble.xVel, ensemble.yVel, ensemble.zVel] #East, North, Up (feet/s)
+                self.orientation = [ensemble.heading, ensemble.pitch, ensemble.roll, ensemble.depth]
+                self.dvlMiscData = [ensemble.elevation, ensemble.speedOfSound, ensemble.waterTemp] #mm/s, m/s, deg C
+            except struct.error: #Ensemble was too short to be PD5
+                pass
+                
+            #print "Positions(ft) (North, East, Up, Error)", self.position
+            #print "Velocities(ft/s) (X, Y, Z):", self.velocity
+            #print "Yaw, Pitch, Roll, Depth (deg, deg, deg, m):", self.orientation
+            #print "Elevation Velocity, Speed Of Sound, Water Temp: (mm/s, m/s, deg C)", self.dvlMiscData
             #print "\n"
             
         return [self.position, self.velocity, self.orientation, self.dvlMiscData]
@@ -445,8 +530,8 @@ class NavigationManagementSystem():
         **Returns**: \n
         * **self.ahrsData1** - Latest AHRS orientation data.\n
         '''
-        while len(self.spartonResponseThread1.getList) > 0:
-            self.ahrsData1 = self.spartonResponseThread1.getList.pop(0)
+        if self.spartonResponseThread1.latestData.changedSince(self.ahrsDataSeq[0]): #Only the newest reading matters
+            self.ahrsData1, self.ahrsTimestamps[0], self.ahrsDataSeq[0] = self.spartonResponseThread1.latestData.read()
         return self.ahrsData1
     
     def spartonAhrsData2(self):
@@ -459,8 +544,8 @@ class NavigationManagementSystem():
         **Returns**: \n
         * **self.ahrsData2** - Latest AHRS orientation data.\n
         '''
-        while len(self.spartonResponseThread2.getList) > 0:
-            self.ahrsData2 = self.spartonResponseThread2.getList.pop(0)
+        if self.spartonResponseThread2.latestData.changedSince(self.ahrsDataSeq[1]): #Only the newest reading matters
+            self.ahrsData2, self.ahrsTimestamps[1], self.ahrsDataSeq[1] = self.spartonResponseThread2.latestData.read()
         return self.ahrsData2
     
     def spartonAhrsData3(self):
@@ -473,43 +558,22 @@ class NavigationManagementSystem():
         **Returns**: \n
         * **self.ahrsData3** - Latest AHRS orientation data.\n
         '''
-        while len(self.spartonResponseThread3.getList) > 0:
-            self.ahrsData3 = self.spartonResponseThread3.getList.pop(0)
+        if self.spartonResponseThread3.latestData.changedSince(self.ahrsDataSeq[2]): #Only the newest reading matters
+            self.ahrsData3, self.ahrsTimestamps[2], self.ahrsDataSeq[2] = self.spartonResponseThread3.latestData.read()
         return self.ahrsData3
     
-    def calculateMedianAhrs(self, ahrsData1, ahrsData2, ahrsData3):
+    def calculateMedianAhrs(self, *ahrsData):
         '''
-        Calculates the median values of the AHRS data to minimize error.
+        Votes one orientation out of the AHRS data to minimize error. The heading is the circular median, pitch and roll are
+        medians, and AHRS that stopped sending or disagree with the others are left out.
         
         **Parameters**: \n
-        * **ahrsData1** - Latest AHRS orientation data.
-        * **ahrsData2** - Latest AHRS orientation data.
-        * **ahrsData3** - Latest AHRS orientation data.
+        * **ahrsData** - Latest AHRS orientation data of every AHRS, in the same order as self.ahrsTimestamps.
         
         **Returns**: \n
         * **ahrsDataMedian** - Median AHRS orientation data.\n
         '''
-        radToDeg = 180/3.1415926535
-        degToRad = 3.1415926535/180
-        
-        angleAhrs12 = math.acos(round(math.cos(ahrsData1[0]*degToRad)*math.cos(ahrsData2[0]*degToRad) + math.sin(ahrsData1[0]*degToRad)*math.sin(ahrsData2[0]*degToRad), 3))*radToDeg #dot product
-        angleAhrs13 = math.acos(round(math.cos(ahrsData1[0]*degToRad)*math.cos(ahrsData3[0]*degToRad) + math.sin(ahrsData1[0]*degToRad)*math.sin(ahrsData3[0]*degToRad), 3))*radToDeg #dot product
-        angleAhrs23 = math.acos(round(math.cos(ahrsData2[0]*degToRad)*math.cos(ahrsData3[0]*degToRad) + math.sin(ahrsData2[0]*degToRad)*math.sin(ahrsData3[0]*degToRad), 3))*radToDeg #dot product
-        
-        if angleAhrs12 >= angleAhrs13 and angleAhrs12 >= angleAhrs23:
-            medianHeading = ahrsData3[0]
-        elif angleAhrs13 >= angleAhrs12 and angleAhrs13 >= angleAhrs23:
-            medianHeading = ahrsData2[0]
-        elif angleAhrs23 >= angleAhrs12 and angleAhrs23 >= angleAhrs13:
-            medianHeading = ahrsData1[0]
-            
-        medianPitch = numpy.median(numpy.array([ahrsData1[1], ahrsData2[1], ahrsData3[1]]))
-        
-        medianRoll = numpy.median(numpy.array([ahrsData1[2], ahrsData2[2], ahrsData3[2]]))
-        
-        ahrsDataMedian = [medianHeading, medianPitch, medianRoll]
-        
-        return ahrsDataMedian
+        return self.orientationVoter.vote(ahrsData, self.ahrsTimestamps)
     
     def controllerData(self, ahrsData):
         '''
@@ -530,9 +594,9 @@ class NavigationManagementSystem():
         * **self.desiredMoveRoll** - Double indicating desired roll.
         * **self.desiredMoveDepth** - Double at or below 0.0 indicating desired depth.\n
         '''
-        while len(self.controllerResponseThread.getList) > 0:
+        for joystickData in self.controllerResponseThread.getList.drain():
             self.thrusterPWMs = [0, 0, 0, 0, 0, 0, 0, 0]
-            self.joystickGuiData = self.controllerResponseThread.getList.pop(0)
+            self.joystickGuiData = joystickData
             axis, buttons, hats = self.joystickGuiData[1], self.joystickGuiData[2], self.joystickGuiData[3]
             axis0, axis1, axis2, axis3, axis4 = int(axis[0]*204), int(axis[1]*204), int(axis[2]*204), int(axis[3]*204), int(axis[4]*204)
             #axis0:LJs-right/left, axis1:LJs-down/up, axis2:LRTrig-Left/Right, axis3:RJs-down/up, axis4:RJs-right/left
@@ -723,9 +787,40 @@ class NavigationManagementSystem():
                    
         return self.joystickGuiData[0], self.joystickGuiData[1], self.joystickGuiData[2], self.joystickGuiData[3], self.toggleRightBumper, self.desiredMoveYaw, self.desiredMovePitch, self.desiredMoveRoll, self.desiredMoveDepth
         
+    def flushOutboundQueues(self):
+        '''
+        Sends every command waiting in the board ports' outbound queues. Called at the end of every pass of the main loop and by a 
+        serial_reactor timer for get requests.
+        
+        **Parameters**: \n
+        * **No Input Parameters** 
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        for outboundQueue in self.outboundQueues:
+            outboundQueue.flush()
+            
+    def printOutboundQueueStats(self):
+        '''
+        Prints how deep each board port's outbound queue got and how long commands waited in it.
+        
+        **Parameters**: \n
+        * **No Input Parameters** 
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        for outboundQueue in self.outboundQueues:
+            stats = outboundQueue.stats()
+            print outboundQueue.getPort(), "%d writes, %d bytes, %d errors" % (stats["writes"], stats["bytesWritten"], stats["writeErrors"])
+            for name in outbound_queue.PRIORITY_NAMES:
+                print "    %-9s sent %6d coalesced %6d max depth %3d wait mean %.1f ms max %.1f ms" % (name, stats[name]["sent"], stats[name]["coalesced"], stats[name]["maxDepth"],
+                                                                                                 stats[name]["meanQueueTime"]*1000, stats[name]["maxQueueTime"]*1000)
+            
     def pmudData(self):
         '''
-        Gets data from the PMUDand shuts off the batteries if over 18 Amps are detected.
+        Gets data from the PMUD. The PMUD response cuts power itself as soon as it reads a current over its limit.
         
         **Parameters**: \n
         * **No Input Parameters** 
@@ -734,21 +829,16 @@ class NavigationManagementSystem():
         * **self.powerStatus** - Power status.
         * **[self.battery1, self.battery2]** - Battery voltage and current data.\n
         '''
-        while len(self.pmudResponseThread.getList) > 0:
-            pmudGetDataPacket = self.pmudResponseThread.getList.pop(0)
+        for pmudGetDataPacket in self.pmudResponseThread.getList.drain():
             
             if pmudGetDataPacket[1] == 37:
                 self.powerStatus = pmudGetDataPacket[2]
                 
             if pmudGetDataPacket[1] == 38:
-                self.battery1 = [round(((pmudGetDataPacket[3] << 8) | pmudGetDataPacket[2])*(102.4/65536.0), 2), round(((pmudGetDataPacket[5] << 8) | pmudGetDataPacket[4])*((0.1024/65536.0)/0.005), 2)]
+                self.battery1 = [round(value, 2) for value in microcontroller_pmud.decodeBatteryData(pmudGetDataPacket)]
                 
             if pmudGetDataPacket[1] == 39:
-                self.battery2 = [round(((pmudGetDataPacket[3] << 8) | pmudGetDataPacket[2])*(102.4/65536.0), 2), round(((pmudGetDataPacket[5] << 8) | pmudGetDataPacket[4])*((0.1024/65536.0)/0.005), 2)]
-                
-            if self.battery1[1] >= 18 or self.battery2[1] >= 18: #If greater than 15 amps
-                self.pmudDataPackets.setPowerStatus(0)
-                print "GREATER THAN 18A!!!"
+                self.battery2 = [round(value, 2) for value in microcontroller_pmud.decodeBatteryData(pmudGetDataPacket)]
                 
         return self.powerStatus, [self.battery1, self.battery2]
             
@@ -763,166 +853,17 @@ class NavigationManagementSystem():
         * **[tcb1Data, tcb2Data]** - Thruster information such as updated PWM.
         * **[tcb1AlertData, tcb2AlertData]** - Thruster alert data.\n
         '''
-        #TCB1
-        while len(self.tcb1ResponseThread.getList) > 0: #While the TCB1 and TCB2 response threads have something in their buffer...
-                
-            tcb1GetDataPacket = self.tcb1ResponseThread.getList.pop(0) #Pop the data packet off of TCB1
-            
-            #This block of code is making the desired and actual direction be a positive or negative sign on the desired and actual pwm numbers
-            if (tcb1GetDataPacket[1] == 1): #Desired Direction, Actual Direction, Desired PWM, Actual PWM, Hall Effect Sensor
-                if tcb1GetDataPacket[2] == 1:
-                    self.tcb1Motor1Payload[0] = -1*tcb1GetDataPacket[4]
-                else:
-                    self.tcb1Motor1Payload[0] = tcb1GetDataPacket[4]
-                
-                if tcb1GetDataPacket[3] == 1:
-                    self.tcb1Motor1Payload[1] = -1*tcb1GetDataPacket[5]
-                else:
-                    self.tcb1Motor1Payload[1] = tcb1GetDataPacket[5]
+        for board, tcbResponseThread, tcbDataPackets in [[0, self.tcb1ResponseThread, self.tcb1DataPackets], [1, self.tcb2ResponseThread, self.tcb2DataPackets]]:
+            for tcbGetDataPacket in tcbResponseThread.getList.drain(): #For every data packet the TCB has sent since the last pass...
+                if self.tcbTelemetry.decode(board, tcbGetDataPacket): #Motor data, direction becomes the sign of the PWM
+                    tcbDataPackets.outputStage.acknowledge(tcbGetDataPacket) #Desired speed the TCB actually has
                     
-                self.tcb1Motor1Payload[2] = (tcb1GetDataPacket[7] << 8) | tcb1GetDataPacket[6]
-                
-                #logger.logData("Motor 1",  "MC", 1, "Desired Direction:", self.motor1Payload[0], "Desired Speed:", self.motor1Payload[1], "Current Direction:", self.motor1Payload[2], "Current Speed:", self.motor1Payload[3])
-                
-            elif (tcb1GetDataPacket[1] == 2): #Desired Direction, Actual Direction, Desired PWM, Actual PWM, Hall Effect Sensor
-                if tcb1GetDataPacket[2] == 1:
-                    self.tcb1Motor2Payload[0] = -1*tcb1GetDataPacket[4]
-                else:
-                    self.tcb1Motor2Payload[0] = tcb1GetDataPacket[4]
-                
-                if tcb1GetDataPacket[3] == 1:
-                    self.tcb1Motor2Payload[1] = -1*tcb1GetDataPacket[5]
-                else:
-                    self.tcb1Motor2Payload[1] = tcb1GetDataPacket[5]
-                    
-                self.tcb1Motor2Payload[2] = (tcb1GetDataPacket[7] << 8) | tcb1GetDataPacket[6]
-                
-                #logger.logData("Motor 2", "MC", 2, "Desired Direction:", self.motor2Payload[0], "Desired Speed:", self.motor2Payload[1], "Current Direction:", self.motor2Payload[2], "Current Speed:", self.motor2Payload[3])
-                
-            elif (tcb1GetDataPacket[1] == 3): #Desired Direction, Actual Direction, Desired PWM, Actual PWM, Hall Effect Sensor
-                if tcb1GetDataPacket[2] == 1:
-                    self.tcb1Motor3Payload[0] = -1*tcb1GetDataPacket[4]
-                else:
-                    self.tcb1Motor3Payload[0] = tcb1GetDataPacket[4]
-                
-                if tcb1GetDataPacket[3] == 1:
-                    self.tcb1Motor3Payload[1] = -1*tcb1GetDataPacket[5]
-                else:
-                    self.tcb1Motor3Payload[1] = tcb1GetDataPacket[5]
-                    
-                self.tcb1Motor3Payload[2] = (tcb1GetDataPacket[7] << 8) | tcb1GetDataPacket[6]
-                
-                #logger.logData("Motor 3", "MC", 3, "Desired Direction:", self.motor3Payload[0], "Desired Speed:", self.motor3Payload[1], "Current Direction:", self.motor3Payload[2], "Current Speed:", self.motor3Payload[3])
-                
-            elif (tcb1GetDataPacket[1] == 4): #Desired Direction, Actual Direction, Desired PWM, Actual PWM, Hall Effect Sensor
-                if tcb1GetDataPacket[2] == 1:
-                    self.tcb1Motor4Payload[0] = -1*tcb1GetDataPacket[4]
-                else:
-                    self.tcb1Motor4Payload[0] = tcb1GetDataPacket[4]
-                
-                if tcb1GetDataPacket[3] == 1:
-                    self.tcb1Motor4Payload[1] = -1*tcb1GetDataPacket[5]
-                else:
-                    self.tcb1Motor4Payload[1] = tcb1GetDataPacket[5]
-                    
-                self.tcb1Motor4Payload[2] = (tcb1GetDataPacket[7] << 8) | tcb1GetDataPacket[6]
-                
-                #logger.logData("Motor 4", "MC", 4, "Desired Direction:", self.motor4Payload[0], "Desired Speed:", self.motor4Payload[1], "Current Direction:", self.motor4Payload[2], "Current Speed:", self.motor4Payload[3])
-                
-        while len(self.tcb1ResponseThread.alertList) > 0:
-            tcb1AlertData = self.tcb1ResponseThread.alertList.pop(0)
-            #Could do actions under here according to what data packet is and only return the important stuff to reduce overhead
-        
-        #Desired Direction & PWM, Actual Direction & PWM, Hall Effect Sensor
-        tcb1Data = [[self.tcb1Motor1Payload[0], self.tcb1Motor1Payload[1], self.tcb1Motor1Payload[2]],
-                    [self.tcb1Motor2Payload[0], self.tcb1Motor2Payload[1], self.tcb1Motor2Payload[2]],
-                    [self.tcb1Motor3Payload[0], self.tcb1Motor3Payload[1], self.tcb1Motor3Payload[2]],
-                    [self.tcb1Motor4Payload[0], self.tcb1Motor4Payload[1], self.tcb1Motor4Payload[2]]]
-           
-        tcb1AlertData = None
-                
-
- 
-        #TCB2   
-        while len(self.tcb2ResponseThread.getList) > 0:
-            
-            tcb2GetDataPacket = self.tcb2ResponseThread.getList.pop(0) #Pop the data packet off of TCB1
-            
-            #This block of code is making the desired and actual direction be a positive or negative sign on the desired and actual pwm numbers
-            if (tcb2GetDataPacket[1] == 1): #Desired Direction, Actual Direction, Desired PWM, Actual PWM, Hall Effect Sensor
-                if tcb2GetDataPacket[2] == 1:
-                    self.tcb2Motor1Payload[0] = -1*tcb2GetDataPacket[4]
-                else:
-                    self.tcb2Motor1Payload[0] = tcb2GetDataPacket[4]
-                
-                if tcb2GetDataPacket[3] == 1:
-                    self.tcb2Motor1Payload[1] = -1*tcb2GetDataPacket[5]
-                else:
-                    self.tcb2Motor1Payload[1] = tcb2GetDataPacket[5]
-                    
-                self.tcb2Motor1Payload[2] = (tcb2GetDataPacket[7] << 8) | tcb2GetDataPacket[6]
-                
-                #logger.logData("Motor 1",  "MC", 1, "Desired Direction:", self.motor1Payload[0], "Desired Speed:", self.motor1Payload[1], "Current Direction:", self.motor1Payload[2], "Current Speed:", self.motor1Payload[3])
-                
-            elif (tcb2GetDataPacket[1] == 2): #Desired Direction, Actual Direction, Desired PWM, Actual PWM, Hall Effect Sensor
-                if tcb2GetDataPacket[2] == 1:
-                    self.tcb2Motor2Payload[0] = -1*tcb2GetDataPacket[4]
-                else:
-                    self.tcb2Motor2Payload[0] = tcb2GetDataPacket[4]
-                
-                if tcb2GetDataPacket[3] == 1:
-                    self.tcb2Motor2Payload[1] = -1*tcb2GetDataPacket[5]
-                else:
-                    self.tcb2Motor2Payload[1] = tcb2GetDataPacket[5]
-                    
-                self.tcb2Motor2Payload[2] = (tcb2GetDataPacket[7] << 8) | tcb2GetDataPacket[6]
-                
-                #logger.logData("Motor 2", "MC", 2, "Desired Direction:", self.motor2Payload[0], "Desired Speed:", self.motor2Payload[1], "Current Direction:", self.motor2Payload[2], "Current Speed:", self.motor2Payload[3])
-                
-            elif (tcb2GetDataPacket[1] == 3): #Desired Direction, Actual Direction, Desired PWM, Actual PWM, Hall Effect Sensor
-                if tcb2GetDataPacket[2] == 1:
-                    self.tcb2Motor3Payload[0] = -1*tcb2GetDataPacket[4]
-                else:
-                    self.tcb2Motor3Payload[0] = tcb2GetDataPacket[4]
-                
-                if tcb2GetDataPacket[3] == 1:
-                    self.tcb2Motor3Payload[1] = -1*tcb2GetDataPacket[5]
-                else:
-                    self.tcb2Motor3Payload[1] = tcb2GetDataPacket[5]
-                    
-                self.tcb2Motor3Payload[2] = (tcb2GetDataPacket[7] << 8) | tcb2GetDataPacket[6]
-                
-                #logger.logData("Motor 3", "MC", 3, "Desired Direction:", self.motor3Payload[0], "Desired Speed:", self.motor3Payload[1], "Current Direction:", self.motor3Payload[2], "Current Speed:", self.motor3Payload[3])
-                
-            elif (tcb2GetDataPacket[1] == 4): #Desired Direction, Actual Direction, Desired PWM, Actual PWM, Hall Effect Sensor
-                if tcb2GetDataPacket[2] == 1:
-                    self.tcb2Motor4Payload[0] = -1*tcb2GetDataPacket[4]
-                else:
-                    self.tcb2Motor4Payload[0] = tcb2GetDataPacket[4]
-                
-                if tcb2GetDataPacket[3] == 1:
-                    self.tcb2Motor4Payload[1] = -1*tcb2GetDataPacket[5]
-                else:
-                    self.tcb2Motor4Payload[1] = tcb2GetDataPacket[5]
-                    
-                self.tcb2Motor4Payload[2] = (tcb2GetDataPacket[7] << 8) | tcb2GetDataPacket[6]
-                
-                #logger.logData("Motor 4", "MC", 4, "Desired Direction:", self.motor4Payload[0], "Desired Speed:", self.motor4Payload[1], "Current Direction:", self.motor4Payload[2], "Current Speed:", self.motor4Payload[3])
-                
-        while len(self.tcb1ResponseThread.alertList) > 0:
-            tcb2AlertData = self.tcb1ResponseThread.alertList.pop(0)
-            #Could do actions under here according to what data packet is and only return the important stuff to reduce overhead
-        
-        #Desired Direction & PWM, Actual Direction & PWM, Hall Effect Sensor
-        tcb2Data = [[self.tcb2Motor1Payload[0], self.tcb2Motor1Payload[1], self.tcb2Motor1Payload[2]],
-                    [self.tcb2Motor2Payload[0], self.tcb2Motor2Payload[1], self.tcb2Motor2Payload[2]],
-                    [self.tcb2Motor3Payload[0], self.tcb2Motor3Payload[1], self.tcb2Motor3Payload[2]],
-                    [self.tcb2Motor4Payload[0], self.tcb2Motor4Payload[1], self.tcb2Motor4Payload[2]]]
-           
-        tcb2AlertData = None
-        
+            for tcbAlertData in tcbResponseThread.alertList.drain():
+                #Could do actions under here according to what data packet is and only return the important stuff to reduce overhead
+                pass
         
-        return [tcb1Data, tcb2Data], [tcb1AlertData, tcb2AlertData]
+        #Desired Direction & PWM, Actual Direction & PWM, Hall Effect Sensor. Only rebuilt if a motor data packet arrived
+        return self.tcbTelemetry.payload(), [None, None]
     
     def sibData(self):
         '''
@@ -934,8 +875,10 @@ class NavigationManagementSystem():
         **Returns**: \n
         * **[round(self.medianInternalAnalogTemp, 2), round(self.medianInternalAnalogPressure, 2), round(self.medianExternalDepth, 2)]** - Internal temperature, internal pressure, and external pressure data.\n
         '''
-        while len(self.sibResponseThread.getList) > 0:
-            sibGetDataPacket = self.sibResponseThread.getList.pop(0)
+        for frameID, mailbox in self.sibResponseThread.latestData.items():
+            if not mailbox.changedSince(self.sibDataSeq[frameID]): #Only decode sensors that have sent something new
+                continue
+            sibGetDataPacket, timestamp, self.sibDataSeq[frameID] = mailbox.read()
             
             if sibGetDataPacket[1] == 106:
                 self.internalDigitalTemp1 = (sibGetDataPacket[3] << 8 | sibGetDataPacket[2]) / 128.0
@@ -1000,8 +943,9 @@ class NavigationManagementSystem():
         **Returns**: \n
         * **self.self.wcbData** - Latest WCBn data.\n
         '''
-        while len(self.wcbResponseThread.getList) > 0:
-            self.wcbData1 = self.wcbResponseThread.getList.pop(0)
+        wcbData = self.wcbResponseThread.latestData.get() #Only the newest reading matters
+        if wcbData != None:
+            self.wcbData1 = wcbData
             #print self.wcbData1
         return self.wcbData1
     
@@ -1016,8 +960,7 @@ class NavigationManagementSystem():
         * **[[self.heading1, self.aoi1, self.confidence1], [self.heading2, self.aoi2, self.confidence2]]** - Heading, area of interest, and confidence values for both pingers.\n
         '''
         
-        while len(self.hydrasResponseThread.getList) > 0:
-            hydrasGetDataPacket = self.hydrasResponseThread.getList.pop(0)
+        for hydrasGetDataPacket in self.hydrasResponseThread.getList.drain():
             
             if hydrasGetDataPacket[1] == 97:
                 self.heading2 = hydrasGetDataPacket[3] << 8 | hydrasGetDataPacket[2]
@@ -0,0 +1,159 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: crc_engine
+   :synopsis: Table driven CRC32 (F0 & F4 boards) and CRC16 (AHRS) calculations that work on buffers without copying them.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Uses the C table driven CRCs built into zlib (CRC-32, same as crcmod 0x104C11DB7 reversed with 0xFFFFFFFF out) and
+              binascii (CRC-16/XMODEM, same as crcmod 0x11021). Both can be continued from an earlier value, so a checksum can be
+              built up chunk by chunk as bytes arrive or started from the precomputed CRC of a frame's constant header. Use view to
+              checksum part of a buffer without copying it (zlib on Python 2 won't take a bytearray or memoryview directly).
+'''
+
+import zlib
+import struct
+import binascii
+
+CRC32_STRUCT = struct.Struct('<L') #F0 & F4 boards send the CRC little endian
+CRC16_STRUCT = struct.Struct('>H') #AHRS sends the CRC big endian
+
+def view(data, start=0, end=None):
+    '''
+    Zero copy, read-only view of part of a string or bytearray that both CRC functions accept. The view always sees the
+    current contents of the bytearray.
+
+    **Parameters**: \n
+    * **data** - String or bytearray.
+    * **start** - Index of the first byte.
+    * **end** - Index one past the last byte (defaults to the end of *data*).
+
+    **Returns**: \n
+    * **view** - Read-only buffer.\n
+    '''
+    if end == None:
+        end = len(data)
+    return buffer(data, start, end - start)
+
+def crc32(data, crc=0):
+    '''
+    Calculates the F0 & F4 CRC32, optionally continuing from the CRC of the bytes before *data*.
+
+    **Parameters**: \n
+    * **data** - String or view (wrap a bytearray with view).
+    * **crc** - CRC of everything before *data* (0 to start a new CRC).
+
+    **Returns**: \n
+    * **crc** - Unsigned 32-bit CRC.\n
+    '''
+    return zlib.crc32(data, crc) & 0xFFFFFFFF
+
+def crc16(data, crc=0):
+    '''
+    Calculates the AHRS CRC16, optionally continuing from the CRC of the bytes before *data*.
+
+    **Parameters**: \n
+    * **data** - String, bytearray or view.
+    * **crc** - CRC of everything before *data* (0 to start a new CRC).
+
+    **Returns**: \n
+    * **crc** - Unsigned 16-bit CRC.\n
+    '''
+    return binascii.crc_hqx(data, crc)
+
+def verifyCRC32(data, start=0, length=None):
+    '''
+    Checks the trailing little endian CRC32 of an F0 & F4 data packet sitting anywhere in a buffer, without copying it out.
+
+    **Parameters**: \n
+    * **data** - String or bytearray holding the data packet.
+    * **start** - Index of the data packet's first byte.
+    * **length** - Length of the data packet including the CRC (defaults to the rest of *data*).
+
+    **Returns**: \n
+    * **True/False** - True if the CRC matches.\n
+    '''
+    if length == None:
+        length = len(data) - start
+    crcOffset = start + length - 4
+    if length < 4 or crcOffset + 4 > len(data):
+        return False
+    return zlib.crc32(buffer(data, start, length - 4)) & 0xFFFFFFFF == CRC32_STRUCT.unpack_from(data, crcOffset)[0]
+
+def verifyCRC16(data, start=0, length=None):
+    '''
+    Checks the trailing big endian CRC16 of an AHRS data packet sitting anywhere in a buffer, without copying it out.
+
+    **Parameters**: \n
+    * **data** - String or bytearray holding the data packet.
+    * **start** - Index of the data packet's first byte.
+    * **length** - Length of the data packet including the CRC (defaults to the rest of *data*).
+
+    **Returns**: \n
+    * **True/False** - True if the CRC matches.\n
+    '''
+    if length == None:
+        length = len(data) - start
+    crcOffset = start + length - 2
+    if length < 2 or crcOffset + 2 > len(data):
+        return False
+    return binascii.crc_hqx(buffer(data, start, length - 2), 0) == CRC16_STRUCT.unpack_from(data, crcOffset)[0]
+
+class IncrementalCRC32:
+    '''
+    Running CRC32 that can be fed a data packet a chunk at a time, so the checksum is already done by the time the last byte arrives.
+    '''
+    def __init__(self, prefixCRC=0):
+        '''
+        Starts a new CRC.
+
+        **Parameters**: \n
+        * **prefixCRC** - Precomputed CRC of a constant header (from precomputePrefixCRC32) to start from, or 0.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.prefixCRC = prefixCRC
+        self.crc = prefixCRC
+        self.length = 0 #Bytes fed since the prefix
+
+    def update(self, chunk):
+        '''
+        Adds more bytes to the CRC.
+
+        **Parameters**: \n
+        * **chunk** - String or view of the next bytes.
+
+        **Returns**: \n
+        * **crc** - CRC of everything fed so far.\n
+        '''
+        self.crc = crc32(chunk, self.crc)
+        self.length += len(chunk)
+        return self.crc
+
+    def reset(self):
+        '''
+        Goes back to just the prefix.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.crc = self.prefixCRC
+        self.length = 0
+
+def precomputePrefixCRC32(*prefix):
+    '''
+    Calculates the CRC32 of bytes that start every copy of a frame (usually the byte count and frame ID) once, so only the
+    payload has to be checksummed each time the frame is sent.
+
+    **Parameters**: \n
+    * ***prefix** - Prefix bytes as ints.
+
+    **Returns**: \n
+    * **crc** - CRC32 of the prefix, to pass as *crc* to crc32 or *prefixCRC* to IncrementalCRC32.\n
+    '''
+    return crc32(str(bytearray(prefix)))
@@ -9,13 +9,14 @@ Copyright 2014, Austin Owens, All rights reserved.
 :Description: Defines communication protocol for all communications EXCLUDING THE SPARTAN.
 '''
 
-import crcmod
 import struct
+import crc_engine
+import outbound_queue
 
 
 #CRC
-CRC16 = crcmod.mkCrcFun(0x11021, rev=False, initCrc=0x0000, xorOut=0x0000)
-CRC32 = crcmod.mkCrcFun(0x104C11DB7, rev=True, initCrc=0x00000000, xorOut=0xFFFFFFFF)
+CRC16 = crc_engine.crc16 #CRC-16/XMODEM, polynomial 0x11021
+CRC32 = crc_engine.crc32 #CRC-32, polynomial 0x104C11DB7 reversed
 
 
 class DataPacket:
@@ -94,8 +95,7 @@ class DataPacket:
         
         # Output checksum polynomial calulation
         checksum = CRC16(str(bytearray(byteList)))
-        checksumToInts = [int(ord(b)) for b in struct.pack('>H',checksum)]
-        self.crc = [checksumToInts[0], checksumToInts[1]]
+        self.crc = [checksum >> 8, checksum & 0xFF]
         
     def calcCRC16In(self, dataPacket): #For AHRS
         '''
@@ -111,9 +111,8 @@ class DataPacket:
         if dataPacket != [0] and dataPacket != None:
             
             try:
-                checksum = CRC16(str(bytearray(dataPacket[0:len(dataPacket)-2])))
-                CRCIn = dataPacket[-2] << 8 | dataPacket[-1] << 0
-                if checksum != CRCIn:
+                packedDataPacket = str(bytearray(dataPacket))
+                if CRC16(packedDataPacket[:-2]) != crc_engine.CRC16_STRUCT.unpack(packedDataPacket[-2:])[0]:
                     print "BAD AHRS DATAPACKET BY CRC CALCULATION", dataPacket
                     dataPacket = None
             
@@ -143,8 +142,7 @@ class DataPacket:
         byteList = self.singleListMerge(dataPacket)
         
         checksum = CRC32(str(bytearray(byteList)))
-        checksumToInts = [int(ord(b)) for b in struct.pack('>L',checksum)]
-        self.crc = [checksumToInts[3], checksumToInts[2], checksumToInts[1], checksumToInts[0]]
+        self.crc = [checksum & 0xFF, (checksum >> 8) & 0xFF, (checksum >> 16) & 0xFF, checksum >> 24]
         
     def calcCRC32In(self, dataPacket): #For F0, F4
         '''
@@ -160,12 +158,10 @@ class DataPacket:
         if dataPacket != [0] and dataPacket != None:
             
             try:
-                checksum = CRC32(str(bytearray(dataPacket[0:len(dataPacket)-4])))
-                CRCIn = dataPacket[-1] << 24 | dataPacket[-2] << 16 | dataPacket[-3] << 8 | dataPacket[-4] << 0
-                
-                if checksum != CRCIn and dataPacket[1] != 37: #There is a bug in the CRC library on either the python or the PIC side. Accommodating for this by putting 'dataPacket[1] != 37'
+                packedDataPacket = str(bytearray(dataPacket))
+                if CRC32(packedDataPacket[:-4]) != crc_engine.CRC32_STRUCT.unpack(packedDataPacket[-4:])[0]:
                     print "BAD F0/F4 DATAPACKET BY CRC CALCULATION", dataPacket
-                    dataPacket = None #This doesnt work, need to fix
+                    dataPacket = None
             
             except:
                 print "Data Packet was cut off in calcCRC32In."
@@ -211,6 +207,30 @@ class DataPacket:
         except Exception as msg:
             print "Serial timeout on port:", ser.getPort(), msg
             
+    def sendFrame(self, ser, frame, priority=outbound_queue.TELEMETRY, coalesceKey=None):
+        '''
+        Sends a data packet that was built ahead of time with compileFrame or FrameTemplate, skipping the packet assembly and CRC.
+        If *ser* is an outbound_queue.OutboundQueue the data packet is queued instead of written.
+        
+        **Parameters**: \n
+        * **ser** - Serial port object or OutboundQueue.
+        * **frame** - Complete data packet (string or bytearray).
+        * **priority** - outbound_queue.SAFETY, ACTUATION or TELEMETRY.
+        * **coalesceKey** - Queued data packets with the same key replace each other, so only the newest is sent. None to always send.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+
+        try:
+            if isinstance(ser, outbound_queue.OutboundQueue):
+                ser.enqueue(frame, priority, coalesceKey)
+            else:
+                ser.write(frame)
+                      
+        except Exception as msg:
+            print "Serial timeout on port:", ser.getPort(), msg
+            
     
     def clearPacket(self):
         '''
@@ -279,5 +299,229 @@ class DataPacket:
                 singleList.append(element)
                 
         return singleList
+
+
+def compileFrame(frameID, *payload):
+    '''
+    Builds a complete F0 & F4 data packet (byte count, frame ID, payload and CRC) once, for commands that never change.
+    
+    **Parameters**: \n
+    * **frameID** - Frame ID of the command.
+    * ***payload** - Payload bytes, if the command has any.
+    
+    **Returns**: \n
+    * **frame** - The data packet as an immutable string, ready for DataPacket.sendFrame.\n
+    '''
+    dataPacket = bytearray([len(payload) + 6, frameID] + list(payload))
+    dataPacket.extend(crc_engine.CRC32_STRUCT.pack(CRC32(str(dataPacket))))
+    return str(dataPacket)
+
+
+class FrameTemplate:
+    '''
+    Preallocated F0 & F4 data packet for commands with parameters. The byte count and frame ID (and their CRC) are worked out 
+    once, and every fill packs the parameters and the CRC straight into the same buffer, so nothing is allocated per command. 
+    Each DataPacket object should own its templates since the buffer is reused.
+    '''
+    def __init__(self, frameID, payloadFormat):
+        '''
+        Allocates the data packet buffer.
+        
+        **Parameters**: \n
+        * **frameID** - Frame ID of the command.
+        * **payloadFormat** - struct format of the payload without the byte order character, e.g. 'BB' or 'HB' (always little endian).
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.payloadStruct = struct.Struct('<' + payloadFormat)
+        self.byteCount = self.payloadStruct.size + 6
+        self.crcOffset = self.byteCount - 4
         
-        
\ No newline at end of file
+        self.buffer = bytearray(self.byteCount)
+        self.buffer[0], self.buffer[1] = self.byteCount, frameID
+        self.prefixCRC = crc_engine.precomputePrefixCRC32(self.byteCount, frameID)
+        self.payloadView = crc_engine.view(self.buffer, 2, self.crcOffset) #Follows changes to the payload without copying
+        
+    def fill(self, *values):
+        '''
+        Packs new parameters into the data packet and patches its CRC.
+        
+        **Parameters**: \n
+        * ***values** - Payload values in the order of *payloadFormat*.
+        
+        **Returns**: \n
+        * **buffer** - The complete data packet (the same bytearray every call), ready for DataPacket.sendFrame.\n
+        '''
+        self.payloadStruct.pack_into(self.buffer, 2, *values)
+        crc_engine.CRC32_STRUCT.pack_into(self.buffer, self.crcOffset, CRC32(self.payloadView, self.prefixCRC))
+        return self.buffer
+
+
+class PacketFramer:
+    '''
+    Incrementally assembles F0 & F4 data packets out of a serial stream. Everything waiting on the port is pulled in with a single
+    read into a reusable buffer, and only complete packets that pass the CRC check are handed back. The CRC of a packet that is 
+    still arriving is carried over between reads, so each byte is only checksummed once and nothing is copied until a packet 
+    passes. If a byte count or CRC is bad, the framer slides forward one byte at a time until it finds the next valid packet 
+    instead of losing sync for good.
+    '''
+    def __init__(self, serialObject, minByteCount=6, maxByteCount=16, bufferSize=4096, crcExemptFrame=None):
+        '''
+        Initializes the receive buffer and framing statistics.
+
+        **Parameters**: \n
+        * **serialObject** - Serial port object to read from.
+        * **minByteCount** - Smallest byte count a valid data packet can have.
+        * **maxByteCount** - Largest byte count a valid data packet can have.
+        * **bufferSize** - Initial size (in bytes) of the receive buffer.
+        * **crcExemptFrame** - [frameID, byteCount] of a data packet a board is known to send with a bad CRC. It is let through 
+          anyway, but only with exactly that byte count and only right where the last good data packet ended, never while 
+          resyncing (None for no exemption).
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.serialObject = serialObject
+        self.minByteCount = minByteCount
+        self.maxByteCount = maxByteCount
+
+        self.buffer = bytearray(bufferSize)
+        self.start = 0 #Index of the first unprocessed byte in the buffer
+        self.end = 0 #Index one past the last received byte in the buffer
+
+        self.partialStart = -1 #Start of the packet whose CRC is partly done, -1 if none
+        self.partialCRC = crc_engine.IncrementalCRC32() #CRC of that packet's bytes that have arrived so far
+        self.synchronized = False #True while self.start is where the last good data packet ended
+
+        self.crcExemptFrame = crcExemptFrame
+        self.crcExemptions = 0 #Data packets let through with a bad CRC because of crcExemptFrame
+        self.crcErrors = 0
+        self.crcErrorsByFrameID = {} #Frame ID: CRC failures, to spot a board or frame that is consistently wrong
+        self.discardedBytes = 0
+
+    def read(self):
+        '''
+        Reads all of the bytes waiting on the serial port in one call and extracts the complete data packets.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **dataPackets** - List of complete, CRC checked data packets (bytearrays).\n
+        '''
+        bytesWaiting = self.serialObject.inWaiting()
+        if bytesWaiting != 0:
+            self.feed(self.serialObject.read(bytesWaiting))
+
+        return self.extractDataPackets()
+
+    def feed(self, data):
+        '''
+        Appends raw bytes to the end of the receive buffer.
+
+        **Parameters**: \n
+        * **data** - Raw bytes read from the serial port.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        size = len(data)
+        if self.end + size > len(self.buffer):
+            self.__compact__(size)
+
+        self.buffer[self.end:self.end+size] = data
+        self.end += size
+
+    def extractDataPackets(self):
+        '''
+        Pulls every complete data packet out of the receive buffer, resyncing past bad byte counts and bad CRCs.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **dataPackets** - List of complete, CRC checked data packets (bytearrays).\n
+        '''
+        dataPackets = []
+        buf = self.buffer
+
+        while self.start < self.end:
+            byteCount = buf[self.start]
+
+            if byteCount < self.minByteCount or byteCount > self.maxByteCount: #Can't be the start of a data packet, skip it
+                self.start += 1
+                self.discardedBytes += 1
+                self.synchronized = False
+                continue
+
+            crcOffset = self.start + byteCount - 4
+            if self.end - self.start < byteCount: #Rest of the data packet hasn't arrived yet, checksum what has so far
+                if self.partialStart != self.start:
+                    self.partialStart = self.start
+                    self.partialCRC.reset()
+                checksummedTo = self.start + self.partialCRC.length
+                checksumEnd = min(self.end, crcOffset)
+                if checksumEnd > checksummedTo:
+                    self.partialCRC.update(crc_engine.view(buf, checksummedTo, checksumEnd))
+                break
+
+            if self.partialStart == self.start: #Finish the CRC started on an earlier read
+                checksum = self.partialCRC.update(crc_engine.view(buf, self.start + self.partialCRC.length, crcOffset))
+                self.partialStart = -1
+            else: #Whole data packet arrived at once
+                checksum = CRC32(crc_engine.view(buf, self.start, crcOffset))
+
+            if checksum == crc_engine.CRC32_STRUCT.unpack_from(buf, crcOffset)[0]:
+                dataPackets.append(buf[self.start:self.start+byteCount])
+                self.start += byteCount
+                self.synchronized = True
+            elif self.synchronized and self.crcExemptFrame != None and [buf[self.start+1], byteCount] == list(self.crcExemptFrame):
+                dataPackets.append(buf[self.start:self.start+byteCount])
+                self.start += byteCount
+                self.crcExemptions += 1
+            else: #The byte count was really a corrupted or misaligned byte, so slide forward and look for the next data packet
+                self.crcErrors += 1
+                frameID = buf[self.start+1]
+                self.crcErrorsByFrameID[frameID] = self.crcErrorsByFrameID.get(frameID, 0) + 1
+                self.start += 1
+                self.discardedBytes += 1
+                self.synchronized = False
+
+        if self.start == self.end: #Everything has been consumed, so start filling from the front again
+            self.start, self.end = 0, 0
+            self.partialStart = -1
+
+        return dataPackets
+
+    def checkCRC32(self, dataPacket):
+        '''
+        Checks the trailing 32-bit CRC of an F0 & F4 data packet.
+
+        **Parameters**: \n
+        * **dataPacket** - Complete data packet (bytearray).
+
+        **Returns**: \n
+        * **True/False** - True if the CRC matches.\n
+        '''
+        return crc_engine.verifyCRC32(dataPacket)
+
+    def __compact__(self, size):
+        '''
+        Moves the unprocessed bytes to the front of the buffer, growing the buffer if there still isn't enough room.
+
+        **Parameters**: \n
+        * **size** - Number of bytes that need to fit after the unprocessed bytes.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        remaining = self.end - self.start
+        self.buffer[0:remaining] = self.buffer[self.start:self.end]
+        if self.partialStart != -1: #Keep the partly done CRC lined up with its packet
+            self.partialStart -= self.start
+        self.start, self.end = 0, remaining
+
+        if remaining + size > len(self.buffer):
+            self.buffer.extend(bytearray(remaining + size - len(self.buffer)))
+
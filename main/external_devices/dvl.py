@@ -15,6 +15,69 @@ import time
 import threading
 import data_packet_generator
 import struct
+import collections
+import numpy
+import main.utility_package.utilities as utilities
+
+MM_TO_FEET = 0.00328084
+
+#Every PD5 field the navigation process uses, in the order they show up in the ensemble. Offsets are bytes from the 0x7D ID byte.
+PD5_FIELDS = ('xVel', 'yVel', 'zVel', 'elevation', 'speedOfSound', 'waterTemp', 'depth', 'pitch', 'roll', 'heading', 
+              'eastPosition', 'northPosition', 'upPosition', 'positionError')
+PD5_OFFSETS = (5, 7, 9, 11, 41, 43, 46, 48, 50, 52, 54, 58, 62, 66)
+PD5_FORMATS = ('<i2', '<i2', '<i2', '<i2', '<i2', '<i2', '<i2', '<i2', '<i2', '<u2', '<i4', '<i4', '<i4', '<i4')
+PD5_SCALES = (MM_TO_FEET, MM_TO_FEET, MM_TO_FEET, 1, 1, 0.01, 0.01, 0.01, 0.01, 0.01, MM_TO_FEET, MM_TO_FEET, MM_TO_FEET, 1) #mm to feet, hundredths to units
+
+PD5_STRUCT = struct.Struct('<5x4h28x2hx3hH4i') #Same layout as the offsets above, compiled once
+PD5_RAW_DTYPE = numpy.dtype({'names': PD5_FIELDS, 'formats': PD5_FORMATS, 'offsets': PD5_OFFSETS, 'itemsize': PD5_STRUCT.size})
+PD5_DTYPE = numpy.dtype([(name, numpy.float64) for name in PD5_FIELDS])
+PD5_SCALE_ARRAY = numpy.array(PD5_SCALES)
+
+PD5Ensemble = collections.namedtuple('PD5Ensemble', PD5_FIELDS)
+
+ENSEMBLE_BYTE_COUNTS = {0: 45, 1: 86} #Output format (0 is PD4, 1 is PD5): number of bytes, which is everything but the 2 byte checksum at the end
+
+def ensembleChecksum(ensemble, byteNum):
+    '''
+    Checksum the DVL puts after an ensemble, the sum of its bytes modulo 65536.
+    
+    **Parameters**: \n
+    * **ensemble** - Raw ensemble bytes (bytearray) starting with the 0x7D ID byte.
+    * **byteNum** - Number of bytes the checksum covers.
+    
+    **Returns**: \n
+    * **checksum** - 16-bit checksum.\n
+    '''
+    return sum(ensemble[:byteNum]) & 0xFFFF
+
+def decodePD5(ensemble):
+    '''
+    Decodes a single raw PD5 ensemble with one precompiled struct call and converts it to feet, degrees and deg C.
+    
+    **Parameters**: \n
+    * **ensemble** - Raw ensemble bytes starting with the 0x7D ID byte.
+    
+    **Returns**: \n
+    * **PD5Ensemble** - Named tuple of the PD5 fields.\n
+    '''
+    return PD5Ensemble(*[value*scale for value, scale in zip(PD5_STRUCT.unpack_from(ensemble), PD5_SCALES)])
+
+def decodePD5Batch(ensembles):
+    '''
+    Decodes a whole backlog of raw PD5 ensembles in one call. The ensembles are laid side by side in one buffer, viewed through a 
+    structured dtype and scaled all at once.
+    
+    **Parameters**: \n
+    * **ensembles** - List of raw ensemble bytes starting with the 0x7D ID byte.
+    
+    **Returns**: \n
+    * **records** - NumPy structured array (dtype PD5_DTYPE) with one float record per ensemble.\n
+    '''
+    if len(ensembles) == 0:
+        return numpy.zeros(0, dtype=PD5_DTYPE)
+    
+    raw = numpy.frombuffer(''.join([ensemble[:PD5_STRUCT.size] for ensemble in ensembles]), dtype=PD5_RAW_DTYPE) #Every field lives in the first PD5_STRUCT.size bytes
+    return (numpy.column_stack([raw[name] for name in PD5_FIELDS])*PD5_SCALE_ARRAY).view(PD5_DTYPE).ravel()
 
 class DVLDataPackets:
     def __init__(self, serialObject):
@@ -94,8 +157,11 @@ class DVLResponse(threading.Thread):
         self.lowerFrameIdForAlerts = -1
         self.upperFrameIdForAlerts = -1
         
-        self.alertList = []
-        self.getList = []
+        self.alertList = utilities.RingBuffer(64)
+        self.getList = utilities.RingBuffer(256)
+        
+        self.receiveBuffer = bytearray() #Bytes of ensembles that haven't fully arrived yet
+        self.badEnsembles = 0 #0x7D bytes that turned out not to start an ensemble (bad header or checksum)
     
     def run(self):
         '''
@@ -111,42 +177,69 @@ class DVLResponse(threading.Thread):
             
             #time.sleep(0.01) #Slows down thread to save some power
                 
-            dataPacket = self.unpack() #Reads in data packets
-            if dataPacket != None and dataPacket != [0]:
-                self.getList.append(dataPacket)
+            self.handleData()
+            
+    def handleData(self):
+        '''
+        Reads in every complete ensemble waiting on the port and appends it to the instance's list attribute. Called by run or by a 
+        serial_reactor when the port becomes readable.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        dataPacket = self.unpack() #Reads in data packets
+        while dataPacket != None:
+            self.getList.append(dataPacket)
+            dataPacket = self.unpack()
                     
     def unpack(self):
         '''
-        Extracts the raw data from the transmission (collects all bytes into array).
+        Extracts the raw data from the transmission (collects all bytes into array). Everything waiting on the port is read into a 
+        receive buffer so the caller never blocks partway through an ensemble. A 0x7D is only taken as the start of an ensemble if 
+        its format, byte count and checksum check out, otherwise it is dropped and the search moves on to the next one.
         
         **Parameters**: \n
         * **No Input Parameters.**
          
         **Returns**: \n
-        * **self.dataPacketIn** - The raw data transmission.\n
+        * **ensemble** - The raw ensemble bytes (decode with decodePD5), or None if there isn't a complete ensemble waiting.\n
         '''
         try:
-            if self.DVLCom.inWaiting() != 0:
-                ID = hex(ord(self.DVLCom.read()))
-                if ID == "0x7d":
-                    ensemble = [] #Clear list
-                    
-                    outputFormat = ord(self.DVLCom.read()) #0 if using PD4 output format, 1 if using PD5 output format
-                    byteNumLSB = ord(self.DVLCom.read()) #How many bytes in ensemble
-                    byteNumMSB = ord(self.DVLCom.read()) #How many bytes in ensemble
-                    
-                    ensemble = [ID, outputFormat, byteNumLSB, byteNumMSB]
-                    for x in range(byteNumMSB << 8 | byteNumLSB):
-                        ensemble.append(ord(self.DVLCom.read()))
-                    
-                    return ensemble
-                
-                else:
-                    self.DVLCom.flushInput()
-                    
+            bytesWaiting = self.DVLCom.inWaiting()
+            if bytesWaiting != 0:
+                self.receiveBuffer.extend(self.DVLCom.read(bytesWaiting))
         except Exception as msg:
             print "Can't receive data from DVL:", msg
-        
+            
+        receiveBuffer = self.receiveBuffer
+        while True:
+            start = receiveBuffer.find('\x7d')
+            if start != 0: #Throw away anything that isn't the start of an ensemble
+                del receiveBuffer[:start if start > 0 else len(receiveBuffer)]
+                
+            if len(receiveBuffer) < 4: #Header hasn't arrived yet
+                return None
+            
+            byteNum = receiveBuffer[3] << 8 | receiveBuffer[2] #How many bytes in ensemble, not counting the checksum (byte 1 is 0 if using PD4 output format, 1 if using PD5 output format)
+            if ENSEMBLE_BYTE_COUNTS.get(receiveBuffer[1]) != byteNum: #A 0x7D in the middle of the data, don't wait on a byte count it made up
+                del receiveBuffer[:1]
+                self.badEnsembles += 1
+                continue
+            
+            if len(receiveBuffer) < byteNum + 2: #Rest of the ensemble hasn't arrived yet
+                return None
+            
+            if ensembleChecksum(receiveBuffer, byteNum) != receiveBuffer[byteNum+1] << 8 | receiveBuffer[byteNum]:
+                del receiveBuffer[:1]
+                self.badEnsembles += 1
+                continue
+            
+            ensemble = str(receiveBuffer[:byteNum+2])
+            del receiveBuffer[:byteNum+2]
+            return ensemble
             
     def clearDistanceTraveled(self):
         '''
@@ -215,16 +308,27 @@ class AHRSDummyCommunicator(threading.Thread, data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         while self.runThread:
-            dataPacket = self.unpack()
-            
-            if dataPacket != None:
-                #print dataPacket
-                if dataPacket[2] == 1: #kGetModInfo
-                    self.sendID()
-                    
-                if dataPacket[2] == 4: #kGetData If the frame id is a 4...
-                    self.sendAHRSData()
+            self.handleData()
             
+    def handleData(self):
+        '''
+        Answers a request from the DVL if one is waiting on the port. Called by run or by a serial_reactor when the port becomes readable.
+        
+        **Parameters**: \n
+        * **No Input Parameters** 
+        
+        **Return**: \n
+        * **No Return.**\n
+        '''
+        dataPacket = self.unpack()
+        
+        if dataPacket != None:
+            #print dataPacket
+            if dataPacket[2] == 1: #kGetModInfo
+                self.sendID()
+                
+            if dataPacket[2] == 4: #kGetData If the frame id is a 4...
+                self.sendAHRSData()
     
     
     def sendID(self):
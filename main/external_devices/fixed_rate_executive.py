@@ -0,0 +1,158 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: fixed_rate_executive
+   :synopsis: Runs the navigation loop at a fixed rate, one phase after another.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Every cycle runs the registered phases in order (sense, estimate, plan, actuate, telemetry for the navigation
+              process), then sleeps until the next deadline instead of spinning. Keeps recent execution times of every phase,
+              how late each cycle started (jitter) and how many cycles ran past their deadline. Time comes from a clock object, the
+              monotonic one by default, so setting the system time can't stall or rush the loop, and a SimulatedClock runs it
+              faster than real time.
+'''
+
+import collections
+import main.utility_package.utilities as utilities
+
+class FixedRateExecutive:
+    '''
+    Calls its phases once every 1/*rate* seconds.
+    '''
+    def __init__(self, rate=50, spinTime=0.0005, statsWindow=1000, clock=None):
+        '''
+        Initializes the executive with no phases.
+
+        **Parameters**: \n
+        * **rate** - Cycles per second.
+        * **spinTime** - The last part of the wait, in seconds, that is spent checking the clock instead of sleeping, because
+          sleep can overshoot by about a millisecond.
+        * **statsWindow** - Number of recent cycles the statistics are kept for.
+        * **clock** - Object with now() and sleepUntil(), like utilities.SimulatedClock (defaults to utilities.monotonicClock).
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.period = 1.0/rate
+        self.spinTime = spinTime
+        if clock == None:
+            clock = utilities.monotonicClock
+        self.clock = clock
+
+        self.phases = [] #[name, callback]
+        self.phaseTimes = {} #name: deque of recent execution times in seconds
+        self.cycleTimes = collections.deque(maxlen=statsWindow) #Execution time of all phases together
+        self.jitter = collections.deque(maxlen=statsWindow) #How late each cycle started
+
+        self.statsWindow = statsWindow
+        self.nextDeadline = None
+        self.cycles = 0
+        self.overruns = 0 #Cycles that took longer than the period
+        self.skippedCycles = 0 #Deadlines given up on after an overrun
+
+    def addPhase(self, name, callback):
+        '''
+        Adds a phase to the end of the cycle.
+
+        **Parameters**: \n
+        * **name** - Name used in the report.
+        * **callback** - Function with no parameters.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.phases.append([name, callback])
+        self.phaseTimes[name] = collections.deque(maxlen=self.statsWindow)
+
+    def runCycle(self):
+        '''
+        Waits for the next deadline, then runs every phase once.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if self.nextDeadline == None:
+            self.nextDeadline = self.clock.now()
+        self.waitUntil(self.nextDeadline)
+
+        cycleStartTime = self.clock.now()
+        self.jitter.append(cycleStartTime - self.nextDeadline)
+
+        phaseStartTime = cycleStartTime
+        for name, callback in self.phases:
+            callback()
+            phaseEndTime = self.clock.now()
+            self.phaseTimes[name].append(phaseEndTime - phaseStartTime)
+            phaseStartTime = phaseEndTime
+        self.cycleTimes.append(phaseStartTime - cycleStartTime)
+        self.cycles += 1
+
+        self.nextDeadline += self.period
+        if phaseStartTime > self.nextDeadline:
+            self.overruns += 1
+            missedDeadlines = int((phaseStartTime - self.nextDeadline)/self.period) + 1
+            self.skippedCycles += missedDeadlines - 1
+            self.nextDeadline += missedDeadlines*self.period #Stay on the same grid instead of running cycles back to back to catch up
+
+    def waitUntil(self, deadline):
+        '''
+        Sleeps until just before *deadline*, then checks the clock until it passes.
+
+        **Parameters**: \n
+        * **deadline** - Clock time to wait for.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.clock.sleepUntil(deadline, self.spinTime)
+
+    def percentiles(self, samples, fractions=(0.5, 0.9, 0.99)):
+        '''
+        Percentiles of recent samples.
+
+        **Parameters**: \n
+        * **samples** - Deque of times in seconds.
+        * **fractions** - Which percentiles, 0-1.
+
+        **Returns**: \n
+        * **percentiles** - One time per fraction, plus the maximum (all 0 if there are no samples).\n
+        '''
+        if len(samples) == 0:
+            return [0]*(len(fractions) + 1)
+        sortedSamples = sorted(samples)
+        return [sortedSamples[min(int(fraction*len(sortedSamples)), len(sortedSamples) - 1)] for fraction in fractions] + [sortedSamples[-1]]
+
+    def report(self):
+        '''
+        Statistics of the recent cycles.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **report** - Dictionary with "cycles", "overruns", "skippedCycles", "jitter" and "cycle" ([p50, p90, p99, max] in
+          seconds) and "phases" ([name, [p50, p90, p99, max]] for every phase).\n
+        '''
+        return {"cycles": self.cycles, "overruns": self.overruns, "skippedCycles": self.skippedCycles,
+                "jitter": self.percentiles(self.jitter), "cycle": self.percentiles(self.cycleTimes),
+                "phases": [[name, self.percentiles(self.phaseTimes[name])] for name, callback in self.phases]}
+
+    def printReport(self):
+        '''
+        Prints the statistics as a table in milliseconds.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        report = self.report()
+        print "%d cycles at %.0f Hz, %d overruns, %d cycles skipped" % (report["cycles"], 1.0/self.period, report["overruns"], report["skippedCycles"])
+        print "%-10s %8s %8s %8s %8s" % ("ms", "p50", "p90", "p99", "max")
+        for name, times in report["phases"] + [["cycle", report["cycle"]], ["jitter", report["jitter"]]]:
+            print "%-10s %8.2f %8.2f %8.2f %8.2f" % tuple([name] + [value*1000 for value in times])
@@ -0,0 +1,263 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: gui_commands
+   :synopsis: Versioned binary commands from the GUI to the navigation process, with only the changed fields encoded.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: The GUI used to send its whole command list through the pipe every update and then wait for telemetry, so both
+              processes ran in lockstep and the 108 PID slider values were pickled and applied every time. Now the GUI
+              publishes a numbered binary message only when something changed, with a change mask saying which fields are
+              in it. The navigation process drains everything waiting on the pipe once a cycle, without blocking, applies the
+              changed fields to its copy of the command list, and is told which fields changed so it only reconfigures what
+              it has to. One shot fields (like new mission selector data) survive being coalesced into a newer message.
+'''
+
+import struct
+import cPickle
+
+#Indexes in the command list (index 0, the old mainProcessReadyFlag, is always True and never sent)
+START_VEHICLE = 1
+TURN_OFF_DIRTY_POWER = 2
+MANUAL_MODE_ENABLED = 3
+MISSION_SELECTOR_DATA = 4
+IMAGE_PROC_VALUES = 5
+SET_WAYPOINT = 6
+REMOVE_WAYPOINT = 7
+RESET_DVL = 8
+PID_SLIDER_VALUES = 9
+COMMAND_COUNT = 10
+
+#Field types
+BOOL = 0 #One byte
+DOUBLES = 1 #Count, then that many doubles
+OBJECT = 2 #Length, then a pickle (mission selector data and image processing values don't have a fixed layout)
+
+SCHEMA = [[START_VEHICLE, BOOL], [TURN_OFF_DIRTY_POWER, BOOL], [MANUAL_MODE_ENABLED, BOOL], [MISSION_SELECTOR_DATA, OBJECT],
+          [IMAGE_PROC_VALUES, OBJECT], [SET_WAYPOINT, BOOL], [REMOVE_WAYPOINT, BOOL], [RESET_DVL, BOOL],
+          [PID_SLIDER_VALUES, DOUBLES]] #Bit n of the change mask is SCHEMA[n]
+
+LATCHED_FIELDS = {TURN_OFF_DIRTY_POWER: False, MISSION_SELECTOR_DATA: None, RESET_DVL: False} #One shot fields and their empty value
+
+HEADER = struct.Struct("<IH") #Version, change mask
+BOOL_FORMAT = struct.Struct("<?")
+COUNT_FORMAT = struct.Struct("<H")
+LENGTH_FORMAT = struct.Struct("<I")
+
+def emptyCommands():
+    '''
+    Command list before anything has been received. Every field is None, so the navigation process neither starts nor stops
+    anything until the GUI's first message (which has every field) arrives.
+
+    **Parameters**: \n
+    * **No Input Parameters.**
+
+    **Returns**: \n
+    * **commands** - [True, None, None, ...].\n
+    '''
+    return [True] + [None]*(COMMAND_COUNT - 1)
+
+def encode(version, commands, changeMask):
+    '''
+    Builds a binary command message.
+
+    **Parameters**: \n
+    * **version** - Message number.
+    * **commands** - Full command list.
+    * **changeMask** - Which SCHEMA fields to encode.
+
+    **Returns**: \n
+    * **message** - String.\n
+    '''
+    parts = [HEADER.pack(version, changeMask)]
+    for bit, (field, fieldType) in enumerate(SCHEMA):
+        if not changeMask & (1 << bit):
+            continue
+        value = commands[field]
+        if fieldType == BOOL:
+            parts.append(BOOL_FORMAT.pack(bool(value)))
+        elif fieldType == DOUBLES:
+            parts.append(struct.pack("<H%dd" % len(value), len(value), *value))
+        else:
+            data = cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+            parts.append(LENGTH_FORMAT.pack(len(data)) + data)
+    return "".join(parts)
+
+def decode(message):
+    '''
+    Reads a binary command message.
+
+    **Parameters**: \n
+    * **message** - String from encode.
+
+    **Returns**: \n
+    * **version** - Message number.
+    * **fields** - List of [command list index, value] for every field in the message.\n
+    '''
+    version, changeMask = HEADER.unpack_from(message)
+    offset = HEADER.size
+    fields = []
+    for bit, (field, fieldType) in enumerate(SCHEMA):
+        if not changeMask & (1 << bit):
+            continue
+        if fieldType == BOOL:
+            value = BOOL_FORMAT.unpack_from(message, offset)[0]
+            offset += BOOL_FORMAT.size
+        elif fieldType == DOUBLES:
+            count = COUNT_FORMAT.unpack_from(message, offset)[0]
+            offset += COUNT_FORMAT.size
+            value = list(struct.unpack_from("<%dd" % count, message, offset))
+            offset += 8*count
+        else:
+            length = LENGTH_FORMAT.unpack_from(message, offset)[0]
+            offset += LENGTH_FORMAT.size
+            value = cPickle.loads(message[offset:offset+length])
+            offset += length
+        fields.append([field, value])
+    return version, fields
+
+class CommandPublisher:
+    '''
+    GUI side. Sends the fields of the command list that changed since the last message.
+    '''
+    def __init__(self, connection):
+        '''
+        Initializes the publisher with nothing sent, so the first message has every field.
+
+        **Parameters**: \n
+        * **connection** - Multiprocessing pipe connection to the navigation process.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.connection = connection
+        self.version = 0
+        self.lastCommands = [object()]*COMMAND_COUNT #Never equal to anything
+
+        self.published = 0
+        self.unchanged = 0 #Updates that weren't sent because nothing changed
+        self.fieldsSent = 0
+        self.bytesSent = 0
+
+    def publish(self, commands, force=False):
+        '''
+        Sends the fields of *commands* that changed since the last publish.
+
+        **Parameters**: \n
+        * **commands** - [mainProcessReadyFlag, startVehicle, turnOffDirtyPower, manualModeEnabled, missionSelectorData,
+          imageProcValues, setWaypoint, removeWaypoint, resetDVL, pidSliderValues].
+        * **force** - If True, sends a message even if nothing changed.
+
+        **Returns**: \n
+        * **sent** - True if a message was sent.\n
+        '''
+        changeMask = 0
+        for bit, (field, fieldType) in enumerate(SCHEMA):
+            if commands[field] != self.lastCommands[field]:
+                changeMask |= 1 << bit
+                self.fieldsSent += 1
+        if changeMask == 0 and not force:
+            self.unchanged += 1
+            return False
+
+        self.version += 1
+        message = encode(self.version, commands, changeMask)
+        self.connection.send_bytes(message)
+        self.published += 1
+        self.bytesSent += len(message)
+
+        self.lastCommands = list(commands)
+        for field, emptyValue in LATCHED_FIELDS.iteritems(): #Going back to empty doesn't need to be sent
+            self.lastCommands[field] = emptyValue
+        return True
+
+    def stats(self):
+        '''
+        Counters of the messages published so far.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **stats** - Dictionary with "version", "published", "unchanged", "fieldsSent" and "bytesSent".\n
+        '''
+        return {"version": self.version, "published": self.published, "unchanged": self.unchanged, "fieldsSent": self.fieldsSent,
+                "bytesSent": self.bytesSent}
+
+class CommandReceiver:
+    '''
+    Navigation side. Applies every message waiting on the pipe, without blocking, to its copy of the command list.
+    '''
+    def __init__(self, connection):
+        '''
+        Initializes the receiver with the empty command list.
+
+        **Parameters**: \n
+        * **connection** - Multiprocessing pipe connection from the GUI.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.connection = connection
+        self.commands = emptyCommands()
+        self.version = 0 #Version of the newest message received
+
+        self.received = 0
+        self.coalesced = 0 #Messages applied in the same cycle as a newer one
+        self.dropped = 0 #Versions that never arrived, or arrived out of order
+        self.bytesReceived = 0
+
+    def receive(self):
+        '''
+        Drains the pipe.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **commands** - Command list with every change applied, or None if nothing new arrived. One shot fields are only set
+          in the list they arrived in.
+        * **changedFields** - Set of command list indexes that changed.\n
+        '''
+        changedFields = set()
+        messages = 0
+        while self.connection.poll():
+            message = self.connection.recv_bytes()
+            version, fields = decode(message)
+            self.bytesReceived += len(message)
+            if version <= self.version:
+                self.dropped += 1
+                continue
+            self.dropped += version - self.version - 1
+            self.version = version
+            self.received += 1
+            messages += 1
+
+            for field, value in fields:
+                if field in LATCHED_FIELDS and value == LATCHED_FIELDS[field] and field in changedFields:
+                    continue #Don't let a newer message clear a one shot field before it has been used
+                self.commands[field] = value
+                changedFields.add(field)
+
+        if messages == 0:
+            return None, changedFields
+        self.coalesced += messages - 1
+
+        commands = list(self.commands)
+        for field, emptyValue in LATCHED_FIELDS.iteritems():
+            self.commands[field] = emptyValue
+        return commands, changedFields
+
+    def stats(self):
+        '''
+        Counters of the messages received so far.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **stats** - Dictionary with "version", "received", "coalesced", "dropped" and "bytesReceived".\n
+        '''
+        return {"version": self.version, "received": self.received, "coalesced": self.coalesced, "dropped": self.dropped,
+                "bytesReceived": self.bytesReceived}
@@ -14,6 +14,7 @@ import os, sys
 import threading
 import time
 import socket, select, pickle
+import main.utility_package.utilities as utilities
 
 class controllerResponse(threading.Thread):
     def __init__(self):
@@ -30,7 +31,14 @@ class controllerResponse(threading.Thread):
         self.runThread = True
         self.requestTime = 0.01 #How often I request data packets from device
         self.manualControlEnabled = False
-        self.getList = []
+        self.getList = utilities.RingBuffer(256)
+        
+        UDP_IP = "0.0.0.0"
+        UDP_PORT = 5006
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) # UDP
+        self.sock.bind((UDP_IP, UDP_PORT))# bind local port for receive
+        self.sock.setblocking(0)
+        self.udpControllerFound = False #Once joystick data comes in over UDP, stop looking for a local joystick
         
     def run(self):
         '''
@@ -42,63 +50,83 @@ class controllerResponse(threading.Thread):
         **Returns**: \n
         * **No Returns.**\n
         '''
-        UDP_IP = "0.0.0.0"
-        UDP_PORT = 5006
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) # UDP
-        sock.bind((UDP_IP, UDP_PORT))# bind local port for receive
-        is_readable = [sock]
-        is_writable = []
-        is_error = []
-        r, w, e = select.select(is_readable, is_writable, is_error, 1.0)
-        
         while self.runThread:
+            r, w, e = select.select([self.sock], [], [], self.requestTime)
+            if r:
+                self.handleData()
+            else:
+                self.requestData()
+                
+    def handleData(self):
+        '''
+        Unpickles every joystick UDP packet waiting on the socket and puts it in the instance list attribute. Called by run or by a 
+        serial_reactor when the socket becomes readable.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Returns.**\n
+        '''
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(1024) # buffer size is 1024 bytes
+            except socket.error: #Nothing left on the socket
+                break
             
-            #time.sleep(0.01) #Slows down thread to save some power
-            
+            self.udpControllerFound = True
             if self.manualControlEnabled == True:
-                if r:
-                    data, addr = sock.recvfrom(1024) # buffer size is 1024 bytes
-                    unpickled_data = pickle.loads(data)
-                    name = unpickled_data[0]
-                    axes = unpickled_data[1]
-                    buttons = unpickled_data[2]
-                    hats = unpickled_data[3]
-                    self.getList.append([name, axes, buttons, hats])
-                else:
-                    try:
-                        pygame.init()
-                        pygame.event.get()                  
-                        joystick_count = pygame.joystick.get_count()
-                        # assume first joystick
-                        joystick = pygame.joystick.Joystick(0)
-                        joystick.init()
-                        # Get the name from the OS for the controller/joystick
-                        name = joystick.get_name()
-                        # Usually axis run in pairs, up/down for one, and left/right for the other
-                        num_axes = joystick.get_numaxes()    
-                        num_buttons = joystick.get_numbuttons()
-                        num_hats = joystick.get_numhats()
-                        axes = []
-                        buttons = []
-                        hats = []
-                        
-                        for i in range(num_axes):
-                            axis = joystick.get_axis( i )
-                            axes.append(axis)
-                            
-                        for i in range(num_buttons):
-                            button = joystick.get_button( i )
-                            buttons.append(button)
-                            
-                        for i in range(num_hats):
-                            hat = joystick.get_hat( i )
-                            hats.append(hat)
-                        
-                        time.sleep(self.requestTime)
-                        
-                        self.getList.append([name, axes, buttons, hats])
-                    except:
-                        pass
+                unpickled_data = pickle.loads(data)
+                name = unpickled_data[0]
+                axes = unpickled_data[1]
+                buttons = unpickled_data[2]
+                hats = unpickled_data[3]
+                self.getList.append([name, axes, buttons, hats])
+                
+    def requestData(self):
+        '''
+        Reads a joystick plugged directly into this computer when no joystick data is coming in over UDP. Called by run or by a 
+        serial_reactor timer.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Returns.**\n
+        '''
+        if self.manualControlEnabled == True and self.udpControllerFound == False:
+            try:
+                pygame.init()
+                pygame.event.get()                  
+                joystick_count = pygame.joystick.get_count()
+                # assume first joystick
+                joystick = pygame.joystick.Joystick(0)
+                joystick.init()
+                # Get the name from the OS for the controller/joystick
+                name = joystick.get_name()
+                # Usually axis run in pairs, up/down for one, and left/right for the other
+                num_axes = joystick.get_numaxes()    
+                num_buttons = joystick.get_numbuttons()
+                num_hats = joystick.get_numhats()
+                axes = []
+                buttons = []
+                hats = []
+                
+                for i in range(num_axes):
+                    axis = joystick.get_axis( i )
+                    axes.append(axis)
+                    
+                for i in range(num_buttons):
+                    button = joystick.get_button( i )
+                    buttons.append(button)
+                    
+                for i in range(num_hats):
+                    hat = joystick.get_hat( i )
+                    hats.append(hat)
+                
+                self.getList.append([name, axes, buttons, hats])
+            except:
+                pass
                 
     def updateManualControlMode(self, manualControlEnabled):
         '''
@@ -10,13 +10,18 @@ Copyright 2014, Austin Owens, All rights reserved.
 :Description: Sends and receives data packets to Diver Interaction Board.
 '''
 import data_packet_generator
+import outbound_queue
+import polling_scheduler
 import threading
 import sys
 import time
 
 import main.utility_package.utilities as utilities
 
-reqestTimer = utilities.Timer()
+#Requests that never change are built once, CRC and all, when the module loads (NEED TO CHANGE TO REAL VALUES FOR DIB)
+POWER_STATUS_REQUEST = data_packet_generator.compileFrame(0x25)
+BATTERY1_DATA_REQUEST = data_packet_generator.compileFrame(0x26)
+BATTERY2_DATA_REQUEST = data_packet_generator.compileFrame(0x27)
 
 class DIBDataPackets(data_packet_generator.DataPacket):
     def __init__(self, serialObject):
@@ -30,6 +35,7 @@ class DIBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         self.DIBCom = serialObject
+        self.powerStatusTemplate = data_packet_generator.FrameTemplate(0xC5, 'B') # NEED TO CHANGE TO REAL VALUES FOR DIB
         
     def getPowerStatus(self):
         '''
@@ -42,12 +48,7 @@ class DIBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
 
-        self.clearPacket()
-        self.setByteCount(0x06) # NEED TO CHANGE THESE TO REAL VALUES FOR DIB
-        self.setFrameID(0x25) # NEED TO CHANGE TO REAL VALUES FOR DIB
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.DIBCom)
+        self.sendFrame(self.DIBCom, POWER_STATUS_REQUEST)
         
     def getBattery1Data(self):
         '''
@@ -60,12 +61,7 @@ class DIBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
 
-        self.clearPacket()
-        self.setByteCount(0x06) # NEED TO CHANGE TO REAL VALUES FOR DIB
-        self.setFrameID(0x26) # NEED TO CHANGE TO REAL VALUES FOR DIB
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.DIBCom)
+        self.sendFrame(self.DIBCom, BATTERY1_DATA_REQUEST)
         
     def getBattery2Data(self):
         '''
@@ -78,12 +74,7 @@ class DIBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
 
-        self.clearPacket()
-        self.setByteCount(0x06) # NEED TO CHANGE TO REAL VALUES FOR DIB
-        self.setFrameID(0x27) # NEED TO CHANGE TO REAL VALUES FOR DIB
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.DIBCom)
+        self.sendFrame(self.DIBCom, BATTERY2_DATA_REQUEST)
         
     def setPowerStatus(self, status):
         '''
@@ -96,13 +87,7 @@ class DIBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
 
-        self.clearPacket()
-        self.setByteCount(0x07) # NEED TO CHANGE TO REAL VALUES FOR DIB
-        self.setFrameID(0xC5) # NEED TO CHANGE TO REAL VALUES FOR DIB
-        self.setPayload(status)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.DIBCom)
+        self.sendFrame(self.DIBCom, self.powerStatusTemplate.fill(status), outbound_queue.SAFETY)
 
      
 class DIBResponse(data_packet_generator.DataPacket, threading.Thread):
@@ -136,8 +121,10 @@ class DIBResponse(data_packet_generator.DataPacket, threading.Thread):
         self.lowerFrameIdForAlerts = -1 # NEED TO CHANGE TO REAL VALUES FOR DIB
         self.upperFrameIdForAlerts = -1 # NEED TO CHANGE TO REAL VALUES FOR DIB
         
-        self.alertList = []
-        self.getList = []
+        self.alertList = utilities.RingBuffer(64)
+        self.getList = utilities.RingBuffer(256)
+        
+        self.packetFramer = data_packet_generator.PacketFramer(self.DIBCom)
     
     def run(self, *debug):
         '''
@@ -149,46 +136,64 @@ class DIBResponse(data_packet_generator.DataPacket, threading.Thread):
         **Return**: \n
         * **No Return.**\n
         '''    
+        pollingScheduler = polling_scheduler.PollingScheduler() #Each board keeps its own schedule instead of sharing a module timer
+        pollingScheduler.registerDevice(self.DIBCom, self.pollingCommands())
         while self.runThread:
             
             #time.sleep(0.01) #Slows down thread to save some power
             
-            netRequestTimer = reqestTimer.netTimer(reqestTimer.cpuClockTimeInSeconds())
-            if netRequestTimer >= self.requestTime:
-                if not self.debug:
-                    self.dibDataPackets.getBattery1Data()
-                    self.dibDataPackets.getBattery2Data()
-                    self.dibDataPackets.getPowerStatus()
-                reqestTimer.restartTimer()
+            pollingScheduler.runDue()
 
-            dataPacket = self.unpack() #Reads in data packet
-            if dataPacket != None and dataPacket != [0]:
-                if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
-                    self.alertList.append(dataPacket)
-                else:
-                    self.getList.append(dataPacket)
-    
+            self.handleData()
+                    
+    def pollingCommands(self, name="DIB"):
+        '''
+        Lists the periodic get requests for the DIB so a polling_scheduler can send each one on its own schedule.
+        
+        **Parameters**: \n
+        * **name** - Board name the commands are reported under, like "DIB".
+        
+        **Returns**: \n
+        * **commands** - List of [name, callback, period, priority], empty when debugging.\n
+        '''
+        if self.debug:
+            return []
+        return [[name + ".getPowerStatus", self.dibDataPackets.getPowerStatus, self.requestTime, 0],
+                [name + ".getBattery1Data", self.dibDataPackets.getBattery1Data, self.requestTime, 1],
+                [name + ".getBattery2Data", self.dibDataPackets.getBattery2Data, self.requestTime, 1]]
+                    
+    def handleData(self):
+        '''
+        Reads in every DIB data packet waiting on the port and sorts it into the alert or get list. Called by run or by a serial_reactor
+        when the port becomes readable.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        for dataPacket in self.unpack(): #Reads in every complete data packet waiting on the port
+            if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
+                self.alertList.append(dataPacket)
+            else:
+                self.getList.append(dataPacket)
+                    
     def unpack(self):
         '''
-        Extracts the raw data from the transmission (collects all bytes into array).
+        Reads in every byte waiting on the port with a single read and extracts all of the complete data packets.
         
         **Parameters**: \n
         * **No Input Parameters.**
          
         **Returns**: \n
-        * **self.dataPacketIn** - The raw data transmission.\n
+        * **dataPackets** - List of complete, CRC checked data packets.\n
         '''
         try:
-            if self.DIBCom.inWaiting() != 0:
-                self.dataPacketIn = []
-                self.dataPacketIn.append(ord(self.DIBCom.read()))
-                if self.dataPacketIn[0] >= 6 and self.dataPacketIn[0] <= 16: #If the byte count is between 6 and 16 (this is the min and max range of bytes in a data packet that we have...this could change in the future)
-                    for x in range(1, self.dataPacketIn[0]):
-                        self.dataPacketIn.append(ord(self.DIBCom.read()))
-                    self.dataPacketIn = self.calcCRC32In(self.dataPacketIn)
-                    return self.dataPacketIn
+            return self.packetFramer.read()
         except Exception as msg:
             print "Can't receive data from DIB:", msg
+            return []
             
     def killThread(self):
         '''
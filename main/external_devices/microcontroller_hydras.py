@@ -9,12 +9,15 @@ Copyright 2014, Austin Owens, All rights reserved.
 :Description: Sends and receives data packets to the Hydrophone Direction Analysis System.
 '''
 import data_packet_generator
+import outbound_queue
+import polling_scheduler
 import threading
 import time, sys
 import main.utility_package.utilities as utilities
-import struct
 
-reqestTimer = utilities.Timer()
+#Requests that never change are built once, CRC and all, when the module loads
+PINGER_HEADING1_REQUEST = data_packet_generator.compileFrame(0x62)
+PINGER_HEADING2_REQUEST = data_packet_generator.compileFrame(0x61)
 
 class HydrasDataPackets(data_packet_generator.DataPacket):
     def __init__(self, serialObject):
@@ -28,6 +31,7 @@ class HydrasDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         self.HYDRASCom = serialObject
+        self.initialDataTemplate = data_packet_generator.FrameTemplate(0xF0, 'HB') #Speed of sound (little endian), frequency
         
     def getPingerHeading1(self):
         '''
@@ -40,12 +44,7 @@ class HydrasDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
  
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x62)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.HYDRASCom)
+        self.sendFrame(self.HYDRASCom, PINGER_HEADING1_REQUEST)
          
     def getPingerHeading2(self):
         '''
@@ -58,12 +57,7 @@ class HydrasDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
  
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x61)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.HYDRASCom)
+        self.sendFrame(self.HYDRASCom, PINGER_HEADING2_REQUEST)
         
         
     def setInitialData(self, speedOfSoundInWater, frequency):
@@ -78,14 +72,7 @@ class HydrasDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
  
-        self.clearPacket()
-        self.setByteCount(0x09)
-        self.setFrameID(0xF0)
-        speedOfSoundInWaterToBytes = [int(ord(b)) for b in struct.pack('<H',speedOfSoundInWater)]
-        self.setPayload(speedOfSoundInWaterToBytes[0], speedOfSoundInWaterToBytes[1], frequency)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.HYDRASCom)
+        self.sendFrame(self.HYDRASCom, self.initialDataTemplate.fill(speedOfSoundInWater, frequency), outbound_queue.ACTUATION, 0xF0)
      
 class HydrasResponse(data_packet_generator.DataPacket, threading.Thread):
     def __init__(self, serialObject, *debug):
@@ -123,8 +110,10 @@ class HydrasResponse(data_packet_generator.DataPacket, threading.Thread):
         self.lowerFrameIdForAlerts = -1 #No alerts exist for HYDRAS, thus -1
         self.upperFrameIdForAlerts = -1
         
-        self.alertList = []
-        self.getList = []
+        self.alertList = utilities.RingBuffer(64)
+        self.getList = utilities.RingBuffer(256)
+        
+        self.packetFramer = data_packet_generator.PacketFramer(self.HYDRASCom)
     
     def run(self, *debug):  
         '''
@@ -136,42 +125,60 @@ class HydrasResponse(data_packet_generator.DataPacket, threading.Thread):
         **Return**: \n
         * **No Return.**\n
         ''' 
+        pollingScheduler = polling_scheduler.PollingScheduler() #Each board keeps its own schedule instead of sharing a module timer
+        pollingScheduler.registerDevice(self.HYDRASCom, self.pollingCommands())
         while self.runThread:
-            netRequestTimer = reqestTimer.netTimer(reqestTimer.cpuClockTimeInSeconds())
-            if netRequestTimer >= self.requestTime:
-                if not self.debug:
-                    self.hydrasDataPackets.getPingerHeading1()
-                    self.hydrasDataPackets.getPingerHeading2()
-                reqestTimer.restartTimer()
+            pollingScheduler.runDue()
 
-            dataPacket = self.unpack() #Reads in data packets
-            if dataPacket != None and dataPacket != [0]:
-                if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
-                    self.alertList.append(dataPacket)
-                else:
-                    self.getList.append(dataPacket)
+            self.handleData()
+                    
+    def pollingCommands(self, name="HYDRAS"):
+        '''
+        Lists the periodic get requests for the HYDRAS so a polling_scheduler can send each one on its own schedule.
+        
+        **Parameters**: \n
+        * **name** - Board name the commands are reported under, like "HYDRAS".
+        
+        **Returns**: \n
+        * **commands** - List of [name, callback, period, priority], empty when debugging.\n
+        '''
+        if self.debug:
+            return []
+        return [[name + ".getPingerHeading1", self.hydrasDataPackets.getPingerHeading1, self.requestTime, 1],
+                [name + ".getPingerHeading2", self.hydrasDataPackets.getPingerHeading2, self.requestTime, 1]]
+                    
+    def handleData(self):
+        '''
+        Reads in every HYDRAS data packet waiting on the port and sorts it into the alert or get list. Called by run or by a serial_reactor
+        when the port becomes readable.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        for dataPacket in self.unpack(): #Reads in every complete data packet waiting on the port
+            if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
+                self.alertList.append(dataPacket)
+            else:
+                self.getList.append(dataPacket)
                     
     def unpack(self):
         '''
-        Extracts the raw data from the transmission (collects all bytes into array).
+        Reads in every byte waiting on the port with a single read and extracts all of the complete data packets.
         
         **Parameters**: \n
         * **No Input Parameters.**
          
         **Returns**: \n
-        * **self.dataPacketIn** - The raw data transmission.\n
+        * **dataPackets** - List of complete, CRC checked data packets.\n
         '''
         try:
-            if self.HYDRASCom.inWaiting() != 0:
-                self.dataPacketIn = []
-                self.dataPacketIn.append(ord(self.HYDRASCom.read()))
-                if self.dataPacketIn[0] >= 6 and self.dataPacketIn[0] <= 16: #If the byte count is between 6 and 16 (this is the min and max range of bytes in a data packet that we have...this could change in the future)
-                    for x in range(1, self.dataPacketIn[0]):
-                        self.dataPacketIn.append(ord(self.HYDRASCom.read()))
-                    self.dataPacketIn = self.calcCRC32In(self.dataPacketIn)
-                    return self.dataPacketIn
+            return self.packetFramer.read()
         except Exception as msg:
             print "Can't receive data from HYDRAS:", msg
+            return []
             
     def killThread(self):
         '''
@@ -9,13 +9,96 @@ Copyright 2014, Austin Owens, All rights reserved.
 :Description: Sends and receives data packets to Power Monitoring and Undervoltage Detection Board.
 '''
 import data_packet_generator
+import outbound_queue
+import polling_scheduler
 import threading
 import sys
 import time
 
 import main.utility_package.utilities as utilities
 
-reqestTimer = utilities.Timer()
+#Requests that never change are built once, CRC and all, when the module loads
+POWER_STATUS_REQUEST = data_packet_generator.compileFrame(0x25)
+BATTERY1_DATA_REQUEST = data_packet_generator.compileFrame(0x26)
+BATTERY2_DATA_REQUEST = data_packet_generator.compileFrame(0x27)
+
+#The power status reply ([byteCount, 0x25, status, CRC x4]) has never passed the CRC check, and the bug is either in the PIC's
+#CRC or on this side. Until it is found on the board, the PMUD's framer lets exactly this data packet through when it lines up
+#with the last good one, and counts it.
+POWER_STATUS_EXEMPT_FRAME = [0x25, 7]
+
+BATTERY_VOLTAGE_SCALE = 102.4/65536.0 #Volts per count
+BATTERY_CURRENT_SCALE = (0.1024/65536.0)/0.005 #Amps per count (5 mOhm shunt)
+OVERCURRENT_LIMIT = 18.0 #Amps on either battery that cut power
+OVERCURRENT_RESET = 16.0 #Amps both batteries have to drop below before another trip is recorded
+
+def decodeBatteryData(dataPacket):
+    '''
+    Converts a battery 1 (0x26) or battery 2 (0x27) data packet into voltage and current.
+    
+    **Parameters**: \n
+    * **dataPacket** - [byteCount, frameID, voltage LSB, voltage MSB, current LSB, current MSB, ...].
+    
+    **Returns**: \n
+    * **[voltage, current]** - Volts and amps.\n
+    '''
+    return [((dataPacket[3] << 8) | dataPacket[2])*BATTERY_VOLTAGE_SCALE, ((dataPacket[5] << 8) | dataPacket[4])*BATTERY_CURRENT_SCALE]
+
+class OvercurrentTrip:
+    '''
+    Cuts power as soon as a battery data packet over the current limit arrives, instead of waiting for the main loop to get
+    around to reading it.
+    '''
+    def __init__(self, pmudDataPackets, currentLimit=OVERCURRENT_LIMIT, resetCurrent=OVERCURRENT_RESET):
+        '''
+        Initializes the trip as armed.
+        
+        **Parameters**: \n
+        * **pmudDataPackets** - PMUDDataPackets used to send the power off command.
+        * **currentLimit** - Amps on either battery that cut power.
+        * **resetCurrent** - Amps both batteries have to drop below before the trip is armed again.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.pmudDataPackets = pmudDataPackets
+        self.currentLimit = currentLimit
+        self.resetCurrent = resetCurrent
+        
+        self.tripped = False
+        self.batteryCurrents = {1: 0, 2: 0} #Latest current of each battery
+        self.trips = utilities.RingBuffer(64) #[tripTime, batteryNumber, current, latency] for every trip
+        
+    def check(self, batteryNumber, current, arrivalTime):
+        '''
+        Sends the power off command if *current* is over the limit. Only the first command after the trip is armed is recorded
+        as a trip.
+        
+        **Parameters**: \n
+        * **batteryNumber** - 1 or 2.
+        * **current** - Amps from the battery's latest data packet.
+        * **arrivalTime** - time.time() when the data packet's bytes were read.
+        
+        **Returns**: \n
+        * **True/False** - True if a new trip was recorded.\n
+        '''
+        self.batteryCurrents[batteryNumber] = current
+        
+        if self.tripped:
+            if current >= self.currentLimit:
+                self.pmudDataPackets.setPowerStatus(0) #Still over the limit, the last power off command may have been lost
+            elif max(self.batteryCurrents.values()) < self.resetCurrent:
+                self.tripped = False
+            return False
+        
+        if current >= self.currentLimit:
+            self.pmudDataPackets.setPowerStatus(0)
+            commandTime = time.time()
+            self.tripped = True
+            self.trips.append([commandTime, batteryNumber, current, commandTime - arrivalTime])
+            print "BATTERY %d AT %.1fA, GREATER THAN %.1fA!!! Power cut %.1f ms after the data packet arrived" % (batteryNumber, current, self.currentLimit, (commandTime - arrivalTime)*1000)
+            return True
+        return False
 
 class PMUDDataPackets(data_packet_generator.DataPacket):
     def __init__(self, serialObject):
@@ -29,6 +112,7 @@ class PMUDDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         self.PMUDCom = serialObject
+        self.powerStatusTemplate = data_packet_generator.FrameTemplate(0xC5, 'B')
         
     def getPowerStatus(self):
         '''
@@ -41,12 +125,7 @@ class PMUDDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
 
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x25)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.PMUDCom)
+        self.sendFrame(self.PMUDCom, POWER_STATUS_REQUEST)
         
     def getBattery1Data(self):
         '''
@@ -59,12 +138,7 @@ class PMUDDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
 
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x26)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.PMUDCom)
+        self.sendFrame(self.PMUDCom, BATTERY1_DATA_REQUEST)
         
     def getBattery2Data(self):
         '''
@@ -77,12 +151,7 @@ class PMUDDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
 
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x27)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.PMUDCom)
+        self.sendFrame(self.PMUDCom, BATTERY2_DATA_REQUEST)
         
     def setPowerStatus(self, status):
         '''
@@ -95,13 +164,7 @@ class PMUDDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
 
-        self.clearPacket()
-        self.setByteCount(0x07)
-        self.setFrameID(0xC5)
-        self.setPayload(status)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.PMUDCom)
+        self.sendFrame(self.PMUDCom, self.powerStatusTemplate.fill(status), outbound_queue.SAFETY)
 
      
 class PMUDResponse(data_packet_generator.DataPacket, threading.Thread):
@@ -119,6 +182,7 @@ class PMUDResponse(data_packet_generator.DataPacket, threading.Thread):
         
         self.PMUDCom = serialObject
         self.pmudDataPackets = PMUDDataPackets(self.PMUDCom)
+        self.overcurrentTrip = OvercurrentTrip(self.pmudDataPackets) #Checked as battery data packets arrive, not when the main loop reads them
         
         self.requestTime = 0.5
         
@@ -135,8 +199,10 @@ class PMUDResponse(data_packet_generator.DataPacket, threading.Thread):
         self.lowerFrameIdForAlerts = -1
         self.upperFrameIdForAlerts = -1
         
-        self.alertList = []
-        self.getList = []
+        self.alertList = utilities.RingBuffer(64)
+        self.getList = utilities.RingBuffer(256)
+        
+        self.packetFramer = data_packet_generator.PacketFramer(self.PMUDCom, crcExemptFrame=POWER_STATUS_EXEMPT_FRAME)
     
     def run(self, *debug):
         '''
@@ -148,46 +214,67 @@ class PMUDResponse(data_packet_generator.DataPacket, threading.Thread):
         **Return**: \n
         * **No Return.**\n
         '''    
+        pollingScheduler = polling_scheduler.PollingScheduler() #Each board keeps its own schedule instead of sharing a module timer
+        pollingScheduler.registerDevice(self.PMUDCom, self.pollingCommands())
         while self.runThread:
             
             #time.sleep(0.01) #Slows down thread to save some power
             
-            netRequestTimer = reqestTimer.netTimer(reqestTimer.cpuClockTimeInSeconds())
-            if netRequestTimer >= self.requestTime:
-                if not self.debug:
-                    self.pmudDataPackets.getBattery1Data()
-                    self.pmudDataPackets.getBattery2Data()
-                    self.pmudDataPackets.getPowerStatus()
-                reqestTimer.restartTimer()
+            pollingScheduler.runDue()
 
-            dataPacket = self.unpack() #Reads in data packet
-            if dataPacket != None and dataPacket != [0]:
-                if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
-                    self.alertList.append(dataPacket)
-                else:
-                    self.getList.append(dataPacket)
-    
+            self.handleData()
+                    
+    def pollingCommands(self, name="PMUD"):
+        '''
+        Lists the periodic get requests for the PMUD so a polling_scheduler can send each one on its own schedule.
+        
+        **Parameters**: \n
+        * **name** - Board name the commands are reported under, like "PMUD".
+        
+        **Returns**: \n
+        * **commands** - List of [name, callback, period, priority], empty when debugging.\n
+        '''
+        if self.debug:
+            return []
+        return [[name + ".getPowerStatus", self.pmudDataPackets.getPowerStatus, self.requestTime, 0],
+                [name + ".getBattery1Data", self.pmudDataPackets.getBattery1Data, self.requestTime, 1],
+                [name + ".getBattery2Data", self.pmudDataPackets.getBattery2Data, self.requestTime, 1]]
+                    
+    def handleData(self):
+        '''
+        Reads in every PMUD data packet waiting on the port and sorts it into the alert or get list. Battery currents are checked
+        against the overcurrent trip right here. Called by run or by a serial_reactor when the port becomes readable.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        arrivalTime = time.time()
+        for dataPacket in self.unpack(): #Reads in every complete data packet waiting on the port
+            if dataPacket[1] == 0x26 or dataPacket[1] == 0x27:
+                self.overcurrentTrip.check(dataPacket[1] - 0x25, decodeBatteryData(dataPacket)[1], arrivalTime)
+            if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
+                self.alertList.append(dataPacket)
+            else:
+                self.getList.append(dataPacket)
+                    
     def unpack(self):
         '''
-        Extracts the raw data from the transmission (collects all bytes into array).
+        Reads in every byte waiting on the port with a single read and extracts all of the complete data packets.
         
         **Parameters**: \n
         * **No Input Parameters.**
          
         **Returns**: \n
-        * **self.dataPacketIn** - The raw data transmission.\n
+        * **dataPackets** - List of complete, CRC checked data packets.\n
         '''
         try:
-            if self.PMUDCom.inWaiting() != 0:
-                self.dataPacketIn = []
-                self.dataPacketIn.append(ord(self.PMUDCom.read()))
-                if self.dataPacketIn[0] >= 6 and self.dataPacketIn[0] <= 16: #If the byte count is between 6 and 16 (this is the min and max range of bytes in a data packet that we have...this could change in the future)
-                    for x in range(1, self.dataPacketIn[0]):
-                        self.dataPacketIn.append(ord(self.PMUDCom.read()))
-                    self.dataPacketIn = self.calcCRC32In(self.dataPacketIn)
-                    return self.dataPacketIn
+            return self.packetFramer.read()
         except Exception as msg:
             print "Can't receive data from PMUD:", msg
+            return []
             
     def killThread(self):
         '''
@@ -14,11 +14,16 @@ Copyright 2014, Austin Owens, All rights reserved.
 :Description: Sends and receives data packets to Sensor Interface Board.
 '''
 import data_packet_generator
+import polling_scheduler
 import threading
 import time, sys
 import main.utility_package.utilities as utilities
 
-reqestTimer = utilities.Timer()
+#Requests that never change are built once, CRC and all, when the module loads
+ANALOG_EXTERNAL_PRESSURE_REQUEST = data_packet_generator.compileFrame(0x6F)
+DIGITAL_TEMPERATURE_REQUEST = data_packet_generator.compileFrame(0x6A)
+DIGITAL_INTERNAL_PRESSURE_REQUEST = data_packet_generator.compileFrame(0x6B)
+DIGITAL_INTERNAL_HUMIDITY_REQUEST = data_packet_generator.compileFrame(0x6C)
 
 class SIBDataPackets(data_packet_generator.DataPacket):
     def __init__(self, serialObject):
@@ -82,12 +87,7 @@ class SIBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x6F)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.SIBCom)
+        self.sendFrame(self.SIBCom, ANALOG_EXTERNAL_PRESSURE_REQUEST)
         
     def getDigitalTemperature(self):
         '''
@@ -100,12 +100,7 @@ class SIBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x6A)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.SIBCom)
+        self.sendFrame(self.SIBCom, DIGITAL_TEMPERATURE_REQUEST)
         
     def getDigitalInternalPressure(self):
         '''
@@ -118,12 +113,7 @@ class SIBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x6B)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.SIBCom)
+        self.sendFrame(self.SIBCom, DIGITAL_INTERNAL_PRESSURE_REQUEST)
         
     def getDigitalInternalHumidity(self):
         '''
@@ -136,12 +126,7 @@ class SIBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x6C)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.SIBCom)
+        self.sendFrame(self.SIBCom, DIGITAL_INTERNAL_HUMIDITY_REQUEST)
     '''    
     def getTemperature(self):
         Sends get request for the temperature.
@@ -211,7 +196,8 @@ class SIBResponse(data_packet_generator.DataPacket, threading.Thread):
         
         self.sibDataPackets = SIBDataPackets(self.SIBCom)
         
-        self.requestTime = 0.1
+        self.requestTime = 0.1 #Depth
+        self.slowRequestTime = 1.0 #Temperature, internal pressure and humidity change slowly
         
         if len(debug):
             if debug[0].pop() == True:
@@ -226,8 +212,11 @@ class SIBResponse(data_packet_generator.DataPacket, threading.Thread):
         self.lowerFrameIdForAlerts = -1 #No alerts exist for SIB, thus -1
         self.upperFrameIdForAlerts = -1
         
-        self.alertList = []
-        self.getList = []
+        self.alertList = utilities.RingBuffer(64)
+        self.getList = utilities.RingBuffer(256)
+        self.latestData = dict((frameID, utilities.LatestValue()) for frameID in range(106, 112)) #Newest data packet for each sensor frame ID
+        
+        self.packetFramer = data_packet_generator.PacketFramer(self.SIBCom)
     
     def run(self):
         '''
@@ -239,52 +228,67 @@ class SIBResponse(data_packet_generator.DataPacket, threading.Thread):
         **Return**: \n
         * **No Return.**\n
         '''
+        pollingScheduler = polling_scheduler.PollingScheduler() #Each board keeps its own schedule instead of sharing a module timer
+        pollingScheduler.registerDevice(self.SIBCom, self.pollingCommands())
         while self.runThread:
             
             #time.sleep(0.01) #Slows down thread to save some power
             
-            netRequestTimer = reqestTimer.netTimer(reqestTimer.cpuClockTimeInSeconds())
-            if netRequestTimer >= self.requestTime:
-                if not self.debug:
-                    '''self.sibDataPackets.getExternalPressure()
-                    self.sibDataPackets.getInternalPressure()
-                    self.sibDataPackets.getTemperature()
-                    self.sibDataPackets.getAnalogTemperature()'''
-                    self.sibDataPackets.getAnalogExternalPressure()
-                    #self.sibDataPackets.getAnalogInternalPressure()
-                    self.sibDataPackets.getDigitalTemperature()
-                    self.sibDataPackets.getDigitalInternalPressure()
-                    self.sibDataPackets.getDigitalInternalHumidity()
-                reqestTimer.restartTimer()
+            pollingScheduler.runDue()
 
-            dataPacket = self.unpack() #Reads in data packets
-            if dataPacket != None and dataPacket != [0]:
-                if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
-                    self.alertList.append(dataPacket)
-                else:
-                    self.getList.append(dataPacket)
+            self.handleData()
+                    
+    def pollingCommands(self, name="SIB"):
+        '''
+        Lists the periodic get requests for the SIB so a polling_scheduler can send each one on its own schedule.
+        
+        **Parameters**: \n
+        * **name** - Board name the commands are reported under, like "SIB".
+        
+        **Returns**: \n
+        * **commands** - List of [name, callback, period, priority], empty when debugging.\n
+        '''
+        if self.debug:
+            return []
+        return [[name + ".getAnalogExternalPressure", self.sibDataPackets.getAnalogExternalPressure, self.requestTime, 0], #Depth
+                [name + ".getDigitalInternalHumidity", self.sibDataPackets.getDigitalInternalHumidity, self.slowRequestTime, 1], #Leaks
+                [name + ".getDigitalInternalPressure", self.sibDataPackets.getDigitalInternalPressure, self.slowRequestTime, 2],
+                [name + ".getDigitalTemperature", self.sibDataPackets.getDigitalTemperature, self.slowRequestTime, 2]]
+                    
+    def handleData(self):
+        '''
+        Reads in every SIB data packet waiting on the port, sorts it into the alert or get list and puts sensor frames in their 
+        mailbox. Called by run or by a serial_reactor when the port becomes readable.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        for dataPacket in self.unpack(): #Reads in every complete data packet waiting on the port
+            if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
+                self.alertList.append(dataPacket)
+            else:
+                self.getList.append(dataPacket)
+                if dataPacket[1] in self.latestData:
+                    self.latestData[dataPacket[1]].put(dataPacket)
                     
     def unpack(self):
         '''
-        Extracts the raw data from the transmission (collects all bytes into array).
+        Reads in every byte waiting on the port with a single read and extracts all of the complete data packets.
         
         **Parameters**: \n
         * **No Input Parameters.**
          
         **Returns**: \n
-        * **self.dataPacketIn** - The raw data transmission.\n
+        * **dataPackets** - List of complete, CRC checked data packets.\n
         '''
         try:
-            if self.SIBCom.inWaiting() != 0:
-                self.dataPacketIn = []
-                self.dataPacketIn.append(ord(self.SIBCom.read()))
-                if self.dataPacketIn[0] >= 6 and self.dataPacketIn[0] <= 16: #If the byte count is between 6 and 16 (this is the min and max range of bytes in a data packet that we have...this could change in the future)
-                    for x in range(1, self.dataPacketIn[0]):
-                        self.dataPacketIn.append(ord(self.SIBCom.read()))
-                    self.dataPacketIn = self.calcCRC32In(self.dataPacketIn)
-                    return self.dataPacketIn
+            return self.packetFramer.read()
         except Exception as msg:
             print "Can't receive data from SIB:", msg
+            return []
             
     def killThread(self):
         '''
@@ -10,11 +10,181 @@ Copyright 2014, Austin Owens, All rights reserved.
 '''
 
 import data_packet_generator
+import outbound_queue
+import polling_scheduler
 import threading
 import time, sys
 import main.utility_package.utilities as utilities
 
-reqestTimer = utilities.Timer()
+#Requests that never change are built once, CRC and all, when the module loads
+MOTOR_DATA_REQUESTS = dict((motorNum, data_packet_generator.compileFrame(motorNum)) for motorNum in range(1, 5))
+
+SET_ALL_MOTORS_FRAME_ID = 0xA5 #Direction and speed of all four motors in one data packet (simulated TCB only so far)
+
+class ThrusterOutputStage:
+    '''
+    Sends a TCB only the motor speeds that changed. Keeps track of the speed last sent and the speed the TCB last reported back
+    (acknowledged) for every motor, and resends a speed that was never acknowledged.
+    '''
+    def __init__(self, tcbDataPackets, setAllSupported=False, resendTime=1.0):
+        '''
+        Initializes the output stage with every motor unknown, so the first update sends everything.
+        
+        **Parameters**: \n
+        * **tcbDataPackets** - TCBDataPackets the speeds are sent with.
+        * **setAllSupported** - True if the TCB firmware understands the SET_ALL_MOTORS_FRAME_ID data packet.
+        * **resendTime** - Seconds to wait for a sent speed to be acknowledged before sending it again (longer than the motor 
+          data polling period).
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.tcbDataPackets = tcbDataPackets
+        self.setAllSupported = setAllSupported
+        self.resendTime = resendTime
+        
+        self.sentPwm = [None]*4 #Signed PWM, negative is reverse
+        self.sentTime = [0]*4
+        self.acknowledgedPwm = [None]*4
+        
+        self.motorUpdatesSent = 0
+        self.motorUpdatesSkipped = 0 #Motor speeds that didn't need to be sent
+        
+    def update(self, thrusterPWMs, currentTime=None):
+        '''
+        Sends the speeds of the motors whose PWM differs from what the TCB has, all in one data packet if more than one 
+        changed and the TCB supports it.
+        
+        **Parameters**: \n
+        * **thrusterPWMs** - Signed PWM of motors 1-4, negative is reverse.
+        * **currentTime** - time.time() (defaults to now).
+        
+        **Returns**: \n
+        * **dataPacketsSent** - Number of data packets sent.\n
+        '''
+        if currentTime == None:
+            currentTime = time.time()
+        
+        changedMotors = []
+        for motorIndex in range(4):
+            pwm = thrusterPWMs[motorIndex]
+            if pwm == self.sentPwm[motorIndex]: #Compared with the last speed sent, an older acknowledgement can be for a speed since replaced
+                if pwm == self.acknowledgedPwm[motorIndex] or currentTime - self.sentTime[motorIndex] < self.resendTime: #Acknowledged, or sent and waiting on the acknowledgement
+                    continue
+            changedMotors.append(motorIndex)
+        self.motorUpdatesSkipped += 4 - len(changedMotors)
+        
+        if len(changedMotors) == 0:
+            return 0
+        if self.setAllSupported and len(changedMotors) > 1:
+            self.tcbDataPackets.setAllMotorDirectionSpeed(thrusterPWMs)
+            return 1
+        for motorIndex in changedMotors:
+            pwm = thrusterPWMs[motorIndex]
+            self.tcbDataPackets.setMotorDirectionSpeed(motorIndex+1, pwm < 0, abs(pwm))
+        return len(changedMotors)
+        
+    def sent(self, motorIndex, pwm, currentTime):
+        '''
+        Records a speed sent to the TCB. Called by TCBDataPackets for every set, so speeds sent directly are tracked too.
+        
+        **Parameters**: \n
+        * **motorIndex** - Motor 0-3.
+        * **pwm** - Signed PWM, negative is reverse.
+        * **currentTime** - time.time() when it was sent.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if pwm != self.sentPwm[motorIndex]: #An acknowledgement of an older speed doesn't say the TCB has this one
+            self.acknowledgedPwm[motorIndex] = None
+        self.sentPwm[motorIndex] = pwm
+        self.sentTime[motorIndex] = currentTime
+        self.motorUpdatesSent += 1
+        
+    def acknowledge(self, dataPacket, currentTime=None):
+        '''
+        Records the desired speed the TCB reported in a motor data packet. If it doesn't match what was sent a while ago, the
+        set was lost and the next update sends it again.
+        
+        **Parameters**: \n
+        * **dataPacket** - Motor data packet [byteCount, frameID (1-4), desired direction, actual direction, desired PWM, ...].
+        * **currentTime** - time.time() (defaults to now).
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if currentTime == None:
+            currentTime = time.time()
+        motorIndex = dataPacket[1] - 1
+        pwm = -dataPacket[4] if dataPacket[2] == 1 else dataPacket[4]
+        self.acknowledgedPwm[motorIndex] = pwm
+        if pwm != self.sentPwm[motorIndex] and currentTime - self.sentTime[motorIndex] >= self.resendTime/2.0: #Not just a reply to a get sent before the set
+            self.sentPwm[motorIndex] = None
+
+class TCBTelemetryTable:
+    '''
+    Motor state of every TCB in one table, [desired PWM, actual PWM, hall effect sensor] per motor with the direction as the sign
+    of the PWM. Motor data packets are decoded straight into it, and the nested list the rest of the code uses is only rebuilt
+    when a new data packet arrived.
+    '''
+    def __init__(self, boardCount=2):
+        '''
+        Initializes every motor to 0.
+        
+        **Parameters**: \n
+        * **boardCount** - Number of TCBs (4 motors each).
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.boardCount = boardCount
+        self.motors = [[0, 0, 0] for row in range(4*boardCount)] #TCB1 motors 1-4, then TCB2 motors 1-4...
+        self.rows = dict(((board, motorNum), 4*board + motorNum - 1) for board in range(boardCount) for motorNum in range(1, 5)) #(board, frame ID): row
+        
+        self.dirty = True #New data since the payload was last built
+        self.cachedPayload = None
+        self.dataPacketsDecoded = 0
+        self.payloadsBuilt = 0
+        
+    def decode(self, board, dataPacket):
+        '''
+        Decodes a TCB data packet into the table if it is motor data.
+        
+        **Parameters**: \n
+        * **board** - Index of the TCB that sent it (0 for TCB1).
+        * **dataPacket** - [byteCount, frameID, desired direction, actual direction, desired PWM, actual PWM, HES LSB, HES MSB, ...].
+        
+        **Returns**: \n
+        * **decoded** - True if it was motor data.\n
+        '''
+        row = self.rows.get((board, dataPacket[1]))
+        if row == None:
+            return False
+        motor = self.motors[row]
+        motor[0] = -dataPacket[4] if dataPacket[2] == 1 else dataPacket[4]
+        motor[1] = -dataPacket[5] if dataPacket[3] == 1 else dataPacket[5]
+        motor[2] = (dataPacket[7] << 8) | dataPacket[6]
+        self.dirty = True
+        self.dataPacketsDecoded += 1
+        return True
+        
+    def payload(self):
+        '''
+        The motor state of every TCB as nested lists. Only rebuilt if a data packet was decoded since the last call, so don't
+        modify it.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **payload** - [[[desired PWM, actual PWM, hall effect sensor] for motors 1-4] for every TCB].\n
+        '''
+        if self.dirty:
+            self.cachedPayload = [[list(motor) for motor in self.motors[4*board:4*board+4]] for board in range(self.boardCount)]
+            self.dirty = False
+            self.payloadsBuilt += 1
+        return self.cachedPayload
 
 class TCBDataPackets(data_packet_generator.DataPacket):
     def __init__(self, serialObject):
@@ -28,6 +198,9 @@ class TCBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         self.TCBCom = serialObject
+        self.motorDirectionSpeedTemplates = dict((motorNum, data_packet_generator.FrameTemplate(motorNum+160, 'BB')) for motorNum in range(1, 5)) #Sent up to 8 times a control tick, so filled in place
+        self.allMotorsDirectionSpeedTemplate = data_packet_generator.FrameTemplate(SET_ALL_MOTORS_FRAME_ID, '8B')
+        self.outputStage = ThrusterOutputStage(self) #Shared by every movement controller using this TCB
         
     def getMotorData(self, motorNum): #motorNum can only be values from 1-4
         '''
@@ -40,12 +213,7 @@ class TCBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
 
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(motorNum) 
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.TCBCom)
+        self.sendFrame(self.TCBCom, MOTOR_DATA_REQUESTS[motorNum])
         
     def setMotorDirectionSpeed(self, motorNum, direction, speed): #motorNum can only be values from 1-4. speed can only be from 0-255
         '''
@@ -62,14 +230,28 @@ class TCBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         
-
-        self.clearPacket()
-        self.setByteCount(0x08)
-        self.setFrameID(motorNum+160)
-        self.setPayload(direction, speed)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.TCBCom)
+        self.sendFrame(self.TCBCom, self.motorDirectionSpeedTemplates[motorNum].fill(direction, speed),
+                       outbound_queue.ACTUATION, motorNum+160) #Only the newest speed for each motor is sent
+        self.outputStage.sent(motorNum-1, -speed if direction else speed, time.time())
+        
+    def setAllMotorDirectionSpeed(self, thrusterPWMs):
+        '''
+        Sends set request for the direction and speed of all four motors in one data packet. Only use if the TCB firmware 
+        supports SET_ALL_MOTORS_FRAME_ID.
+        
+        **Parameters**: \n
+        * **thrusterPWMs** - Signed PWM of motors 1-4, negative is reverse.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        payload = []
+        for pwm in thrusterPWMs:
+            payload.extend([pwm < 0, abs(pwm)])
+        self.sendFrame(self.TCBCom, self.allMotorsDirectionSpeedTemplate.fill(*payload), outbound_queue.ACTUATION, SET_ALL_MOTORS_FRAME_ID)
+        currentTime = time.time()
+        for motorIndex, pwm in enumerate(thrusterPWMs):
+            self.outputStage.sent(motorIndex, pwm, currentTime)
 
      
 class TCBResponse(data_packet_generator.DataPacket, threading.Thread):
@@ -104,8 +286,10 @@ class TCBResponse(data_packet_generator.DataPacket, threading.Thread):
         self.lowerFrameIdForAlerts = -1 #No alerts exist for TCB, thus -1
         self.upperFrameIdForAlerts = -1
         
-        self.alertList = []
-        self.getList = []
+        self.alertList = utilities.RingBuffer(64)
+        self.getList = utilities.RingBuffer(256)
+        
+        self.packetFramer = data_packet_generator.PacketFramer(self.TCBCom)
     
     def run(self):
         '''
@@ -118,47 +302,63 @@ class TCBResponse(data_packet_generator.DataPacket, threading.Thread):
         * **No Return.**\n
         '''
         
+        pollingScheduler = polling_scheduler.PollingScheduler() #Each board keeps its own schedule instead of sharing a module timer
+        pollingScheduler.registerDevice(self.TCBCom, self.pollingCommands())
         while self.runThread:
             
             #time.sleep(0.01) #Slows down thread to save some power
             
-            netRequestTimer = reqestTimer.netTimer(reqestTimer.cpuClockTimeInSeconds())
-            if netRequestTimer >= self.requestTime:
-                if not self.debug:
-                    self.tcbDataPackets.getMotorData(1)
-                    self.tcbDataPackets.getMotorData(2)
-                    self.tcbDataPackets.getMotorData(3)
-                    self.tcbDataPackets.getMotorData(4) 
-                reqestTimer.restartTimer()
-                
-            dataPacket = self.unpack() #Reads in data packets
-            if dataPacket != None and dataPacket != [0]:
-                if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
-                    self.alertList.append(dataPacket)
-                else:
-                    self.getList.append(dataPacket)
+            pollingScheduler.runDue()
+
+            self.handleData()
+                    
+    def pollingCommands(self, name="TCB"):
+        '''
+        Lists the periodic get requests for the TCB so a polling_scheduler can send each one on its own schedule.
+        
+        **Parameters**: \n
+        * **name** - Board name the commands are reported under, like "TCB1".
+        
+        **Returns**: \n
+        * **commands** - List of [name, callback, period, priority], empty when debugging.\n
+        '''
+        if self.debug:
+            return []
+        return [["%s.getMotorData%d" % (name, motorNum), lambda motorNum=motorNum: self.tcbDataPackets.getMotorData(motorNum), self.requestTime, 1]
+                for motorNum in range(1, 5)]
+                    
+    def handleData(self):
+        '''
+        Reads in every TCB data packet waiting on the port and sorts it into the alert or get list. Called by run or by a serial_reactor
+        when the port becomes readable.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        for dataPacket in self.unpack(): #Reads in every complete data packet waiting on the port
+            if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
+                self.alertList.append(dataPacket)
+            else:
+                self.getList.append(dataPacket)
                     
     def unpack(self):
         '''
-        Extracts the raw data from the transmission (collects all bytes into array).
+        Reads in every byte waiting on the port with a single read and extracts all of the complete data packets.
         
         **Parameters**: \n
         * **No Input Parameters.**
          
         **Returns**: \n
-        * **self.dataPacketIn** - The raw data transmission.\n
+        * **dataPackets** - List of complete, CRC checked data packets.\n
         '''
         try:
-            if self.TCBCom.inWaiting() != 0:
-                self.dataPacketIn = []
-                self.dataPacketIn.append(ord(self.TCBCom.read()))
-                if self.dataPacketIn[0] >= 6 and self.dataPacketIn[0] <= 16: #If the byte count is between 6 and 16 (this is the min and max range of bytes in a data packet that we have...this could change in the future)
-                    for x in range(1, self.dataPacketIn[0]):
-                        self.dataPacketIn.append(ord(self.TCBCom.read()))
-                    self.dataPacketIn = self.calcCRC32In(self.dataPacketIn)
-                    return self.dataPacketIn
+            return self.packetFramer.read()
         except Exception as msg:
             print "Can't receive data from TCB:", msg
+            return []
             
     def killThread(self):
         '''
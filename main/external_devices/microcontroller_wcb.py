@@ -10,13 +10,22 @@ Copyright 2014, Austin Owens, All rights reserved.
 
 '''
 import data_packet_generator
+import outbound_queue
+import polling_scheduler
 import threading
 import time
 import sys
 
 import main.utility_package.utilities as utilities
 
-reqestTimer = utilities.Timer()
+#Requests that never change are built once, CRC and all, when the module loads
+CLAW1_CLOSE_COMMAND = data_packet_generator.compileFrame(0xC1)
+CLAW2_CLOSE_COMMAND = data_packet_generator.compileFrame(0xC2)
+TORPEDO2_LAUNCH_COMMAND = data_packet_generator.compileFrame(0xC4)
+DROPPER1_LAUNCH_COMMAND = data_packet_generator.compileFrame(0xB4)
+DROPPER2_LAUNCH_COMMAND = data_packet_generator.compileFrame(0xC6)
+CLAW1_STATUS_REQUEST = data_packet_generator.compileFrame(0x22)
+CLAW2_STATUS_REQUEST = data_packet_generator.compileFrame(0x23)
 
 f4GettingReset = False
 
@@ -35,6 +44,7 @@ class WCBDataPackets(data_packet_generator.DataPacket):
         * **No Return.**\n
         '''
         self.WCBCom = serialObject
+        self.torpedo1LaunchTemplate = data_packet_generator.FrameTemplate(0xB3, 'B')
         
 #     def setThrustersWeaponsEnablePower(self): #Enabling Power
 #         '''
@@ -187,12 +197,7 @@ class WCBDataPackets(data_packet_generator.DataPacket):
         **Returns**: \n
         * **No Return.**\n
         '''
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0xC1)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.WCBCom)
+        self.sendFrame(self.WCBCom, CLAW1_CLOSE_COMMAND, outbound_queue.ACTUATION)
         
     def setClaw2Close(self):
         '''
@@ -204,12 +209,7 @@ class WCBDataPackets(data_packet_generator.DataPacket):
         **Returns**: \n
         * **No Return.**\n
         '''
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0xC2)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.WCBCom)
+        self.sendFrame(self.WCBCom, CLAW2_CLOSE_COMMAND, outbound_queue.ACTUATION)
     
     def setTorpedo1Launch(self, position):
         '''
@@ -221,13 +221,7 @@ class WCBDataPackets(data_packet_generator.DataPacket):
         **Returns**: \n
         * **No Return.**\n
         '''
-        self.clearPacket()
-        self.setByteCount(0x07)
-        self.setFrameID(0xB3)
-        self.setPayload(position)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.WCBCom)
+        self.sendFrame(self.WCBCom, self.torpedo1LaunchTemplate.fill(position), outbound_queue.ACTUATION)
         
     def setTorpedo2Launch(self):
         '''
@@ -239,12 +233,7 @@ class WCBDataPackets(data_packet_generator.DataPacket):
         **Returns**: \n
         * **No Return.**\n
         '''
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0xC4)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.WCBCom)
+        self.sendFrame(self.WCBCom, TORPEDO2_LAUNCH_COMMAND, outbound_queue.ACTUATION)
         
     def setDropper1Launch(self):
         '''
@@ -256,12 +245,7 @@ class WCBDataPackets(data_packet_generator.DataPacket):
         **Returns**: \n
         * **No Return.**\n
         '''
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0xB4)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.WCBCom)
+        self.sendFrame(self.WCBCom, DROPPER1_LAUNCH_COMMAND, outbound_queue.ACTUATION)
         
     def setDropper2Launch(self):
         '''
@@ -273,12 +257,7 @@ class WCBDataPackets(data_packet_generator.DataPacket):
         **Returns**: \n
         * **No Return.**\n
         '''
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0xC6)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.WCBCom)
+        self.sendFrame(self.WCBCom, DROPPER2_LAUNCH_COMMAND, outbound_queue.ACTUATION)
         
 #     def getDropperStatus(self):
 #         '''
@@ -324,12 +303,7 @@ class WCBDataPackets(data_packet_generator.DataPacket):
         **Returns**: \n
         * **No Return.**\n
         '''
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x22)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.WCBCom)
+        self.sendFrame(self.WCBCom, CLAW1_STATUS_REQUEST)
         
     def getClaw2Status(self):
         '''
@@ -341,12 +315,7 @@ class WCBDataPackets(data_packet_generator.DataPacket):
         **Returns**: \n
         * **No Return.**\n
         '''
-        self.clearPacket()
-        self.setByteCount(0x06)
-        self.setFrameID(0x23)
-        self.calcCRC32Out()
-        self.pack()
-        self.send(self.WCBCom)
+        self.sendFrame(self.WCBCom, CLAW2_STATUS_REQUEST)
  
 #     def getTemperature(self):
 #         '''
@@ -400,12 +369,14 @@ class WCBResponse(data_packet_generator.DataPacket, threading.Thread):
         self.lowerFrameIdForAlerts = -1
         self.upperFrameIdForAlerts = -1
         
-        self.alertList = []
-        self.getList = []
+        self.alertList = utilities.RingBuffer(64)
+        self.latestData = utilities.LatestValue() #Newest get data packet, older ones are never needed
+        
+        self.packetFramer = data_packet_generator.PacketFramer(self.WCBCom)
         
     def run(self, *debug):
         '''
-        Obtains WCB data and appends it to the instance's list attribute.
+        Obtains WCB data and puts it in the instance's alert list or mailbox attribute.
         
         **Parameters**: \n
         * **No Input Parameters** 
@@ -414,54 +385,62 @@ class WCBResponse(data_packet_generator.DataPacket, threading.Thread):
         * **No Return.**\n
         '''    
         
+        pollingScheduler = polling_scheduler.PollingScheduler() #Each board keeps its own schedule instead of sharing a module timer
+        pollingScheduler.registerDevice(self.WCBCom, self.pollingCommands())
         while self.runThread:
             
             #time.sleep(0.01) #Slows down thread to save some power
             
-            netRequestTimer = reqestTimer.netTimer(reqestTimer.cpuClockTimeInSeconds())
-            if netRequestTimer >= self.requestTime:
-                if not self.debug:
-                    try:
-                        self.wcbDataPackets.getBattery1Data()
-                    except:
-                        print 
-                    try:
-                        self.wcbDataPackets.getBattery2Data() 
-                    except:
-                        pass
-                    try:
-                        self.wcbDataPackets.getPowerStatus()
-                    except:
-                        pass
-                reqestTimer.restartTimer()
+            pollingScheduler.runDue()
 
-            dataPacket = self.unpack() #Reads in data packet
-            if dataPacket != None and dataPacket != [0]:
-                if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
-                    self.alertList.append(dataPacket)
-                else:
-                    self.getList.append(dataPacket)
+            self.handleData()
+                    
+    def pollingCommands(self, name="WCB"):
+        '''
+        Lists the periodic get requests for the WCB so a polling_scheduler can send each one on its own schedule.
+        
+        **Parameters**: \n
+        * **name** - Board name the commands are reported under, like "WCB".
+        
+        **Returns**: \n
+        * **commands** - List of [name, callback, period, priority], empty when debugging.\n
+        '''
+        if self.debug:
+            return []
+        return [] #The battery and power getters that used to be polled here belong to the PMUD, and the claw getters are only sent on demand
+                    
+    def handleData(self):
+        '''
+        Reads in every WCB data packet waiting on the port and sorts it into the alert list or mailbox. Called by run or by a serial_reactor
+        when the port becomes readable.
         
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        for dataPacket in self.unpack(): #Reads in every complete data packet waiting on the port
+            if ((dataPacket[1] >= self.lowerFrameIdForAlerts) and (dataPacket[1] <= self.upperFrameIdForAlerts)):
+                self.alertList.append(dataPacket)
+            else:
+                self.latestData.put(dataPacket)
+                    
     def unpack(self):
         '''
-        Extracts the raw data from the transmission.
+        Reads in every byte waiting on the port with a single read and extracts all of the complete data packets.
         
         **Parameters**: \n
         * **No Input Parameters.**
          
         **Returns**: \n
-        * **self.dataPacketIn** - The raw data transmission (collects all bytes into array).\n
+        * **dataPackets** - List of complete, CRC checked data packets.\n
         '''
         try:
-            if self.WCBCom.inWaiting() != 0:
-                self.clearPacket()
-                self.dataPacketIn.append(ord(self.WCBCom.read()))
-                for x in range(1, self.dataPacketIn[0]):
-                    self.dataPacketIn.append(ord(self.WCBCom.read()))
-                self.dataPacketIn = WCBResponse.calcCRC32In(self, self.dataPacketIn)
-                return self.dataPacketIn
+            return self.packetFramer.read()
         except Exception as msg:
             print "Can't receive data from F0. COM port is:", self.WCBCom.isOpen(), "Reason: ", msg
+            return []
     
     def killThread(self):
         '''
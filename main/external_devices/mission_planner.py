@@ -10,6 +10,7 @@ Copyright 2014, Austin Owens, All rights reserved.
 '''
 import main.gui_components.previous_state_logging_system as previous_state_logging_system
 import main.utility_package.utilities as utilities
+import main.external_devices.trajectory as trajectory
 import time
 from main.external_devices.movement import JoystickMovementController,\
     MovementController
@@ -60,6 +61,9 @@ class missions:
         self.desiredMissionPosition = [False, 0, 0, 0]
         
         
+        #Navigation missions follow minimum jerk trajectories to their waypoints instead of jumping the setpoint there
+        self.trajectoryPlanner = trajectory.TrajectoryPlanner()
+        
         #DROPPER EVENT
         self.dropperCounter = 0 #This variable is not in __initializeDropper__() because it needs to be maintained throughout all the events. This counter will let me know how many bins I've gone to so that when I found the one with the lid, I know how many missions to skip
         
@@ -88,6 +92,37 @@ class missions:
         
         self.navigationTimeout = utilities.Timer()
         self.waypointList = missionSelectorData.getParameters("waypoints").waypoints #Will be a 0 if no waypoints are in list
+        self.navigationSegment = None #Trajectory to the waypoint, planned on the first tick of the mission
+        
+    def waypointPose(self, waypointList, waypointName):
+        '''
+        Pose of a logged waypoint in the order trajectories use.
+        
+        **Parameters**: \n
+        * **waypointList** - List of waypoints and their coordinates.
+        * **waypointName** - Name the waypoint was logged under.
+        
+        **Returns**: \n
+        * **pose** - [east, up, north, yaw], using the depth the waypoint was logged at for up.\n
+        '''
+        desiredPosition, desiredOrientation, desiredDepth = waypointList[str(waypointName)]
+        return [desiredPosition[1], desiredDepth, desiredPosition[0], desiredOrientation[0]]
+        
+    def previewNavigationPath(self, startPose, waypointNames, sampleTime=0.1):
+        '''
+        Setpoints the Sub would follow through a list of waypoints, for drawing the mission path in the GUI.
+        
+        **Parameters**: \n
+        * **startPose** - [east, up, north, yaw] the Sub starts at.
+        * **waypointNames** - Names of the waypoints, in mission order.
+        * **sampleTime** - Seconds between samples.
+        
+        **Returns**: \n
+        * **times** - Array of seconds since the start of the path.
+        * **setpoints** - Array with one [east, up, north, yaw] row per time.\n
+        '''
+        poses = [list(startPose)] + [self.waypointPose(self.waypointList, waypointName) for waypointName in waypointNames]
+        return self.trajectoryPlanner.previewPath(poses, sampleTime)
         
     def __initializeBuoys__(self):
         '''
@@ -352,22 +387,29 @@ class missions:
                 #print "Desired Pose: ", desiredPose
                 
                 
+                #TRAJECTORY
+                currentTime = time.time()
+                if self.navigationSegment == None: #Planned once from wherever the Sub is when the mission starts
+                    self.navigationSegment = self.trajectoryPlanner.segment([currentX, currentY, currentZ, currentYaw], [desiredX, desiredY, desiredZ, desiredYaw], currentTime)
+                setpointX, setpointY, setpointZ, setpointYaw = self.navigationSegment.evaluate(currentTime)
+                trajectoryFinished = self.navigationSegment.finished(currentTime)
+                
                 #movementController.faceInWaypointDirection = True
                 #print desiredX, desiredY, desiredZ
-                self.thrusterPWMs, error, desiredMissionYaw = movementController.advancedMove(currentPose, desiredX, desiredY, desiredZ, desiredPitch, desiredYaw, desiredRoll, navigationParams['DrivingMode'])
+                self.thrusterPWMs, error, desiredMissionYaw = movementController.advancedMove(currentPose, setpointX, setpointY, setpointZ, desiredPitch, setpointYaw, desiredRoll, navigationParams['DrivingMode'], [desiredX, desiredY, desiredZ]) #Heading decisions go by the waypoint, not the setpoint
                 
                 xError, yError, zError = error[0], error[1], error[2]
                 pitchError, yawError, rollError = error[3], error[4], error[5]
                 
                 netHoldPositionTimer = self.holdPositionTimer.netTimer(self.holdPositionTimer.cpuClockTimeInSeconds())
                 if navigationParams['IgnoreDesiredOrientation'] == 0:
-                    if abs(xError) < 1 and abs(yError) < 1 and abs(zError) < 1 and abs(pitchError) < 6 and abs(yawError) < 5 and abs(rollError) < 5:
+                    if trajectoryFinished and abs(xError) < 1 and abs(yError) < 1 and abs(zError) < 1 and abs(pitchError) < 6 and abs(yawError) < 5 and abs(rollError) < 5: #Errors are from the setpoint, which is only the waypoint once the trajectory is finished
                         if netHoldPositionTimer >= navigationParams['HoldPositionTimer']:
                             self.missionSuccessful = True
                     else:
                         self.holdPositionTimer.restartTimer()
                 else:
-                    if abs(xError) < 1 and abs(yError) < 1 and abs(zError) < 1:
+                    if trajectoryFinished and abs(xError) < 1 and abs(yError) < 1 and abs(zError) < 1:
                         if netHoldPositionTimer >= navigationParams['HoldPositionTimer']:
                             self.missionSuccessful = True
                     else:
@@ -11,10 +11,10 @@ Copyright 2014, Austin Owens, All rights reserved.
 import main.utility_package.utilities as utilities
 import time
 import math
+import numpy
 
-sendTCBDataTimer = utilities.Timer()
+sendTCBDataTimer = utilities.Deadline()
 noTranslationTimer = utilities.Timer()
-initialTime = time.time()
 
 #TCB = microcontroller.MicrocontrollerDataPackets()
 
@@ -68,6 +68,92 @@ class BrushedThruster():
             self.pwm = pwm
 
 
+class ThrusterMixer():
+    '''
+    Turns a 6 DOF command into thruster PWMs with an allocation matrix built once from every thruster's orientation and 
+    location. When a thruster would go over its maximum PWM, every PWM is scaled down by the same amount instead of clipping 
+    that thruster alone, so the Sub still pushes in the commanded direction, just weaker.
+    '''
+    def __init__(self, thrusters):
+        '''
+        Builds the allocation matrix and its pseudo-inverse.
+        
+        **Parameters**: \n
+        * **thrusters** - BrushedThruster objects, in the order of the PWMs they get.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.thrusters = thrusters
+        self.allocationMatrix = numpy.array([self.allocationRow(thruster) for thruster in thrusters], dtype=float) #One row per thruster, one column per signal
+        self.pseudoInverse = numpy.linalg.pinv(self.allocationMatrix) #PWMs back to the signals they would produce
+        self.maxPwms = numpy.array([thruster.maxPwm for thruster in thrusters], dtype=float)
+        
+        self.mixes = 0
+        self.saturatedMixes = 0 #Mixes that had to be scaled down
+        
+    def allocationRow(self, thruster):
+        '''
+        How much each signal moves one thruster. Same sum the controllers used to work out for every thruster on every move.
+        
+        **Parameters**: \n
+        * **thruster** - BrushedThruster.
+        
+        **Returns**: \n
+        * **row** - Weights of [x, y, z, x rotate, y rotate, z rotate].\n
+        '''
+        orientation, location = thruster.orientation, thruster.location
+        return [-orientation[0], -orientation[1], -orientation[2], orientation[1]*location[2],
+                -orientation[0]*location[2] + orientation[2]*location[0], -orientation[1]*location[0]]
+        
+    def mix(self, signals):
+        '''
+        Thruster PWMs for one command. Also sets every thruster's pwm.
+        
+        **Parameters**: \n
+        * **signals** - [xPwmSignal, yPwmSignal, zPwmSignal, xPwmRotateSignal, yPwmRotateSignal, zPwmRotateSignal].
+        
+        **Returns**: \n
+        * **thrusterPWMs** - List of integer PWMs, one per thruster.\n
+        '''
+        pwms = self.allocationMatrix.dot(signals)
+        peak = (numpy.abs(pwms)/self.maxPwms).max()
+        if peak > 1:
+            pwms /= peak
+            self.saturatedMixes += 1
+        self.mixes += 1
+        
+        thrusterPWMs = [int(pwm) for pwm in pwms]
+        for thruster, pwm in zip(self.thrusters, thrusterPWMs):
+            thruster.pwm = pwm #Already within maxPwm
+        return thrusterPWMs
+        
+    def mixBatch(self, signals):
+        '''
+        Thruster PWMs for many commands at once, for simulations and tuning sweeps. Doesn't touch the thrusters.
+        
+        **Parameters**: \n
+        * **signals** - Array with one row of six signals per command.
+        
+        **Returns**: \n
+        * **thrusterPWMs** - Integer array with one row of PWMs per command.\n
+        '''
+        pwms = numpy.dot(signals, self.allocationMatrix.T)
+        peaks = numpy.maximum((numpy.abs(pwms)/self.maxPwms).max(axis=1), 1)
+        return (pwms/peaks[:, None]).astype(int)
+        
+    def signals(self, thrusterPWMs):
+        '''
+        The command a set of PWMs carries out (least squares if the thrusters can't produce every command).
+        
+        **Parameters**: \n
+        * **thrusterPWMs** - PWMs, one per thruster (or an array with one row per set).
+        
+        **Returns**: \n
+        * **signals** - [x, y, z, x rotate, y rotate, z rotate] (or one row per set).\n
+        '''
+        return numpy.dot(thrusterPWMs, self.pseudoInverse.T)
+
 def autonomousPIDSliderValues(pidValues):
     
     global autonomousSliderValues
@@ -97,7 +183,7 @@ class MovementController():
         self.tcb1DataPackets = TCB1DataPacketsObject
         self.tcb2DataPackets = TCB2DataPacketsObject
         self.thrusters = thrusters
-        self.previousPwm = [0]*len(self.thrusters) #Allows me to keep track of previous PWM values so I don't spam TCB
+        self.mixer = ThrusterMixer(thrusters) #Allocation matrix is only worked out once
         
         advM = utilities.AdvancedMath()
         e1 = advM.e1 #Unit vector for x
@@ -107,59 +193,25 @@ class MovementController():
         self.maxPwm = 204
         self.rotateFirstToggle = False
 
-        '''
-        #PID CONTROLLERS
-        self.yawPIDControllerForwardMode = PIDController(1.5, 2.0, 12, 0.25, -20, 20)
-        self.yawPIDControllerBackwardsMode = PIDController(4, 1.8, 4.5, 0.7, -30, 30)
-        self.pitchPIDController = PIDController(1, 1, 15, 0.1, -5, 5)
-        self.rollPIDController = PIDController(0.3, 0.2, 9, 0.06, -1, 1)
-        self.depthPIDController = PIDController(0.7, 4, 6, 0.1, -2, 2)
-        self.xPIDController = PIDController(0.7, 0.2, 10, 0.5, -1, 1)
-        self.zPIDController = PIDController(0.7, 0.2, 10, 0.5, -1, 1)
-        '''
-        
-        #PID CONTROLLERS
-        '''
-        if autonomousSliderValues =
+        #PID CONTROLLERS (default gains until the GUI sends its slider values)
+        self.pidBank = PIDBank(["yawForwardMode", "yawBackwardsMode", "pitch", "roll", "depth", "x", "z"],
+                               [[1.5, 2.0, 12, 0.25, -20, 20], [4, 1.8, 4.5, 0.7, -30, 30], [1, 1, 15, 0.1, -5, 5], [0.3, 0.2, 9, 0.06, -1, 1],
+                                [0.7, 4, 6, 0.1, -2, 2], [0.7, 0.2, 10, 0.5, -1, 1], [0.7, 0.2, 10, 0.5, -1, 1]], outputLimit=self.maxPwm)
+        self.forwardModeAxes = self.pidBank.axisMask("yawForwardMode", "pitch", "roll", "depth", "x", "z")
+        self.backwardsModeAxes = self.pidBank.axisMask("yawBackwardsMode", "pitch", "roll", "depth", "x", "z")
         
-        self.yawPIDControllerForwardMode = PIDController(autonomousSliderValues[0], autonomousSliderValues[1], autonomousSliderValues[2], autonomousSliderValues[3], -autonomousSliderValues[4], autonomousSliderValues[5])
-        self.yawPIDControllerBackwardsMode = PIDController(autonomousSliderValues[6], autonomousSliderValues[7], autonomousSliderValues[8], autonomousSliderValues[9], -autonomousSliderValues[10], autonomousSliderValues[11])
-        self.pitchPIDController = PIDController(autonomousSliderValues[12], autonomousSliderValues[13], autonomousSliderValues[14], autonomousSliderValues[15], -autonomousSliderValues[16], autonomousSliderValues[17])
-        self.rollPIDController = PIDController(autonomousSliderValues[18], autonomousSliderValues[19], autonomousSliderValues[20], autonomousSliderValues[21], -autonomousSliderValues[22], autonomousSliderValues[23])
-        self.depthPIDController = PIDController(autonomousSliderValues[24], autonomousSliderValues[25], autonomousSliderValues[26], autonomousSliderValues[27], -autonomousSliderValues[28], autonomousSliderValues[29])
-        self.xPIDController = PIDController(autonomousSliderValues[30], autonomousSliderValues[31], autonomousSliderValues[32], autonomousSliderValues[33], -autonomousSliderValues[34], autonomousSliderValues[35])
-        self.zPIDController = PIDController(autonomousSliderValues[36], autonomousSliderValues[37], autonomousSliderValues[38], autonomousSliderValues[39], -autonomousSliderValues[40], autonomousSliderValues[40])
         
-        print "Autonomous: ", self.yawPIDControllerForwardMode, self.yawPIDControllerBackwardsMode, self.pitchPIDController, self.rollPIDController, self.depthPIDController, self.xPIDController, self.zPIDController
+    def setPID(self):
         '''
+        Updates the gains from the autonomous PID sliders. The integrators and derivatives keep their state.
         
-    def setPID(self):
+        **Parameters**: \n
+        * **No Input Parameters.**
         
-        #print "autonomous: ", autonomousSliderValues
-
-        self.yawPIDControllerForwardMode = PIDController(autonomousSliderValues[0], autonomousSliderValues[1],
-                                                         autonomousSliderValues[2], autonomousSliderValues[3],
-                                                         -autonomousSliderValues[4], autonomousSliderValues[5])
-        self.yawPIDControllerBackwardsMode = PIDController(autonomousSliderValues[6], autonomousSliderValues[7],
-                                                           autonomousSliderValues[8], autonomousSliderValues[9],
-                                                           -autonomousSliderValues[10], autonomousSliderValues[11])
-        self.pitchPIDController = PIDController(autonomousSliderValues[12], autonomousSliderValues[13],
-                                                autonomousSliderValues[14], autonomousSliderValues[15],
-                                                -autonomousSliderValues[16], autonomousSliderValues[17])
-        self.rollPIDController = PIDController(autonomousSliderValues[18], autonomousSliderValues[19],
-                                               autonomousSliderValues[20], autonomousSliderValues[21],
-                                               -autonomousSliderValues[22], autonomousSliderValues[23])
-        self.depthPIDController = PIDController(autonomousSliderValues[24], autonomousSliderValues[25],
-                                                autonomousSliderValues[26], autonomousSliderValues[27],
-                                                -autonomousSliderValues[28], autonomousSliderValues[29])
-        self.xPIDController = PIDController(autonomousSliderValues[30], autonomousSliderValues[31],
-                                            autonomousSliderValues[32], autonomousSliderValues[33],
-                                            -autonomousSliderValues[34], autonomousSliderValues[35])
-        self.zPIDController = PIDController(autonomousSliderValues[36], autonomousSliderValues[37],
-                                            autonomousSliderValues[38], autonomousSliderValues[39],
-                                            -autonomousSliderValues[40], autonomousSliderValues[41])
-        
-        #print "Autonomous: ", self.yawPIDControllerForwardMode, self.yawPIDControllerBackwardsMode, self.pitchPIDController, self.rollPIDController, self.depthPIDController, self.xPIDController, self.zPIDController
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.pidBank.setSliderGains(autonomousSliderValues)
 
 
         
@@ -191,39 +243,14 @@ class MovementController():
         **Returns**: \n
         * **thrusterPWMs** - List containing the final PWMs assigned to each thruster.\n
         '''
-        thrusterPWMs = []
-        for index, thruster in enumerate(self.thrusters): #For each thruster object..
-            
-            #This line of code is able to account for any orientation and location of thruster specified. This means that we can have various thruster mounting configurations and the code wont need to change.
-            self.thrusters[index].setPWM(xPwmSignal*-thruster.orientation[0] + yPwmSignal*-thruster.orientation[1] + zPwmSignal*-thruster.orientation[2] + xPwmRotateSignal*thruster.orientation[1]*thruster.location[2] + (yPwmRotateSignal*-thruster.orientation[0]*thruster.location[2] + yPwmRotateSignal*thruster.orientation[2]*thruster.location[0]) + zPwmRotateSignal*-thruster.orientation[1]*thruster.location[0])
-            
-            #Need this list to send over to the GUI to display motor duty cycles
-            thrusterPWMs.append(int(self.thrusters[index].pwm))
-            
-            #print index, xPwmSignal*-thruster.orientation[0], yPwmSignal*-thruster.orientation[1], zPwmSignal*-thruster.orientation[2], xPwmRotateSignal*thruster.orientation[1]*thruster.location[2], (yPwmRotateSignal*-thruster.orientation[0]*thruster.location[2] + yPwmRotateSignal*thruster.orientation[2]*thruster.location[0]), zPwmRotateSignal*-thruster.orientation[1]*thruster.location[0]
-            
-        netSendTCBDataTimer = sendTCBDataTimer.netTimer(sendTCBDataTimer.cpuClockTimeInSeconds())
-        if netSendTCBDataTimer >= 0.05: #Because I send data to fast for TCB to process, I need to send less data to the TCB. This timer slows down data being sent to the TCB so its circular buffer wont overwrite data
-            #If statements are so I don't spam TCB
-            if thrusterPWMs[0] != self.previousPwm[0]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(1, thrusterPWMs[0] < 0, abs(thrusterPWMs[0]))
-            if thrusterPWMs[1] != self.previousPwm[1]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(2, thrusterPWMs[1] < 0, abs(thrusterPWMs[1]))
-            if thrusterPWMs[2] != self.previousPwm[2]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(3, thrusterPWMs[2] < 0, abs(thrusterPWMs[2]))
-            if thrusterPWMs[3] != self.previousPwm[3]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(4, thrusterPWMs[3] < 0, abs(thrusterPWMs[3]))
-            if thrusterPWMs[4] != self.previousPwm[4]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(1, thrusterPWMs[4] < 0, abs(thrusterPWMs[4]))
-            if thrusterPWMs[5] != self.previousPwm[5]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(2, thrusterPWMs[5] < 0, abs(thrusterPWMs[5]))
-            if thrusterPWMs[6] != self.previousPwm[6]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(3, thrusterPWMs[6] < 0, abs(thrusterPWMs[6]))
-            if thrusterPWMs[7] != self.previousPwm[7]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(4, thrusterPWMs[7] < 0, abs(thrusterPWMs[7]))
-                
-            sendTCBDataTimer.restartTimer()
-            self.previousPwm = thrusterPWMs 
+        #The mixer's allocation matrix accounts for any orientation and location of thruster specified, so various thruster mounting configurations work without the code changing.
+        #If a thruster saturates, every PWM is scaled down together so the Sub still moves in the commanded direction
+        thrusterPWMs = self.mixer.mix([xPwmSignal, yPwmSignal, zPwmSignal, xPwmRotateSignal, yPwmRotateSignal, zPwmRotateSignal]) #Also the list sent over to the GUI to display motor duty cycles
+        
+        if sendTCBDataTimer.every(0.05): #Because I send data to fast for TCB to process, I need to send less data to the TCB. This timer slows down data being sent to the TCB so its circular buffer wont overwrite data
+            #The output stages only send the speeds the TCBs don't already have, so I don't spam TCB
+            self.tcb1DataPackets.outputStage.update(thrusterPWMs[0:4])
+            self.tcb2DataPackets.outputStage.update(thrusterPWMs[4:8])
            
         return thrusterPWMs
             
@@ -239,11 +266,13 @@ class MovementController():
         * **xRotateDesired** - Desired pitch.
         * **yRotateDesired** - Desired yaw.
         * **zRotateDesired** - Desired roll.
-        * **userVariables** - Driving mode. 0 is forwards, 1 is backwards.
+        * **userVariables** - Driving mode. 0 is forwards, 1 is backwards. Optionally followed by the [east, up, north] the Sub 
+          is finally headed to, when the desired position is only a setpoint on the way there (like a trajectory), so turning 
+          toward the waypoint and the spin modes go by the waypoint instead of the setpoint.
         
         **Returns**: \n
         * **thrusterPWMs** - List of final PWMs assigned to each thruster.
-        * **[pos[0][0], pos[1][0], pos[2][0], pitchError, yawError, rollError]** - Remaining error in position, pitch, yaw, and roll.
+        * **[pos[0], pos[1], pos[2], pitchError, yawError, rollError]** - Remaining error in position, pitch, yaw, and roll.
         * **yRotateDesired** - Desired yaw.\n
         '''
         yaw, pitch, roll = poseData[0], poseData[1], poseData[2]
@@ -265,59 +294,30 @@ class MovementController():
         northError = northTranslateDesired-northPosition
         
         
-        #TRANSFORMATION MATRICIE
-        T = advM.matrixMultiply(advM.inv(advM.Rot(e2, yaw)), advM.Trans(e1, eastError), advM.Trans(e2, upError), advM.Trans(e3, northError), advM.Rot(e2, yaw))       
-        rot, pos = advM.extractData(T)
-        
-        #X TRANSLATE CONTROLLER
-        xPIDValue = self.xPIDController.PIDControl(pos[0][0], eastScale) 
-        
-        xPwmSignal = int(round(xPIDValue))
-        if xPwmSignal < -self.maxPwm:
-            xPwmSignal = -self.maxPwm
-        elif xPwmSignal > self.maxPwm:
-            xPwmSignal = self.maxPwm
-        
-        #Y TRANSLATE CONTROLLER
-        depthPIDValue = self.depthPIDController.PIDControl(pos[1][0], upScale) 
-        
-        yPwmSignal = int(round(depthPIDValue))
-        if yPwmSignal < -self.maxPwm:
-            yPwmSignal = -self.maxPwm
-        elif yPwmSignal > self.maxPwm:
-            yPwmSignal = self.maxPwm
+        #TRANSFORMATION (same as inv(Rot(e2, yaw))*Trans(e1, eastError)*Trans(e2, upError)*Trans(e3, northError)*Rot(e2, yaw), worked out in closed form)
+        pos = advM.worldToBody(yaw, eastError, upError, northError)
         
-        #Z TRANSLATE CONTROLLER
-        zPIDValue = self.zPIDController.PIDControl(pos[2][0], northScale) 
+        #WAYPOINT ERROR (what the heading decisions go by, the position controllers only chase the setpoint)
+        if len(userVariables) > 1:
+            goalEastError, goalNorthError = userVariables[1][0]-eastPosition, userVariables[1][2]-northPosition
+            goalPos = advM.worldToBody(yaw, goalEastError, 0, goalNorthError)
+        else:
+            goalEastError, goalNorthError, goalPos = eastError, northError, pos
         
-        zPwmSignal = int(round(zPIDValue))
-        if zPwmSignal < -self.maxPwm:
-            zPwmSignal = -self.maxPwm
-        elif zPwmSignal > self.maxPwm:
-            zPwmSignal = self.maxPwm
-            
-            
-        #print "North error:", pos[2][0], " East error:", pos[0][0]
+        #print "North error:", pos[2], " East error:", pos[0]
         
         #PITCH CONTROLLER
         pitchScale = 255.0/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
         pitchError = xRotateDesired-pitch
         
-        pitchPIDValue = self.pitchPIDController.PIDControl(pitchError, pitchScale)
-        
-        pitchPwmSignal = int(round((pitchPIDValue))) 
-        if pitchPwmSignal < -self.maxPwm:
-            pitchPwmSignal = -self.maxPwm
-        elif pitchPwmSignal > self.maxPwm:
-            pitchPwmSignal = self.maxPwm
         
         #YAW CONTROLLER 
         yawScale = self.maxPwm/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
         print yRotateDesired
         #FACE IN WAYPOINT DIRECTION
         corectOrientationBubble = 3.5 #feet
-        if abs(northError) > corectOrientationBubble or abs(eastError) > corectOrientationBubble:
-            yRotateDesired = (math.atan2(eastError, northError)*(180/3.14159265))%360 #Yaw to facing at waypoint
+        if abs(goalNorthError) > corectOrientationBubble or abs(goalEastError) > corectOrientationBubble:
+            yRotateDesired = (math.atan2(goalEastError, goalNorthError)*(180/3.14159265))%360 #Yaw to facing at waypoint
 
         #USER VARIABLE 
         if drivingMode == 1:
@@ -332,52 +332,44 @@ class MovementController():
             yawError = yawError - 360
             
         #USER VARIABLE
-        if abs(pos[0][0]) > 5 or abs(pos[2][0]) > 5:
+        if abs(goalPos[0]) > 5 or abs(goalPos[2]) > 5:
             if drivingMode == 2:
                 yawError = -150 #clockwise
             elif drivingMode == 3:
                 yawError = 150 #Counter clockwise
                 
         
-        if drivingMode == 0:
-            yawPIDValue = self.yawPIDControllerForwardMode.PIDControl(yawError, yawScale)       
+        #ROLL CONTROLLER
+        rollScale = 255.0/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
+
+        if zRotateDesired-roll > 180:
+            rollError = zRotateDesired-roll - 360
+        elif zRotateDesired-roll < -180:
+            rollError = zRotateDesired-roll + 360
+        else:
+            rollError = zRotateDesired-roll 
+        
+        #PID CONTROLLERS (every axis in one call, only the yaw controller for the current driving mode is updated)
         if drivingMode == 1:
-            yawPIDValue = self.yawPIDControllerBackwardsMode.PIDControl(yawError, yawScale)    
+            yawAxis, activeAxes = 1, self.backwardsModeAxes
+        else:
+            yawAxis, activeAxes = 0, self.forwardModeAxes
+        pidValues = self.pidBank.update([yawError, yawError, pitchError, rollError, pos[1], pos[0], pos[2]],
+                                        [yawScale, yawScale, pitchScale, rollScale, upScale, eastScale, northScale], activeAxes)
         
-        yawPwmSignal = int(round(yawPIDValue)) 
-        if yawPwmSignal < -self.maxPwm:
-            yawPwmSignal = -self.maxPwm
-        elif yawPwmSignal > self.maxPwm:
-            yawPwmSignal = self.maxPwm
+        yawPwmSignal = int(round(pidValues[yawAxis]))
+        pitchPwmSignal, rollPwmSignal, yPwmSignal, xPwmSignal, zPwmSignal = [int(round(pidValue)) for pidValue in pidValues[2:]] #Already within maxPwm
             
         
         #FACE IN WAYPOINT DIRECTION  
         
         if drivingMode == 0 or drivingMode == 1: #USER VARIABLE
-            if abs(northError) > corectOrientationBubble or abs(eastError) > corectOrientationBubble:
+            if abs(goalNorthError) > corectOrientationBubble or abs(goalEastError) > corectOrientationBubble:
                 if abs(yawError) >= 5:
                     xPwmSignal = xPwmSignal*0.85
                     zPwmSignal = zPwmSignal*0.85
         
         
-        #ROLL CONTROLLER
-        Kp = 1.5 #Just using a P controller of PID
-        rollScale = 255.0/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
-
-        if zRotateDesired-roll > 180:
-            rollError = zRotateDesired-roll - 360
-        elif zRotateDesired-roll < -180:
-            rollError = zRotateDesired-roll + 360
-        else:
-            rollError = zRotateDesired-roll 
-        
-        rollPIDValue = self.rollPIDController.PIDControl(rollError, rollScale)
-        
-        rollPwmSignal = int(round(rollPIDValue)) 
-        if rollPwmSignal < -self.maxPwm:
-            rollPwmSignal = -self.maxPwm
-        elif rollPwmSignal > self.maxPwm:
-            rollPwmSignal = self.maxPwm
         
         #MOVE
         thrusterPWMs = self.move(xPwmSignal, yPwmSignal, zPwmSignal, pitchPwmSignal, yawPwmSignal, rollPwmSignal)
@@ -385,34 +377,8 @@ class MovementController():
         if yRotateDesired == None:
             print yRotateDesired
         
-        return thrusterPWMs, [pos[0][0], pos[1][0], pos[2][0], pitchError, yawError, rollError], yRotateDesired
-        
-    def trajectoryPlanningAndGeneration(self, desiredPosX, desiredPosY, desiredPosZ, desiredAngleX, desiredAngleY, desiredAngleZ, finalTime, ahrsData):
-        '''
-        Controls the time it takes for thrusters to ramp up.
-        
-        **Parameters**: \n
-        * **desiredPosX** - Desired X position, left or right.
-        * **desiredPosY** - Desired Y position, up or down.
-        * **desiredPosZ** - Desired Z position, front or back.
-        * **desiredAngleX** - Desired yaw.
-        * **desiredAngleY** - Desired pitch.
-        * **desiredAngleZ** - Desired roll.
-        * **finalTime** - Time it takes to ramp up.
-        * **ahrsData** - Orientation data from AHRS.
-        
-        **Returns**: \n
-        * **No Return.**\n
-        '''
-        #This is being tested for now but what i have so far is correct for a cycloid, except probably want to change the while statement
-        yaw, pitch, roll = ahrsData[0], ahrsData[1], ahrsData[2]
-        k = 1
-        incrementalPitchAngle = 0
+        return thrusterPWMs, [pos[0], pos[1], pos[2], pitchError, yawError, rollError], yRotateDesired
         
-        while(incrementalPitchAngle < desiredAngleX):
-            currentTime = time.time()-initialTime
-            incrementalPitchAngle = pitch + (desiredAngleX-pitch)*((currentTime/finalTime)-math.sin((2*k*3.1416*currentTime)/finalTime)/(2*k*3.1416))
-            moveController.advancedMove(0, 0, 0, incrementalPitchAngle, 0, 0, ahrsData)
             
 
 def joystickPIDSliderValues(pidValues):
@@ -442,40 +408,28 @@ class JoystickMovementController():
         self.tcb1DataPackets = TCB1DataPacketsObject
         self.tcb2DataPackets = TCB2DataPacketsObject
         self.thrusters = thrusters
-        self.previousPwm = [0]*len(self.thrusters) #Allows me to keep track of previous PWM values so I don't spam TCB
-        
-        '''
-        #PID CONTROLLERS
-        self.yawPIDControllerForwardMode = PIDController(2.2, 2.0, 21, 0.02, -25, 25)
-        self.pitchPIDController = PIDController(1.75, 0.2, 18, 0.01, -5, 5)
-        self.rollPIDController = PIDController(0.6, 0.2, 9, 0.06, -1, 1)
-        self.depthPIDController = PIDController(0.7, 4, 6, 0.1, -2, 2)
-        '''
-        
-        '''
-        #PID CONTROLLERS
-        self.yawPIDControllerForwardMode = PIDController(joystickSliderValues[0], joystickSliderValues[1], joystickSliderValues[2], joystickSliderValues[3], -joystickSliderValues[4], joystickSliderValues[5])
-        self.pitchPIDController = PIDController(joystickSliderValues[6], joystickSliderValues[7], joystickSliderValues[8], joystickSliderValues[9], -joystickSliderValues[10], joystickSliderValues[11])
-        self.rollPIDController = PIDController(joystickSliderValues[12], joystickSliderValues[13], joystickSliderValues[14], joystickSliderValues[15], -joystickSliderValues[16], joystickSliderValues[17])
-        self.depthPIDController = PIDController(joystickSliderValues[18], joystickSliderValues[19], joystickSliderValues[20], joystickSliderValues[21], -joystickSliderValues[22], joystickSliderValues[23])
+        self.mixer = ThrusterMixer(thrusters) #Allocation matrix is only worked out once
         
-        print "Joystick: ", self.yawPIDControllerForwardMode, self.pitchPIDController, self.rollPIDController, self.depthPIDController
-        '''
         self.maxPwm = 204 #80% duty cycle
+        
+        #PID CONTROLLERS (default gains until the GUI sends its slider values)
+        self.pidBank = PIDBank(["yaw", "pitch", "roll", "depth"],
+                               [[2.2, 2.0, 21, 0.02, -25, 25], [1.75, 0.2, 18, 0.01, -5, 5], [0.6, 0.2, 9, 0.06, -1, 1], [0.7, 4, 6, 0.1, -2, 2]],
+                               outputLimit=self.maxPwm)
+        self.depthAxis = self.pidBank.axisMask("depth")
      
       
     def setPID(self):
+        '''
+        Updates the gains from the joystick PID sliders. The integrators and derivatives keep their state.
         
-        #print "Joystick: ", joystickSliderValues
-        
-        #PID CONTROLLERS
-        self.yawPIDControllerForwardMode = PIDController(joystickSliderValues[0], joystickSliderValues[1], joystickSliderValues[2], joystickSliderValues[3], -joystickSliderValues[4], joystickSliderValues[5])
-        self.pitchPIDController = PIDController(joystickSliderValues[6], joystickSliderValues[7], joystickSliderValues[8], joystickSliderValues[9], -joystickSliderValues[10], joystickSliderValues[11])
-        self.rollPIDController = PIDController(joystickSliderValues[12], joystickSliderValues[13], joystickSliderValues[14], joystickSliderValues[15], -joystickSliderValues[16], joystickSliderValues[17])
-        self.depthPIDController = PIDController(joystickSliderValues[18], joystickSliderValues[19], joystickSliderValues[20], joystickSliderValues[21], -joystickSliderValues[22], joystickSliderValues[23])
+        **Parameters**: \n
+        * **No Input Parameters.**
         
-
-       
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.pidBank.setSliderGains(joystickSliderValues)
         
     def move(self, depth, xPwmSignal, yTranslateDesired, zPwmSignal, xPwmRotateSignal, yPwmRotateSignal, zPwmRotateSignal):
         '''
@@ -496,42 +450,34 @@ class JoystickMovementController():
         yScale = self.maxPwm/2.5
         yError = yTranslateDesired-depth
         
-        depthPIDValue = self.depthPIDController.PIDControl(yError, yScale)  
+        depthPIDValue = self.pidBank.update([0, 0, 0, yError], [0, 0, 0, yScale], self.depthAxis)[3] #Only the depth controller is updated
         yPwmSignal = int(round(depthPIDValue))
         
-        thrusterPWMs = []
-        for index, thruster in enumerate(self.thrusters): #For each thruster object..
-            
-            #This line of code is able to account for any orientation and location of thruster specified. This means that we can have various thruster mounting configurations and the code wont need to change.
-            self.thrusters[index].setPWM(xPwmSignal*-thruster.orientation[0] + yPwmSignal*-thruster.orientation[1] + zPwmSignal*-thruster.orientation[2] + xPwmRotateSignal*thruster.orientation[1]*thruster.location[2] + (yPwmRotateSignal*-thruster.orientation[0]*thruster.location[2] + yPwmRotateSignal*thruster.orientation[2]*thruster.location[0]) + zPwmRotateSignal*-thruster.orientation[1]*thruster.location[0])
-            
-            #Need this list to send over to the GUI to display motor duty cycles
-            thrusterPWMs.append(int(self.thrusters[index].pwm))
-            
-            #print index, xPwmSignal*-thruster.orientation[0], yPwmSignal*-thruster.orientation[1], zPwmSignal*-thruster.orientation[2], xPwmRotateSignal*thruster.orientation[1]*thruster.location[2], (yPwmRotateSignal*-thruster.orientation[0]*thruster.location[2] + yPwmRotateSignal*thruster.orientation[2]*thruster.location[0]), zPwmRotateSignal*-thruster.orientation[1]*thruster.location[0]
-            
-        netSendTCBDataTimer = sendTCBDataTimer.netTimer(sendTCBDataTimer.cpuClockTimeInSeconds())
-        if netSendTCBDataTimer >= 0.05: #Because I send data to fast for TCB to process, I need to send less data to the TCB. This timer slows down data being sent to the TCB so its circular buffer wont overwrite data
-            #If statements are so I don't spam TCB
-            if thrusterPWMs[0] != self.previousPwm[0]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(1, thrusterPWMs[0] < 0, abs(thrusterPWMs[0]))
-            if thrusterPWMs[1] != self.previousPwm[1]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(2, thrusterPWMs[1] < 0, abs(thrusterPWMs[1]))
-            if thrusterPWMs[2] != self.previousPwm[2]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(3, thrusterPWMs[2] < 0, abs(thrusterPWMs[2]))
-            if thrusterPWMs[3] != self.previousPwm[3]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(4, thrusterPWMs[3] < 0, abs(thrusterPWMs[3]))
-            if thrusterPWMs[4] != self.previousPwm[4]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(1, thrusterPWMs[4] < 0, abs(thrusterPWMs[4]))
-            if thrusterPWMs[5] != self.previousPwm[5]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(2, thrusterPWMs[5] < 0, abs(thrusterPWMs[5]))
-            if thrusterPWMs[6] != self.previousPwm[6]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(3, thrusterPWMs[6] < 0, abs(thrusterPWMs[6]))
-            if thrusterPWMs[7] != self.previousPwm[7]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(4, thrusterPWMs[7] < 0, abs(thrusterPWMs[7]))
-                
-            sendTCBDataTimer.restartTimer()
-            self.previousPwm = thrusterPWMs 
+        return self.thrust(xPwmSignal, yPwmSignal, zPwmSignal, xPwmRotateSignal, yPwmRotateSignal, zPwmRotateSignal)
+    
+    def thrust(self, xPwmSignal, yPwmSignal, zPwmSignal, xPwmRotateSignal, yPwmRotateSignal, zPwmRotateSignal):
+        '''
+        Combines the signals into the final PWM for each thruster and sends them to the TCBs.
+        
+        **Parameters**: \n
+        * **xPwmSignal** - Signal to move Sub to its left or right.
+        * **yPwmSignal** - Signal to move Sub up or down.
+        * **zPwmSignal** - Signal to move Sub forward or backward.
+        * **xPwmRotateSignal** - Signal to pitch Sub up or down.
+        * **yPwmRotateSignal** - Signal to rotate Sub clock- or counter-clockwise.
+        * **zPwmRotateSignal** - Signal to roll Sub towards its right or left.
+        
+        **Returns**: \n
+        * **thrusterPWMs** - List containing the final PWMs assigned to each thruster.\n
+        '''
+        #The mixer's allocation matrix accounts for any orientation and location of thruster specified, so various thruster mounting configurations work without the code changing.
+        #If a thruster saturates, every PWM is scaled down together so the Sub still moves in the commanded direction
+        thrusterPWMs = self.mixer.mix([xPwmSignal, yPwmSignal, zPwmSignal, xPwmRotateSignal, yPwmRotateSignal, zPwmRotateSignal]) #Also the list sent over to the GUI to display motor duty cycles
+        
+        if sendTCBDataTimer.every(0.05): #Because I send data to fast for TCB to process, I need to send less data to the TCB. This timer slows down data being sent to the TCB so its circular buffer wont overwrite data
+            #The output stages only send the speeds the TCBs don't already have, so I don't spam TCB
+            self.tcb1DataPackets.outputStage.update(thrusterPWMs[0:4])
+            self.tcb2DataPackets.outputStage.update(thrusterPWMs[4:8])
            
         return thrusterPWMs
             
@@ -557,8 +503,6 @@ class JoystickMovementController():
         pitchScale = self.maxPwm/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
         pitchError = xRotateDesired-pitch
 
-        pitchPIDValue = self.pitchPIDController.PIDControl(pitchError, pitchScale)   
-        pitchPwmSignal = int(round((pitchPIDValue))) 
         
         #YAW CONTROLLER
         yawScale = self.maxPwm/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
@@ -570,8 +514,6 @@ class JoystickMovementController():
         else:
             yawError = yRotateDesired-yaw
           
-        yawPIDValue = self.yawPIDControllerForwardMode.PIDControl(yawError, yawScale)     
-        yawPwmSignal = int(round((yawPIDValue))) 
         
         #ROLL CONTROLLER
         rollScale = self.maxPwm/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
@@ -583,11 +525,16 @@ class JoystickMovementController():
         else:
             rollError = zRotateDesired-roll 
            
-        rollPIDValue = self.rollPIDController.PIDControl(rollError, rollScale)
-        rollPwmSignal = int(round((rollPIDValue))) 
+        #DEPTH CONTROLLER
+        depthScale = self.maxPwm/2.5
+        depthError = yTranslateDesired-depth
+        
+        #PID CONTROLLERS (every axis in one call)
+        pidValues = self.pidBank.update([yawError, pitchError, rollError, depthError], [yawScale, pitchScale, rollScale, depthScale])
+        yawPwmSignal, pitchPwmSignal, rollPwmSignal, yPwmSignal = [int(round(pidValue)) for pidValue in pidValues]
         
         #MOVE
-        thrusterPWMs = self.move(depth, xPwmSignal, yTranslateDesired, zPwmSignal, pitchPwmSignal, yawPwmSignal, rollPwmSignal)
+        thrusterPWMs = self.thrust(xPwmSignal, yPwmSignal, zPwmSignal, pitchPwmSignal, yawPwmSignal, rollPwmSignal)
         
         return thrusterPWMs
 
@@ -619,7 +566,7 @@ class LockedController():
         self.tcb1DataPackets = TCB1DataPacketsObject
         self.tcb2DataPackets = TCB2DataPacketsObject
         self.thrusters = thrusters
-        self.previousPwm = [0]*len(self.thrusters) #Allows me to keep track of previous PWM values so I don't spam TCB
+        self.mixer = ThrusterMixer(thrusters) #Allocation matrix is only worked out once
         
         advM = utilities.AdvancedMath()
         e1 = advM.e1 #Unit vector for x
@@ -629,44 +576,25 @@ class LockedController():
         self.maxPwm = 204
         self.rotateFirstToggle = False
 
-        '''
-        #PID CONTROLLERS
-        self.yawPIDControllerForwardMode = PIDController(1.5, 1.5, 12, 0.25, -20, 20)
-        self.yawPIDControllerBackwardsMode = PIDController(4, 1.8, 4.5, 0.7, -30, 30)
-        self.pitchPIDController = PIDController(1, 1, 15, 0.1, -5, 5)
-        self.rollPIDController = PIDController(0.3, 0.2, 9, 0.06, -1, 1)
-        self.depthPIDController = PIDController(0.7, 4, 6, 0.1, -2, 2)
-        self.xPIDController = PIDController(0.7, 0.2, 10, 0.5, -1, 1)
-        self.zPIDController = PIDController(0.7, 0.2, 10, 0.5, -1, 1)
-        '''
+        #PID CONTROLLERS (default gains until the GUI sends its slider values)
+        self.pidBank = PIDBank(["yawForwardMode", "yawBackwardsMode", "pitch", "roll", "depth", "x", "z"],
+                               [[1.5, 1.5, 12, 0.25, -20, 20], [4, 1.8, 4.5, 0.7, -30, 30], [1, 1, 15, 0.1, -5, 5], [0.3, 0.2, 9, 0.06, -1, 1],
+                                [0.7, 4, 6, 0.1, -2, 2], [0.7, 0.2, 10, 0.5, -1, 1], [0.7, 0.2, 10, 0.5, -1, 1]], outputLimit=self.maxPwm)
+        self.forwardModeAxes = self.pidBank.axisMask("yawForwardMode", "pitch", "roll", "depth", "x", "z")
+        self.backwardsModeAxes = self.pidBank.axisMask("yawBackwardsMode", "pitch", "roll", "depth", "x", "z")
         
         
     def setPID(self):
-
-        # PID CONTROLLERS
-        self.yawPIDControllerForwardMode = PIDController(lockedSliderValues[0], lockedSliderValues[1],
-                                                         lockedSliderValues[2], lockedSliderValues[3],
-                                                         -lockedSliderValues[4], lockedSliderValues[5])
-        self.yawPIDControllerBackwardsMode = PIDController(lockedSliderValues[6], lockedSliderValues[7],
-                                                           lockedSliderValues[8], lockedSliderValues[9],
-                                                           -lockedSliderValues[10], lockedSliderValues[11])
-        self.pitchPIDController = PIDController(lockedSliderValues[12], lockedSliderValues[13],
-                                                lockedSliderValues[14], lockedSliderValues[15],
-                                                -lockedSliderValues[16], lockedSliderValues[17])
-        self.rollPIDController = PIDController(lockedSliderValues[18], lockedSliderValues[19],
-                                               lockedSliderValues[20], lockedSliderValues[21],
-                                               -lockedSliderValues[22], lockedSliderValues[23])
-        self.depthPIDController = PIDController(lockedSliderValues[24], lockedSliderValues[25],
-                                                lockedSliderValues[26], lockedSliderValues[27],
-                                                -lockedSliderValues[28], lockedSliderValues[29])
-        self.xPIDController = PIDController(lockedSliderValues[30], lockedSliderValues[31],
-                                            lockedSliderValues[32], lockedSliderValues[33],
-                                            -lockedSliderValues[34], lockedSliderValues[35])
-        self.zPIDController = PIDController(lockedSliderValues[36], lockedSliderValues[37],
-                                            lockedSliderValues[38], lockedSliderValues[39],
-                                            -lockedSliderValues[40], lockedSliderValues[41])
-
-        #print "Locked: ", lockedSliderValues[35], lockedSliderValues[36], lockedPIDSliderValues[37]
+        '''
+        Updates the gains from the locked PID sliders. The integrators and derivatives keep their state.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.pidBank.setSliderGains(lockedSliderValues)
         
         
     def simpleMove(self, *motorPwms): #Assign thruster pwm by thruster pwm
@@ -697,39 +625,14 @@ class LockedController():
         **Returns**: \n
         * **thrusterPWMs** - List containing the final PWMs assigned to each thruster.\n
         '''
-        thrusterPWMs = []
-        for index, thruster in enumerate(self.thrusters): #For each thruster object..
-            
-            #This line of code is able to account for any orientation and location of thruster specified. This means that we can have various thruster mounting configurations and the code wont need to change.
-            self.thrusters[index].setPWM(xPwmSignal*-thruster.orientation[0] + yPwmSignal*-thruster.orientation[1] + zPwmSignal*-thruster.orientation[2] + xPwmRotateSignal*thruster.orientation[1]*thruster.location[2] + (yPwmRotateSignal*-thruster.orientation[0]*thruster.location[2] + yPwmRotateSignal*thruster.orientation[2]*thruster.location[0]) + zPwmRotateSignal*-thruster.orientation[1]*thruster.location[0])
-            
-            #Need this list to send over to the GUI to display motor duty cycles
-            thrusterPWMs.append(int(self.thrusters[index].pwm))
-            
-            #print index, xPwmSignal*-thruster.orientation[0], yPwmSignal*-thruster.orientation[1], zPwmSignal*-thruster.orientation[2], xPwmRotateSignal*thruster.orientation[1]*thruster.location[2], (yPwmRotateSignal*-thruster.orientation[0]*thruster.location[2] + yPwmRotateSignal*thruster.orientation[2]*thruster.location[0]), zPwmRotateSignal*-thruster.orientation[1]*thruster.location[0]
-            
-        netSendTCBDataTimer = sendTCBDataTimer.netTimer(sendTCBDataTimer.cpuClockTimeInSeconds())
-        if netSendTCBDataTimer >= 0.05: #Because I send data to fast for TCB to process, I need to send less data to the TCB. This timer slows down data being sent to the TCB so its circular buffer wont overwrite data
-            #If statements are so I don't spam TCB
-            if thrusterPWMs[0] != self.previousPwm[0]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(1, thrusterPWMs[0] < 0, abs(thrusterPWMs[0]))
-            if thrusterPWMs[1] != self.previousPwm[1]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(2, thrusterPWMs[1] < 0, abs(thrusterPWMs[1]))
-            if thrusterPWMs[2] != self.previousPwm[2]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(3, thrusterPWMs[2] < 0, abs(thrusterPWMs[2]))
-            if thrusterPWMs[3] != self.previousPwm[3]:
-                self.tcb1DataPackets.setMotorDirectionSpeed(4, thrusterPWMs[3] < 0, abs(thrusterPWMs[3]))
-            if thrusterPWMs[4] != self.previousPwm[4]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(1, thrusterPWMs[4] < 0, abs(thrusterPWMs[4]))
-            if thrusterPWMs[5] != self.previousPwm[5]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(2, thrusterPWMs[5] < 0, abs(thrusterPWMs[5]))
-            if thrusterPWMs[6] != self.previousPwm[6]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(3, thrusterPWMs[6] < 0, abs(thrusterPWMs[6]))
-            if thrusterPWMs[7] != self.previousPwm[7]:
-                self.tcb2DataPackets.setMotorDirectionSpeed(4, thrusterPWMs[7] < 0, abs(thrusterPWMs[7]))
-                
-            sendTCBDataTimer.restartTimer()
-            self.previousPwm = thrusterPWMs 
+        #The mixer's allocation matrix accounts for any orientation and location of thruster specified, so various thruster mounting configurations work without the code changing.
+        #If a thruster saturates, every PWM is scaled down together so the Sub still moves in the commanded direction
+        thrusterPWMs = self.mixer.mix([xPwmSignal, yPwmSignal, zPwmSignal, xPwmRotateSignal, yPwmRotateSignal, zPwmRotateSignal]) #Also the list sent over to the GUI to display motor duty cycles
+        
+        if sendTCBDataTimer.every(0.05): #Because I send data to fast for TCB to process, I need to send less data to the TCB. This timer slows down data being sent to the TCB so its circular buffer wont overwrite data
+            #The output stages only send the speeds the TCBs don't already have, so I don't spam TCB
+            self.tcb1DataPackets.outputStage.update(thrusterPWMs[0:4])
+            self.tcb2DataPackets.outputStage.update(thrusterPWMs[4:8])
            
         return thrusterPWMs
             
@@ -749,7 +652,7 @@ class LockedController():
         
         **Returns**: \n
         * **thrusterPWMs** - List of final PWMs assigned to each thruster.
-        * **[pos[0][0], pos[1][0], pos[2][0], pitchError, yawError, rollError]** - Remaining error in position, pitch, yaw, and roll.
+        * **[pos[0], pos[1], pos[2], pitchError, yawError, rollError]** - Remaining error in position, pitch, yaw, and roll.
         * **yRotateDesired** - Desired yaw.\n
         '''
         yaw, pitch, roll = poseData[0], poseData[1], poseData[2]
@@ -771,51 +674,15 @@ class LockedController():
         northError = northTranslateDesired-northPosition
         
         
-        #TRANSFORMATION MATRICIE
-        T = advM.matrixMultiply(advM.inv(advM.Rot(e2, yaw)), advM.Trans(e1, eastError), advM.Trans(e2, upError), advM.Trans(e3, northError), advM.Rot(e2, yaw))       
-        rot, pos = advM.extractData(T)
-        
-        #X TRANSLATE CONTROLLER
-        xPIDValue = self.xPIDController.PIDControl(pos[0][0], eastScale) 
-        
-        xPwmSignal = int(round(xPIDValue))
-        if xPwmSignal < -self.maxPwm:
-            xPwmSignal = -self.maxPwm
-        elif xPwmSignal > self.maxPwm:
-            xPwmSignal = self.maxPwm
-        
-        #Y TRANSLATE CONTROLLER
-        depthPIDValue = self.depthPIDController.PIDControl(pos[1][0], upScale) 
-        
-        yPwmSignal = int(round(depthPIDValue))
-        if yPwmSignal < -self.maxPwm:
-            yPwmSignal = -self.maxPwm
-        elif yPwmSignal > self.maxPwm:
-            yPwmSignal = self.maxPwm
-        
-        #Z TRANSLATE CONTROLLER
-        zPIDValue = self.zPIDController.PIDControl(pos[2][0], northScale) 
+        #TRANSFORMATION (same as inv(Rot(e2, yaw))*Trans(e1, eastError)*Trans(e2, upError)*Trans(e3, northError)*Rot(e2, yaw), worked out in closed form)
+        pos = advM.worldToBody(yaw, eastError, upError, northError)
         
-        zPwmSignal = int(round(zPIDValue))
-        if zPwmSignal < -self.maxPwm:
-            zPwmSignal = -self.maxPwm
-        elif zPwmSignal > self.maxPwm:
-            zPwmSignal = self.maxPwm
-            
-            
-        #print "North error:", pos[2][0], " East error:", pos[0][0]
+        #print "North error:", pos[2], " East error:", pos[0]
         
         #PITCH CONTROLLER
         pitchScale = 255.0/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
         pitchError = xRotateDesired-pitch
         
-        pitchPIDValue = self.pitchPIDController.PIDControl(pitchError, pitchScale)
-        
-        pitchPwmSignal = int(round((pitchPIDValue))) 
-        if pitchPwmSignal < -self.maxPwm:
-            pitchPwmSignal = -self.maxPwm
-        elif pitchPwmSignal > self.maxPwm:
-            pitchPwmSignal = self.maxPwm
         
         #YAW CONTROLLER 
         yawScale = self.maxPwm/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
@@ -838,23 +705,33 @@ class LockedController():
             yawError = yawError - 360
             
         #USER VARIABLE
-        if abs(pos[0][0]) > 5 or abs(pos[2][0]) > 5:
+        if abs(pos[0]) > 5 or abs(pos[2]) > 5:
             if drivingMode == 2:
                 yawError = -150 #clockwise
             elif drivingMode == 3:
                 yawError = 150 #Counter clockwise
                 
         
-        if drivingMode == 0:
-            yawPIDValue = self.yawPIDControllerForwardMode.PIDControl(yawError, yawScale)       
+        #ROLL CONTROLLER
+        rollScale = 255.0/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
+
+        if zRotateDesired-roll > 180:
+            rollError = zRotateDesired-roll - 360
+        elif zRotateDesired-roll < -180:
+            rollError = zRotateDesired-roll + 360
+        else:
+            rollError = zRotateDesired-roll 
+        
+        #PID CONTROLLERS (every axis in one call, only the yaw controller for the current driving mode is updated)
         if drivingMode == 1:
-            yawPIDValue = self.yawPIDControllerBackwardsMode.PIDControl(yawError, yawScale)    
+            yawAxis, activeAxes = 1, self.backwardsModeAxes
+        else:
+            yawAxis, activeAxes = 0, self.forwardModeAxes
+        pidValues = self.pidBank.update([yawError, yawError, pitchError, rollError, pos[1], pos[0], pos[2]],
+                                        [yawScale, yawScale, pitchScale, rollScale, upScale, eastScale, northScale], activeAxes)
         
-        yawPwmSignal = int(round(yawPIDValue)) 
-        if yawPwmSignal < -self.maxPwm:
-            yawPwmSignal = -self.maxPwm
-        elif yawPwmSignal > self.maxPwm:
-            yawPwmSignal = self.maxPwm
+        yawPwmSignal = int(round(pidValues[yawAxis]))
+        pitchPwmSignal, rollPwmSignal, yPwmSignal, xPwmSignal, zPwmSignal = [int(round(pidValue)) for pidValue in pidValues[2:]] #Already within maxPwm
             
         
         #FACE IN WAYPOINT DIRECTION  
@@ -866,24 +743,6 @@ class LockedController():
                     zPwmSignal = zPwmSignal*0.85
         
         
-        #ROLL CONTROLLER
-        Kp = 1.5 #Just using a P controller of PID
-        rollScale = 255.0/180.0 #180 being the highest value pitchError can be and 255 being the desired range to map to.
-
-        if zRotateDesired-roll > 180:
-            rollError = zRotateDesired-roll - 360
-        elif zRotateDesired-roll < -180:
-            rollError = zRotateDesired-roll + 360
-        else:
-            rollError = zRotateDesired-roll 
-        
-        rollPIDValue = self.rollPIDController.PIDControl(rollError, rollScale)
-        
-        rollPwmSignal = int(round(rollPIDValue)) 
-        if rollPwmSignal < -self.maxPwm:
-            rollPwmSignal = -self.maxPwm
-        elif rollPwmSignal > self.maxPwm:
-            rollPwmSignal = self.maxPwm
             
         if len(userVariables) > 1:
             if userVariables[1][0] == True:
@@ -902,105 +761,157 @@ class LockedController():
             pass
             #print yRotateDesired
         
-        return thrusterPWMs, [pos[0][0], pos[1][0], pos[2][0], pitchError, yawError, rollError], yRotateDesired
+        return thrusterPWMs, [pos[0], pos[1], pos[2], pitchError, yawError, rollError], yRotateDesired
         
-    def trajectoryPlanningAndGeneration(self, desiredPosX, desiredPosY, desiredPosZ, desiredAngleX, desiredAngleY, desiredAngleZ, finalTime, ahrsData):
+            
+class PIDBank():
+    '''
+    Gains and state of several PID controllers (one per axis) kept in NumPy arrays, so every axis is worked out in one call.
+    The integrator and derivative are scaled by the time that actually went by since the last update, every axis keeps
+    its own integrator limits, and changing gains doesn't reset anything.
+    '''
+    def __init__(self, axisNames, gains, period=1/50.0, outputLimit=None, clock=utilities.monotonicTime):
         '''
-        Controls the time it takes for thrusters to ramp up.
-        
+        Initializes the gains and clears the state.
+
         **Parameters**: \n
-        * **desiredPosX** - Desired X position, left or right.
-        * **desiredPosY** - Desired Y position, up or down.
-        * **desiredPosZ** - Desired Z position, front or back.
-        * **desiredAngleX** - Desired yaw.
-        * **desiredAngleY** - Desired pitch.
-        * **desiredAngleZ** - Desired roll.
-        * **finalTime** - Time it takes to ramp up.
-        * **ahrsData** - Orientation data from AHRS.
-        
+        * **axisNames** - Name of every axis, in the order the errors are given.
+        * **gains** - [Kp, Ki, Kd, dControllerTime, integratorMin, integratorMax] for every axis. dControllerTime is the time in
+          seconds the derivative is measured and smoothed over.
+        * **period** - Seconds between updates the gains were tuned for. Every period of error adds one error to the integrator.
+        * **outputLimit** - Outputs are kept between -outputLimit and outputLimit, and an integrator stops growing while its
+          output is stuck at the limit (None for no limit).
+        * **clock** - Function returning the time in seconds (defaults to the monotonic clock, which the system time can't
+          move).
+
         **Returns**: \n
         * **No Return.**\n
         '''
-        #This is being tested for now but what i have so far is correct for a cycloid, except probably want to change the while statement
-        yaw, pitch, roll = ahrsData[0], ahrsData[1], ahrsData[2]
-        k = 1
-        incrementalPitchAngle = 0
-        
-        while(incrementalPitchAngle < desiredAngleX):
-            currentTime = time.time()-initialTime
-            incrementalPitchAngle = pitch + (desiredAngleX-pitch)*((currentTime/finalTime)-math.sin((2*k*3.1416*currentTime)/finalTime)/(2*k*3.1416))
-            moveController.advancedMove(0, 0, 0, incrementalPitchAngle, 0, 0, ahrsData)
-            
-class PIDController():
-    '''
-    Creates customizable PID controller for yaw, pitch, or roll.
-    '''
-    def __init__(self, Kp, Ki, Kd, dControllerTime, integratorMin, integratorMax):
+        self.axisNames = list(axisNames)
+        self.period = period
+        self.maxDt = 5*period #Longer than this since the last update and the state is too old to build on
+        self.outputLimit = outputLimit
+        self.clock = clock
+
+        axisCount = len(self.axisNames)
+        self.gains = numpy.zeros((axisCount, 6))
+        self.Kp, self.Ki, self.Kd = self.gains[:, 0], self.gains[:, 1], self.gains[:, 2] #Views, so setGains updates them in place
+        self.dControllerTime, self.integratorMin, self.integratorMax = self.gains[:, 3], self.gains[:, 4], self.gains[:, 5]
+
+        self.state = numpy.zeros((3, axisCount)) #Integrator, derivative and last error of every axis, saved in one copy
+        self.nextState = numpy.zeros((3, axisCount))
+        self.integrator = self.state[0]
+        self.derivative = self.state[1] #Smoothed rate of change of the scaled error, per second
+        self.lastError = self.state[2]
+        self.primed = numpy.zeros(axisCount, dtype=bool) #False until an axis has a last error to take the derivative from
+        self.lastTime = None
+
+        self.setGains(gains)
+
+    def axisMask(self, *axisNames):
         '''
-        Moves the Sub based on XYZ coordinates and desired yaw, pitch, and roll.
-        
+        Which axes to update, for update's *active*.
+
         **Parameters**: \n
-        * **Kp** - Factor for proportional gain.
-        * **Ki** - Factor for integral or error over time gain.
-        * **Kd** - Factor for dampening
-        * **integratorMin** - Minimum integrator factor.
-        * **integratorMax** - Maximum integrator factor.
-        
+        * **axisNames** - Names of the axes.
+
+        **Returns**: \n
+        * **mask** - Boolean array, True for the named axes.\n
+        '''
+        mask = numpy.zeros(len(self.axisNames), dtype=bool)
+        for axisName in axisNames:
+            mask[self.axisNames.index(axisName)] = True
+        return mask
+
+    def setGains(self, gains):
+        '''
+        Changes the gains in place. Integrators are brought within their new limits, everything else is kept.
+
+        **Parameters**: \n
+        * **gains** - [Kp, Ki, Kd, dControllerTime, integratorMin, integratorMax] for every axis.
+
         **Returns**: \n
         * **No Return.**\n
         '''
-        self.Kp = Kp
-        self.Ki = Ki
-        self.Kd = Kd
-        
-        self.derivator = 0
-        self.integrator = 0
-        self.integratorMin = integratorMin
-        self.integratorMax = integratorMax
-        
-        
-        self.dControllerTimer = utilities.Timer()
-        self.dControllerTime = dControllerTime
-        
-    def PIDControl(self, error, errorScale):
+        self.gains[:] = gains
+        self.derivativeTime = numpy.maximum(self.dControllerTime, self.period) #At least one update
+        self.derivativeGain = self.Kd*self.derivativeTime
+        numpy.clip(self.integrator, self.integratorMin, self.integratorMax, out=self.integrator)
+
+    def setSliderGains(self, sliderValues):
         '''
-        Moves the Sub based on XYZ coordinates and desired yaw, pitch, and roll.
-        
+        Changes the gains from the GUI's PID sliders, which have six values per axis with the integrator minimum as a
+        positive number.
+
         **Parameters**: \n
-        * **error** - How far away the current value is from the desired value.
-        * **errorScale** - The scale for the system being controlled.
-        
+        * **sliderValues** - [Kp, Ki, Kd, dControllerTime, -integratorMin, integratorMax, Kp, ...] in axis order.
+
         **Returns**: \n
-        * **PID** - Signal for the yaw, pitch, or roll.\n
+        * **No Return.**\n
         '''
-        Kp = self.Kp
-        P = Kp*error*errorScale
-        
-        Ki = self.Ki
-        self.integratorMax = 10
-        self.integratorMin = -10
-        self.integrator = self.integrator + error*errorScale
-        if self.integrator > self.integratorMax:
-            self.integrator = self.integratorMax
-        elif self.integrator < self.integratorMin:
-            self.integrator = self.integratorMin
+        gains = numpy.array(sliderValues[:6*len(self.axisNames)], dtype=float).reshape(-1, 6)
+        gains[:, 4] = -gains[:, 4]
+        self.setGains(gains)
 
-        I = self.integrator * Ki
-        
-        
-        Kd = self.Kd
-        D = Kd * (error*errorScale - self.derivator)
+    def reset(self):
+        '''
+        Clears the integrators and derivatives.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.integrator[:] = 0
+        self.derivative[:] = 0
+        self.primed[:] = False
+        self.lastTime = None
+
+    def update(self, errors, errorScales, active=None, dt=None):
+        '''
+        Works out every axis. Axes that aren't active are left exactly as they were, and start their derivative over when
+        they are next used.
+
+        **Parameters**: \n
+        * **errors** - How far away the current value is from the desired value, for every axis.
+        * **errorScales** - The scale for the system being controlled, for every axis.
+        * **active** - Boolean array from axisMask of the axes to update (defaults to all of them).
+        * **dt** - Seconds since the last update (defaults to measuring it with the clock).
+
+        **Returns**: \n
+        * **PID** - Array with the signal of every axis.\n
+        '''
+        currentTime = self.clock()
+        if dt == None and self.lastTime != None:
+            dt = currentTime - self.lastTime
+        self.lastTime = currentTime
+        if dt == None or dt <= 0 or dt > self.maxDt: #First update, the clock went backwards, or the controllers sat unused
+            dt = self.period
+            self.primed[:] = False
+
+        integrator, derivative, error = self.nextState
+        numpy.multiply(errors, errorScales, out=error)
+        numpy.clip(self.integrator + error*(dt/self.period), self.integratorMin, self.integratorMax, out=integrator)
+        rate = (error - self.lastError)*(self.primed/dt)
+        numpy.add(self.derivative, numpy.minimum(dt/self.derivativeTime, 1)*(rate - self.derivative), out=derivative) #Low pass filter
+
+        D = self.derivativeGain*derivative #Change in error over dControllerTime
+        PID = self.Kp*error + self.Ki*integrator + D
+        if self.outputLimit != None and numpy.abs(PID).max() > self.outputLimit:
+            windup = (numpy.abs(PID) > self.outputLimit) & (error*PID > 0) #Integrating would only push further past the limit
+            numpy.copyto(integrator, numpy.clip(self.integrator, self.integratorMin, self.integratorMax), where=windup)
+            PID = numpy.clip(self.Kp*error + self.Ki*integrator + D, -self.outputLimit, self.outputLimit)
+
+        if active is None:
+            self.state[:] = self.nextState
+            self.primed[:] = True
+        else:
+            numpy.copyto(self.state, self.nextState, where=active)
+            self.primed[:] = active
+
+        return PID
 
-        netDControllerTimer = self.dControllerTimer.netTimer(self.dControllerTimer.cpuClockTimeInSeconds())
-        if netDControllerTimer >= self.dControllerTime:
-            self.derivator = error*errorScale
-            self.dControllerTimer.restartTimer()
-            
-            
-        PID = P+I+D
-        
-        return PID        
-    
 
 if __name__=="__main__":
     thruster1 = BrushedThruster(1, [0, 1, 0], [1, 0, 1])  #Up/Down thruster
@@ -1017,4 +928,3 @@ if __name__=="__main__":
     #moveController.simpleMove(255, 255, 255, 255, 0, 0, 0, 0)
     #moveController.move(0, 60, 0, 50, 0, 25)
     moveController.advancedMove(0, 0, 0, 40, 0, 0, [0, 20, 0])
-    #moveController.trajectoryPlanningAndGeneration(0, 0, 0, 10, 0, 0, 2, [0, 0, 0])
@@ -0,0 +1,166 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: orientation_voter
+   :synopsis: Votes one orientation out of any number of AHRS.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Takes the latest [heading, pitch, roll] of every AHRS along with when it arrived. Sensors that haven't sent
+              anything recently are left out, the heading is the circular median (the sample with the smallest total angular
+              distance to the others, so 359 and 1 degrees are 2 degrees apart) and pitch and roll are plain medians. A sensor
+              that disagrees with the vote by more than the outlier threshold is left out and the vote is taken again. Angular
+              distances are wrap-around differences instead of trig, and how far every sensor is from the vote is kept so a
+              failing AHRS can be spotted. Plain lists are used on purpose: with 3 or 4 sensors the overhead of every NumPy call
+              is bigger than the work, and building arrays every tick made the old three-sensor median slower than this.
+'''
+
+import time
+
+def angleDifference(angle1, angle2):
+    '''
+    Distance between two headings, going the short way around.
+
+    **Parameters**: \n
+    * **angle1** - Degrees.
+    * **angle2** - Degrees.
+
+    **Returns**: \n
+    * **difference** - Degrees from 0 to 180.\n
+    '''
+    return abs((angle1 - angle2 + 180) % 360 - 180)
+
+class OrientationVoter:
+    '''
+    Circular median heading and median pitch and roll of N AHRS.
+    '''
+    def __init__(self, sensorCount=3, staleTime=0.5, outlierThreshold=20.0):
+        '''
+        Initializes the voter.
+
+        **Parameters**: \n
+        * **sensorCount** - Number of AHRS.
+        * **staleTime** - Seconds without a new sample before a sensor is left out.
+        * **outlierThreshold** - Degrees a sensor's heading, pitch or roll can be from the vote before it is left out.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.sensorCount = sensorCount
+        self.staleTime = staleTime
+        self.outlierThreshold = outlierThreshold
+
+        self.disagreement = [[0, 0, 0] for sensor in range(sensorCount)] #Latest [heading, pitch, roll] distance of every sensor from the vote in degrees
+        self.disagreementSum = [[0, 0, 0] for sensor in range(sensorCount)]
+        self.disagreementMax = [[0, 0, 0] for sensor in range(sensorCount)]
+        self.staleCount = [0]*sensorCount #Votes each sensor was left out of for being stale
+        self.outlierCount = [0]*sensorCount #Votes each sensor was left out of for disagreeing
+        self.votes = 0
+
+    def vote(self, samples, timestamps=None, currentTime=None):
+        '''
+        Votes one orientation.
+
+        **Parameters**: \n
+        * **samples** - List of [heading, pitch, roll] in degrees, one per AHRS.
+        * **timestamps** - When each sample arrived (None if it never did). Defaults to every sample being current.
+        * **currentTime** - time.time() (defaults to now).
+
+        **Returns**: \n
+        * **orientation** - [heading, pitch, roll] in degrees.\n
+        '''
+        used = range(self.sensorCount)
+        if timestamps != None:
+            if currentTime == None:
+                currentTime = time.time()
+            fresh = [sensor for sensor in used if timestamps[sensor] != None and currentTime - timestamps[sensor] <= self.staleTime]
+            for sensor in used:
+                if sensor not in fresh:
+                    self.staleCount[sensor] += 1
+            if len(fresh) > 0: #Better to vote with old data than to have no orientation at all
+                used = fresh
+
+        orientation = self.median(samples, used)
+        disagreement = self.distances(samples, orientation)
+        inliers = [sensor for sensor in used if max(disagreement[sensor]) <= self.outlierThreshold]
+        if len(inliers) > 0 and len(inliers) < len(used): #Vote again without the outliers
+            for sensor in used:
+                if sensor not in inliers:
+                    self.outlierCount[sensor] += 1
+            orientation = self.median(samples, inliers)
+            disagreement = self.distances(samples, orientation)
+
+        self.disagreement = disagreement
+        for sensor in range(self.sensorCount):
+            for axis in range(3):
+                self.disagreementSum[sensor][axis] += disagreement[sensor][axis]
+                if disagreement[sensor][axis] > self.disagreementMax[sensor][axis]:
+                    self.disagreementMax[sensor][axis] = disagreement[sensor][axis]
+        self.votes += 1
+        return orientation
+
+    def median(self, samples, used):
+        '''
+        Circular median heading and median pitch and roll of the sensors in *used*.
+
+        **Parameters**: \n
+        * **samples** - List of [heading, pitch, roll], one per sensor.
+        * **used** - Indexes of the sensors to vote with.
+
+        **Returns**: \n
+        * **orientation** - [heading, pitch, roll].\n
+        '''
+        bestHeading, bestDistance = None, None
+        for sensor in used:
+            heading = samples[sensor][0]
+            totalDistance = sum(angleDifference(heading, samples[other][0]) for other in used)
+            if bestDistance == None or totalDistance < bestDistance:
+                bestHeading, bestDistance = heading, totalDistance
+
+        count = len(used)
+        pitches = sorted(samples[sensor][1] for sensor in used)
+        rolls = sorted(samples[sensor][2] for sensor in used)
+        return [bestHeading, (pitches[(count - 1)//2] + pitches[count//2])/2.0, (rolls[(count - 1)//2] + rolls[count//2])/2.0] #Middle value, or the mean of the two middle values
+
+    def distances(self, samples, orientation):
+        '''
+        How far every sensor is from an orientation.
+
+        **Parameters**: \n
+        * **samples** - List of [heading, pitch, roll], one per sensor.
+        * **orientation** - [heading, pitch, roll].
+
+        **Returns**: \n
+        * **distances** - List of [heading, pitch, roll] distances in degrees, one per sensor.\n
+        '''
+        return [[angleDifference(heading, orientation[0]), abs(pitch - orientation[1]), abs(roll - orientation[2])]
+                for heading, pitch, roll in samples]
+
+    def report(self):
+        '''
+        How far every sensor has been from the vote.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **report** - List of [meanDisagreement, maxDisagreement, staleCount, outlierCount] per sensor, where the
+          disagreements are [heading, pitch, roll] in degrees.\n
+        '''
+        votes = float(max(self.votes, 1))
+        return [[[total/votes for total in self.disagreementSum[sensor]], list(self.disagreementMax[sensor]), self.staleCount[sensor],
+                 self.outlierCount[sensor]] for sensor in range(self.sensorCount)]
+
+    def printReport(self):
+        '''
+        Prints the report as a table.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        print "%-6s %24s %24s %6s %8s" % ("AHRS", "mean heading/pitch/roll", "max heading/pitch/roll", "stale", "outlier")
+        for sensor, (meanDisagreement, maxDisagreement, staleCount, outlierCount) in enumerate(self.report()):
+            print "%-6d %8.2f%8.2f%8.2f %8.2f%8.2f%8.2f %6d %8d" % tuple([sensor + 1] + meanDisagreement + maxDisagreement + [staleCount, outlierCount])
@@ -0,0 +1,171 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: outbound_queue
+   :synopsis: Per serial port queue of data packets waiting to be sent, ordered by priority.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Wraps a serial object so it can be handed to the DataPackets and Response classes in its place. Data packets sent
+              with DataPacket.sendFrame are queued by priority class (safety, then actuation, then telemetry polling) instead
+              of being written by whichever thread sent them. A newer actuation data packet for the same motor replaces the one
+              still waiting, and everything waiting is sent with a single write when the queue is flushed. Safety data packets
+              flush the queue right away. Reads and everything else are passed through to the serial object.
+'''
+
+import time
+import threading
+import collections
+
+SAFETY = 0 #Power off, sent as soon as it is queued
+ACTUATION = 1 #Thruster speeds, weapons
+TELEMETRY = 2 #Get requests
+PRIORITY_NAMES = ["safety", "actuation", "telemetry"]
+
+class OutboundQueue(object): #New style so special methods (hash, comparisons) aren't passed through by __getattr__
+    '''
+    Queue of data packets for one serial port. Thread safe, so the navigation loop and the serial_reactor can both send.
+    '''
+    def __init__(self, serialObject):
+        '''
+        Initializes an empty queue.
+
+        **Parameters**: \n
+        * **serialObject** - Serial object the data packets are written to.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.serialObject = serialObject
+        self.lock = threading.Lock()
+
+        self.queues = [collections.OrderedDict() for priority in PRIORITY_NAMES] #coalesceKey: [frame, queueTime] for every priority
+        self.entryNumber = 0 #Key for data packets that are never coalesced
+
+        self.writes = 0
+        self.bytesWritten = 0
+        self.writeErrors = 0
+        self.coalesced = [0]*len(PRIORITY_NAMES) #Data packets replaced by a newer one before they were sent
+        self.maxDepth = [0]*len(PRIORITY_NAMES)
+        self.sentCount = [0]*len(PRIORITY_NAMES)
+        self.totalQueueTime = [0.0]*len(PRIORITY_NAMES)
+        self.maxQueueTime = [0.0]*len(PRIORITY_NAMES)
+
+    def __getattr__(self, name):
+        '''
+        Passes everything the queue doesn't handle itself (read, inWaiting, fileno, getPort...) through to the serial object.
+
+        **Parameters**: \n
+        * **name** - Attribute name.
+
+        **Returns**: \n
+        * **attribute** - The serial object's attribute.\n
+        '''
+        if name == "serialObject": #Not set yet, don't recurse
+            raise AttributeError(name)
+        return getattr(self.serialObject, name)
+
+    def enqueue(self, frame, priority=TELEMETRY, coalesceKey=None):
+        '''
+        Queues a data packet to be sent on the next flush.
+
+        **Parameters**: \n
+        * **frame** - Complete data packet (string or bytearray, copied so FrameTemplate buffers can be refilled).
+        * **priority** - SAFETY, ACTUATION or TELEMETRY.
+        * **coalesceKey** - Data packets with the same key and priority replace each other while waiting, so only the newest is
+          sent (usually the frame ID of a set command). None to always send.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        with self.lock:
+            queue = self.queues[priority]
+            if coalesceKey == None:
+                coalesceKey = self.entryNumber
+                self.entryNumber += 1
+            if coalesceKey in queue:
+                queue[coalesceKey][0] = str(frame) #Keeps its place in line and how long it has been waiting
+                self.coalesced[priority] += 1
+            else:
+                queue[coalesceKey] = [str(frame), time.time()]
+                self.maxDepth[priority] = max(self.maxDepth[priority], len(queue))
+
+        if priority == SAFETY:
+            self.flush()
+
+    def write(self, data):
+        '''
+        Queues *data* as telemetry, so code that writes straight to the serial object still goes through the queue.
+
+        **Parameters**: \n
+        * **data** - String or bytearray.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.enqueue(data)
+
+    def flush(self):
+        '''
+        Sends everything waiting, highest priority first, with a single write.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        with self.lock:
+            if not any(self.queues):
+                return
+            currentTime = time.time()
+            frames = []
+            for priority, queue in enumerate(self.queues):
+                for frame, queueTime in queue.itervalues():
+                    frames.append(frame)
+                    queueTime = currentTime - queueTime
+                    self.totalQueueTime[priority] += queueTime
+                    self.maxQueueTime[priority] = max(self.maxQueueTime[priority], queueTime)
+                self.sentCount[priority] += len(queue)
+                queue.clear()
+            batch = "".join(frames)
+
+            try:
+                self.serialObject.write(batch)
+                self.writes += 1
+                self.bytesWritten += len(batch)
+            except Exception as msg:
+                self.writeErrors += 1
+                print "Serial timeout on port:", self.serialObject.getPort(), msg
+
+    def depth(self):
+        '''
+        Number of data packets waiting in each priority class.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **depth** - [safety, actuation, telemetry].\n
+        '''
+        return [len(queue) for queue in self.queues]
+
+    def stats(self):
+        '''
+        Queue depth and time in queue for each priority class.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **stats** - Dictionary of priority name: {"depth", "maxDepth", "sent", "coalesced", "meanQueueTime", "maxQueueTime"},
+          plus "writes", "bytesWritten" and "writeErrors".\n
+        '''
+        with self.lock:
+            stats = {"writes": self.writes, "bytesWritten": self.bytesWritten, "writeErrors": self.writeErrors}
+            for priority, name in enumerate(PRIORITY_NAMES):
+                stats[name] = {"depth": len(self.queues[priority]), "maxDepth": self.maxDepth[priority], "sent": self.sentCount[priority],
+                               "coalesced": self.coalesced[priority],
+                               "meanQueueTime": self.totalQueueTime[priority]/max(self.sentCount[priority], 1),
+                               "maxQueueTime": self.maxQueueTime[priority]}
+            return stats
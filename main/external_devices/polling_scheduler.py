@@ -0,0 +1,239 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: polling_scheduler
+   :synopsis: Sends every board's periodic get requests on their own schedule.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Each board registers its getter commands with their own period and priority. The first request of every command
+              on a port is staggered across the port's shortest period and requests on the same port are kept at least
+              *portSpacing* apart, so a port never gets a burst of requests at once. Keeps track of the rate each command is
+              actually sent at so it can be compared against the rate it was registered with.
+'''
+
+import time
+import heapq
+
+class PolledCommand:
+    '''
+    One getter command and how well it has kept to its schedule.
+    '''
+    def __init__(self, name, callback, period, priority, port, deadline):
+        '''
+        Initializes the command's schedule and statistics.
+
+        **Parameters**: \n
+        * **name** - Name used in the report, like "TCB1.getMotorData1".
+        * **callback** - Function with no parameters that sends the request.
+        * **period** - Time in seconds between requests.
+        * **priority** - Lower numbers are sent first when several commands are due at once.
+        * **port** - Serial object the request is sent on.
+        * **deadline** - How late, in seconds, a request can be sent before it counts as a missed deadline.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.name = name
+        self.callback = callback
+        self.period = period
+        self.priority = priority
+        self.port = port
+        self.deadline = deadline
+
+        self.phase = 0 #Offset in seconds of the first request, so commands on the same port don't go out together
+        self.dueTime = 0 #When the next request is scheduled
+
+        self.sendCount = 0
+        self.errors = 0
+        self.missedDeadlines = 0
+        self.maxLateness = 0
+        self.reportSendCount = 0 #Requests sent since the last report
+
+class PollingScheduler:
+    '''
+    Sends registered getter commands when they are due. Called by a serial_reactor, or by a response thread's run.
+    '''
+    def __init__(self, portSpacing=0.005):
+        '''
+        Initializes the scheduler with nothing registered.
+
+        **Parameters**: \n
+        * **portSpacing** - Shortest time in seconds between two requests on the same port (a 7 byte request takes about
+          7 ms at 9600 baud).
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.portSpacing = portSpacing
+
+        self.commands = []
+        self.portCommands = {} #port: [PolledCommand, ...]
+        self.portSendTime = {} #port: time the last request went out on it
+        self.queue = [] #Heap of [sendTime, commandNumber, PolledCommand]
+        self.commandNumber = 0
+
+        self.reportTime = time.time()
+
+    def registerDevice(self, port, commands):
+        '''
+        Registers every getter command of a board.
+
+        **Parameters**: \n
+        * **port** - Serial object the board's requests are sent on.
+        * **commands** - List of [name, callback, period, priority] from the response's pollingCommands.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        for name, callback, period, priority in commands:
+            self.register(name, callback, period, priority, port)
+
+    def register(self, name, callback, period, priority=0, port=None, deadline=None):
+        '''
+        Registers a getter command and restaggers every command on its port.
+
+        **Parameters**: \n
+        * **name** - Name used in the report.
+        * **callback** - Function with no parameters that sends the request.
+        * **period** - Time in seconds between requests.
+        * **priority** - Lower numbers are sent first when several commands are due at once.
+        * **port** - Serial object the request is sent on (None if it doesn't share a port).
+        * **deadline** - How late, in seconds, a request can be sent before it counts as a missed deadline (defaults to half
+          of *period*).
+
+        **Returns**: \n
+        * **command** - The registered PolledCommand.\n
+        '''
+        if deadline == None:
+            deadline = period/2.0
+        command = PolledCommand(name, callback, period, priority, port, deadline)
+        self.commands.append(command)
+        self.portCommands.setdefault(port, []).append(command)
+        self.stagger(port)
+        return command
+
+    def stagger(self, port):
+        '''
+        Spreads the first request of every command on a port evenly across the port's shortest period, most important
+        commands first.
+
+        **Parameters**: \n
+        * **port** - Serial object whose commands are rescheduled.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        portCommands = self.portCommands[port]
+        portCommands.sort(key=lambda command: command.priority)
+        shortestPeriod = min(command.period for command in portCommands)
+        startTime = time.time()
+
+        self.queue = [entry for entry in self.queue if entry[2].port is not port]
+        for index, command in enumerate(portCommands):
+            command.phase = shortestPeriod*index/len(portCommands)
+            command.dueTime = startTime + command.phase
+            self.queue.append([command.dueTime, self.commandNumber, command])
+            self.commandNumber += 1
+        heapq.heapify(self.queue)
+
+    def nextDueTime(self):
+        '''
+        When the next request has to go out.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **dueTime** - Time in seconds, or None if nothing is registered.\n
+        '''
+        if len(self.queue) == 0:
+            return None
+        return self.queue[0][0]
+
+    def runDue(self, currentTime=None):
+        '''
+        Sends every request that is due, most important first, pushing back any that would go out too soon after the last
+        request on the same port.
+
+        **Parameters**: \n
+        * **currentTime** - Time in seconds (defaults to now).
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if currentTime == None:
+            currentTime = time.time()
+
+        dueEntries = []
+        while len(self.queue) > 0 and self.queue[0][0] <= currentTime:
+            dueEntries.append(heapq.heappop(self.queue))
+        dueEntries.sort(key=lambda entry: (entry[2].priority, entry[2].dueTime))
+
+        for entry in dueEntries:
+            command = entry[2]
+            portReadyTime = self.portSendTime.get(command.port, 0) + self.portSpacing
+            if command.port != None and portReadyTime > currentTime:
+                entry[0] = portReadyTime #Still scheduled for dueTime, so lateness includes the wait for the port
+                heapq.heappush(self.queue, entry)
+                continue
+
+            try:
+                command.callback()
+            except Exception as msg:
+                command.errors += 1
+                print "Couldn't send %s:" % command.name, msg
+            self.portSendTime[command.port] = currentTime
+
+            lateness = currentTime - command.dueTime
+            command.maxLateness = max(command.maxLateness, lateness)
+            if lateness > command.deadline:
+                command.missedDeadlines += 1
+            command.sendCount += 1
+            command.reportSendCount += 1
+
+            command.dueTime += command.period
+            if command.dueTime <= currentTime: #Fell more than a whole period behind, don't try to catch up with a burst of requests
+                command.dueTime = currentTime + command.period
+            entry[0] = command.dueTime
+            heapq.heappush(self.queue, entry)
+
+    def report(self, currentTime=None, reset=True):
+        '''
+        Compares the rate every command was actually sent at against the rate it was registered with.
+
+        **Parameters**: \n
+        * **currentTime** - Time in seconds (defaults to now).
+        * **reset** - If True, the next report only covers requests sent after this one.
+
+        **Returns**: \n
+        * **report** - List of [name, targetRate, achievedRate, missedDeadlines, maxLateness, errors] for every command.\n
+        '''
+        if currentTime == None:
+            currentTime = time.time()
+        elapsedTime = max(currentTime - self.reportTime, 1e-6)
+
+        report = []
+        for command in self.commands:
+            report.append([command.name, 1.0/command.period, command.reportSendCount/elapsedTime, command.missedDeadlines,
+                           command.maxLateness, command.errors])
+            if reset:
+                command.reportSendCount = 0
+        if reset:
+            self.reportTime = currentTime
+        return report
+
+    def printReport(self, currentTime=None, reset=True):
+        '''
+        Prints the report as a table.
+
+        **Parameters**: \n
+        * **currentTime** - Time in seconds (defaults to now).
+        * **reset** - If True, the next report only covers requests sent after this one.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        print "%-36s %8s %8s %7s %9s %6s" % ("Command", "target/s", "actual/s", "missed", "late ms", "errors")
+        for name, targetRate, achievedRate, missedDeadlines, maxLateness, errors in self.report(currentTime, reset):
+            print "%-36s %8.2f %8.2f %7d %9.1f %6d" % (name, targetRate, achievedRate, missedDeadlines, maxLateness*1000, errors)
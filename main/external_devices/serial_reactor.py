@@ -0,0 +1,209 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: serial_reactor
+   :synopsis: Single thread event loop that services every serial port and socket used by the navigation process.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Replaces the busy looping response threads with one thread that waits on select until a device has bytes to read
+              or a periodic request is due, then calls the device's handler. Board getter commands are sent by a
+              polling_scheduler registered with the reactor.
+'''
+
+import os
+import time
+import heapq
+import select
+import socket
+import threading
+
+class SerialReactor(threading.Thread):
+    '''
+    Waits on every registered device at once and only wakes up when one of them is readable or a timer is due. Devices that
+    select can't wait on (serial ports on Windows) are polled with inWaiting every *pollTime* seconds instead of being spun on.
+    '''
+    def __init__(self, pollTime=0.002, maxWaitTime=0.1):
+        '''
+        Initializes the reactor thread (does not start it).
+
+        **Parameters**: \n
+        * **pollTime** - How often, in seconds, devices that can't be selected on are checked for waiting bytes.
+        * **maxWaitTime** - Longest time, in seconds, the reactor will wait before checking if it has been killed.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self.pollTime = pollTime
+        self.maxWaitTime = maxWaitTime
+
+        self.runThread = True
+
+        self.selectableDevices = {} #fileObject: callback, waited on with select
+        self.polledDevices = [] #[fileObject, callback], checked with inWaiting
+        self.timers = [] #Heap of [deadline, timerNumber, period, callback]
+        self.timerNumber = 0
+        self.schedulers = [] #polling_scheduler.PollingScheduler objects, run whenever a request is due
+
+        self.callbackErrors = 0
+
+    def registerDevice(self, fileObject, callback):
+        '''
+        Calls *callback* whenever *fileObject* has bytes waiting to be read.
+
+        **Parameters**: \n
+        * **fileObject** - Serial object or socket to watch.
+        * **callback** - Function with no parameters that reads and handles the waiting data (usually a response's handleData).
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if self.isSelectable(fileObject):
+            self.selectableDevices[fileObject] = callback
+        else:
+            self.polledDevices.append([fileObject, callback])
+
+    def registerTimer(self, period, callback, delay=0):
+        '''
+        Calls *callback* every *period* seconds (usually a response's requestData).
+
+        **Parameters**: \n
+        * **period** - Time in seconds between calls.
+        * **callback** - Function with no parameters.
+        * **delay** - Time in seconds before the first call.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        heapq.heappush(self.timers, [time.time() + delay, self.timerNumber, period, callback])
+        self.timerNumber += 1 #Keeps timers with the same deadline in the order they were registered
+
+    def registerScheduler(self, scheduler):
+        '''
+        Sends the getter commands registered with *scheduler* whenever they are due.
+
+        **Parameters**: \n
+        * **scheduler** - polling_scheduler.PollingScheduler.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.schedulers.append(scheduler)
+
+    def isSelectable(self, fileObject):
+        '''
+        Checks if select can wait on the device. On Windows select only works with sockets.
+
+        **Parameters**: \n
+        * **fileObject** - Serial object or socket.
+
+        **Returns**: \n
+        * **True or False** - Whether the device can be passed to select.\n
+        '''
+        if isinstance(fileObject, socket.socket):
+            return True
+        if os.name == 'nt':
+            return False
+        try:
+            fileObject.fileno()
+            return True
+        except Exception:
+            return False
+
+    def run(self):
+        '''
+        Services the devices and timers until the thread is killed.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        while self.runThread:
+            self.runOnce()
+
+    def runOnce(self):
+        '''
+        Waits until a device is readable or the next timer is due, then calls every handler that is ready.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        waitTime = self.maxWaitTime
+        if len(self.timers) > 0:
+            waitTime = min(waitTime, max(0, self.timers[0][0] - time.time()))
+        for scheduler in self.schedulers:
+            dueTime = scheduler.nextDueTime()
+            if dueTime != None:
+                waitTime = min(waitTime, max(0, dueTime - time.time()))
+        if len(self.polledDevices) > 0:
+            waitTime = min(waitTime, self.pollTime)
+
+        if len(self.selectableDevices) > 0:
+            try:
+                readable = select.select(list(self.selectableDevices), [], [], waitTime)[0]
+            except (select.error, ValueError) as msg: #A device was closed out from under the reactor
+                print "Reactor couldn't wait on devices:", msg
+                readable = []
+                time.sleep(waitTime)
+        else:
+            readable = []
+            time.sleep(waitTime)
+
+        for fileObject in readable:
+            self.callHandler(self.selectableDevices[fileObject])
+
+        for fileObject, callback in self.polledDevices:
+            try:
+                bytesWaiting = fileObject.inWaiting()
+            except Exception:
+                bytesWaiting = 0
+            if bytesWaiting != 0:
+                self.callHandler(callback)
+
+        currentTime = time.time()
+        while len(self.timers) > 0 and self.timers[0][0] <= currentTime:
+            timer = heapq.heappop(self.timers)
+            self.callHandler(timer[3])
+            timer[0] += timer[2]
+            if timer[0] <= currentTime: #Fell more than a whole period behind, don't try to catch up with a burst of requests
+                timer[0] = currentTime + timer[2]
+            heapq.heappush(self.timers, timer)
+
+        for scheduler in self.schedulers:
+            self.callHandler(lambda: scheduler.runDue(currentTime))
+
+    def callHandler(self, callback):
+        '''
+        Calls a device or timer handler without letting one bad device stop the others from being serviced.
+
+        **Parameters**: \n
+        * **callback** - Function with no parameters.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        try:
+            callback()
+        except Exception as msg:
+            self.callbackErrors += 1
+            print "Reactor handler failed:", msg
+
+    def killThread(self):
+        '''
+        Ends thread process.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.runThread = False
@@ -0,0 +1,310 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: shared_telemetry
+   :synopsis: Fixed layout telemetry block shared between the navigation process and the GUI.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: The navigation process publishes its telemetry straight into a ctypes structure in shared memory instead of
+              pickling a nested list through the pipe every cycle. A sequence number is used as a seqlock: it is odd while the
+              navigation process is writing, so the GUI copies the block, checks the sequence number didn't change, and gets the
+              latest consistent snapshot without ever blocking or waiting on the navigation loop. Everything after the sequence
+              number is packed with one struct.pack before the sequence number goes odd, copied in with one memmove, and read
+              with one struct.unpack_from, since setting ctypes fields one at a time from Python costs more than pickling the
+              list did. A reader gives up after MAX_READ_RETRIES, so a navigation process killed mid publish can't hang the GUI.
+'''
+
+import time
+import ctypes
+import struct
+import multiprocessing.sharedctypes
+
+MAX_AXES, MAX_BUTTONS, MAX_HATS = 8, 16, 4
+MAX_NAME_LENGTH = 64
+
+class TelemetryStruct(ctypes.Structure):
+    '''
+    Layout of the shared telemetry. Everything the navigation process used to send through the pipe, in the same order.
+    '''
+    _fields_ = [("sequence", ctypes.c_uint32), #Odd while being written, 0 until the first publish
+                ("sib", ctypes.c_double*3), #Internal temperature, internal pressure, external pressure
+                ("ahrs", ctypes.c_double*3), #Heading, pitch, roll
+                ("thrusterPWMs", ctypes.c_int*8),
+                ("joystickState", ctypes.c_int), #0 no joystick data yet, 1 joystick name was False (none detected), 2 joystickName is valid
+                ("joystickName", ctypes.c_char*MAX_NAME_LENGTH),
+                ("axisCount", ctypes.c_int), ("axes", ctypes.c_double*MAX_AXES),
+                ("buttonCount", ctypes.c_int), ("buttons", ctypes.c_int*MAX_BUTTONS),
+                ("hatCount", ctypes.c_int), ("hats", ctypes.c_int*(2*MAX_HATS)),
+                ("joystickDesired", ctypes.c_double*5), #Right bumper toggle, yaw, pitch, roll, depth
+                ("powerStatus", ctypes.c_int),
+                ("batteries", ctypes.c_double*4), #Battery 1 voltage and current, battery 2 voltage and current
+                ("dvlPosition", ctypes.c_double*4),
+                ("dvlVelocity", ctypes.c_double*3),
+                ("dvlOrientation", ctypes.c_double*4),
+                ("dvlMisc", ctypes.c_double*3),
+                ("currentMission", ctypes.c_char*MAX_NAME_LENGTH),
+                ("setWaypoint", ctypes.c_bool),
+                ("removeWaypoint", ctypes.c_bool),
+                ("desiredMissionOrientation", ctypes.c_double*8)]
+
+def structFormat(fields):
+    '''
+    Builds the struct format of ctypes fields, so the layout is only defined once in TelemetryStruct.
+
+    **Parameters**: \n
+    * **fields** - List of [name, ctypes type] like TelemetryStruct._fields_.
+
+    **Returns**: \n
+    * **format** - Native struct format string.\n
+    '''
+    format = "@"
+    for name, fieldType in fields:
+        if hasattr(fieldType, "_length_"): #Array
+            if fieldType._type_ == ctypes.c_char:
+                format += "%ds" % fieldType._length_
+            else:
+                format += "%d%s" % (fieldType._length_, fieldType._type_._type_)
+        else:
+            format += fieldType._type_
+    return format
+
+TELEMETRY_SIZE = ctypes.sizeof(TelemetryStruct)
+PAYLOAD_OFFSET = TelemetryStruct.sib.offset #Everything after the sequence number
+PAYLOAD_FORMAT = struct.Struct(structFormat(TelemetryStruct._fields_[1:]))
+
+MAX_READ_RETRIES = 1000 #A publish takes microseconds, so a sequence number still odd after this many checks was left that way
+
+def createSharedTelemetry():
+    '''
+    Allocates the telemetry block in shared memory. Pass it to the navigation process as an argument of multiprocessing.Process.
+
+    **Parameters**: \n
+    * **No Input Parameters.**
+
+    **Returns**: \n
+    * **telemetry** - Shared TelemetryStruct.\n
+    '''
+    return multiprocessing.sharedctypes.RawValue(TelemetryStruct)
+
+def padValues(values, length, replaceNone=False):
+    '''
+    Makes a list of numbers exactly *length* long for packing.
+
+    **Parameters**: \n
+    * **values** - List of numbers. Anything that isn't a list, like the placeholder 0 before a device has sent anything, is
+      stored as all zeros.
+    * **length** - Size of the array in TelemetryStruct.
+    * **replaceNone** - If True, None is stored as 0. Only needed when packing failed, most cycles have no None to replace.
+
+    **Returns**: \n
+    * **values** - List of *length* numbers.\n
+    '''
+    if not isinstance(values, (list, tuple)):
+        return [0]*length
+    if len(values) == length and not replaceNone:
+        return list(values)
+    values = [value or 0 for value in values[0:length]]
+    return values + [0]*(length - len(values))
+
+class TelemetryBlock:
+    '''
+    Publishes to (navigation process) or reads from (GUI) a shared TelemetryStruct.
+    '''
+    def __init__(self, telemetry=None):
+        '''
+        Wraps the shared telemetry block.
+
+        **Parameters**: \n
+        * **telemetry** - Shared TelemetryStruct from createSharedTelemetry (a new one is allocated if None).
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if telemetry == None:
+            telemetry = createSharedTelemetry()
+        self.telemetry = telemetry
+        self.address = ctypes.addressof(telemetry)
+        self.retries = 0 #Reads that overlapped a publish and had to be copied again
+        self.failedReads = 0 #Reads that gave up after MAX_READ_RETRIES
+
+        self.lastSequence = 0 #Sequence number of the last snapshot returned by readNew
+        self.snapshotsRead = 0
+        self.snapshotsSkipped = 0 #Snapshots published between two readNew calls that the reader never saw
+
+    def publish(self, sibData, ahrsData, thrusterPWMs, joystickData, pmudData, dvlData, currentMission, setWaypoint, removeWaypoint, desiredMissionOrientation):
+        '''
+        Writes a new snapshot. Only the navigation process may call this.
+
+        **Parameters**: \n
+        * Same as the list that was sent through the pipe: sibGuiData, ahrsDataMedian, thrusterPWMs, joystickGuiData,
+          pmudGuiData, dvlGuiData, currentMission, setWaypoint, removeWaypoint, desiredMissionOrientation.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        #Packed before the sequence goes odd, so a bad value raises here and readers never see a half written snapshot
+        try:
+            payload = PAYLOAD_FORMAT.pack(*self.payload(sibData, ahrsData, thrusterPWMs, joystickData, pmudData, dvlData, currentMission, setWaypoint, removeWaypoint, desiredMissionOrientation))
+        except struct.error: #A sensor value is still None
+            payload = PAYLOAD_FORMAT.pack(*self.payload(sibData, ahrsData, thrusterPWMs, joystickData, pmudData, dvlData, currentMission, setWaypoint, removeWaypoint, desiredMissionOrientation, True))
+
+        telemetry = self.telemetry
+        telemetry.sequence += 1 #Odd, readers will retry
+        try:
+            ctypes.memmove(self.address + PAYLOAD_OFFSET, payload, PAYLOAD_FORMAT.size)
+        finally:
+            telemetry.sequence += 1 #Even again, snapshot is consistent
+
+    def payload(self, sibData, ahrsData, thrusterPWMs, joystickData, pmudData, dvlData, currentMission, setWaypoint, removeWaypoint, desiredMissionOrientation, replaceNone=False):
+        '''
+        Flattens the telemetry into the values PAYLOAD_FORMAT packs.
+
+        **Parameters**: \n
+        * Same as publish.
+        * **replaceNone** - If True, None is stored as 0.
+
+        **Returns**: \n
+        * **values** - List in TelemetryStruct order.\n
+        '''
+        name, axes, buttons, hats = joystickData[0:4]
+        if name == None:
+            joystickState, name = 0, ""
+        elif name == False:
+            joystickState, name = 1, ""
+        else:
+            joystickState, name = 2, str(name)
+        axes, buttons = axes or [], buttons or []
+        hats = [value for hat in hats or [] for value in hat]
+
+        batteries = pmudData[1] if len(pmudData) > 1 and isinstance(pmudData[1], (list, tuple)) else [[0, 0], [0, 0]]
+        if not isinstance(dvlData[0], (list, tuple)): #Placeholder before the first DVL ensemble
+            dvlData = [None]*4
+
+        return (padValues(sibData, 3, replaceNone) + padValues(ahrsData, 3, replaceNone) + padValues(thrusterPWMs, 8, replaceNone) +
+                [joystickState, name, min(len(axes), MAX_AXES)] + padValues(axes, MAX_AXES, replaceNone) +
+                [min(len(buttons), MAX_BUTTONS)] + padValues(buttons, MAX_BUTTONS, replaceNone) +
+                [min(len(hats), 2*MAX_HATS)/2] + padValues(hats, 2*MAX_HATS, replaceNone) + padValues(joystickData[4:9], 5, True) +
+                [pmudData[0] or 0] + padValues(list(batteries[0]) + list(batteries[1]), 4, replaceNone) +
+                padValues(dvlData[0], 4, replaceNone) + padValues(dvlData[1], 3, replaceNone) + padValues(dvlData[2], 4, replaceNone) + padValues(dvlData[3], 3, replaceNone) +
+                [str(currentMission), bool(setWaypoint), bool(removeWaypoint)] + padValues(desiredMissionOrientation, 8, replaceNone))
+
+    def read(self):
+        '''
+        Copies out the latest consistent snapshot without blocking.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **sequence** - Sequence number of the snapshot (0 if nothing has been published yet, the last one returned by readNew
+          if no consistent snapshot could be copied).
+        * **externalDevicesData** - Same nested list the navigation process used to send through the pipe, or None if nothing
+          has been published yet or no consistent snapshot could be copied.\n
+        '''
+        telemetry = self.telemetry
+        for attempt in xrange(MAX_READ_RETRIES):
+            sequence = telemetry.sequence
+            if sequence & 1: #In the middle of a publish
+                self.retries += 1
+                continue
+            snapshot = ctypes.string_at(self.address, TELEMETRY_SIZE)
+            if telemetry.sequence == sequence:
+                break
+            self.retries += 1
+        else: #The navigation process stopped in the middle of a publish, or keeps overlapping this read
+            self.failedReads += 1
+            return self.lastSequence, None
+
+        if sequence == 0:
+            return 0, None
+        return sequence, self.decode(PAYLOAD_FORMAT.unpack_from(snapshot, PAYLOAD_OFFSET))
+
+    def readNew(self):
+        '''
+        Like read, but only returns a snapshot the reader hasn't seen yet.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **externalDevicesData** - Newest snapshot, or None if nothing was published since the last call.\n
+        '''
+        if self.telemetry.sequence == self.lastSequence: #Nothing new, don't bother copying
+            return None
+        sequence, externalDevicesData = self.read()
+        if sequence == self.lastSequence:
+            return None
+        if self.lastSequence != 0:
+            self.snapshotsSkipped += (sequence - self.lastSequence)/2 - 1 #Each publish adds 2
+        self.lastSequence = sequence
+        self.snapshotsRead += 1
+        return externalDevicesData
+
+    def stats(self):
+        '''
+        Counters of the snapshots read so far.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **stats** - Dictionary with "published", "read", "skipped", "retries" and "failedReads".\n
+        '''
+        return {"published": self.telemetry.sequence/2, "read": self.snapshotsRead, "skipped": self.snapshotsSkipped, "retries": self.retries,
+                "failedReads": self.failedReads}
+
+    def waitForSnapshot(self, pollTime=0.01):
+        '''
+        Blocks until the navigation process has published its first snapshot.
+
+        **Parameters**: \n
+        * **pollTime** - Seconds between checks.
+
+        **Returns**: \n
+        * **externalDevicesData** - First snapshot.\n
+        '''
+        while True:
+            externalDevicesData = self.readNew()
+            if externalDevicesData != None:
+                return externalDevicesData
+            time.sleep(pollTime)
+
+    def decode(self, values):
+        '''
+        Rebuilds the nested list the GUI expects from the unpacked snapshot.
+
+        **Parameters**: \n
+        * **values** - Tuple unpacked with PAYLOAD_FORMAT, in TelemetryStruct order.
+
+        **Returns**: \n
+        * **externalDevicesData** - [sibGuiData, ahrsDataMedian, thrusterPWMs, joystickGuiData, pmudGuiData, dvlGuiData,
+          currentMission, setWaypoint, removeWaypoint, desiredMissionOrientation].\n
+        '''
+        values = list(values)
+        sibData, ahrsData, thrusterPWMs = values[0:3], values[3:6], values[6:14]
+        joystickState, name, axisCount = values[14:17]
+        axes = values[17:17+MAX_AXES]
+        index = 17 + MAX_AXES
+        buttonCount, buttons = values[index], values[index+1:index+1+MAX_BUTTONS]
+        index += 1 + MAX_BUTTONS
+        hatCount, hats = values[index], values[index+1:index+1+2*MAX_HATS]
+        index += 1 + 2*MAX_HATS
+        joystickDesired = values[index:index+5]
+        index += 5
+
+        if joystickState == 0:
+            joystickData = [None, None, None, None]
+        else:
+            joystickData = [[None, False, name.split("\0", 1)[0]][joystickState], axes[0:axisCount], buttons[0:buttonCount],
+                            [(hats[2*hat], hats[2*hat+1]) for hat in range(hatCount)]]
+        joystickData += [bool(joystickDesired[0])] + joystickDesired[1:]
+
+        powerStatus, batteries = values[index], values[index+1:index+5]
+        dvlData = [values[index+5:index+9], values[index+9:index+12], values[index+12:index+16], values[index+16:index+19]]
+        currentMission, setWaypoint, removeWaypoint = values[index+19:index+22]
+        desiredMissionOrientation = values[index+22:index+30]
+        desiredMissionOrientation[0] = bool(desiredMissionOrientation[0])
+
+        return [sibData, ahrsData, thrusterPWMs, joystickData, [powerStatus, [batteries[0:2], batteries[2:4]]], dvlData,
+                currentMission.split("\0", 1)[0], setWaypoint, removeWaypoint, desiredMissionOrientation]
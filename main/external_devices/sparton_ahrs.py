@@ -34,6 +34,7 @@ class SpartonAhrsDataPacket():
         '''
         self.SPARTON_AHRS = serial.Serial(comPort, 115200)
         self.locationArray = [[0x01, 9], [0x02, 5], [0x09, 5], [0x83, 5], [0x0F, 5], [0x8B, 5], [0x8C, 5], [0x8D, 5], [0x8E, 5], [0x04, 11], [0x56, 4], [0x08, 5], [0x05, 9], [0x06, 7], [0x07, 11], [0x11, 5], [0x57, 4], [0x4A, 4]]
+        self.frameLengths = dict(self.locationArray) #Frame ID: size of the entire transmission, for lookups without scanning locationArray
         
     def rawMagneticsGet(self):
         '''
@@ -540,12 +541,15 @@ class SpartonAhrsDataPacket():
         return self.netValue
         
 class SpartonAhrsResponse(threading.Thread):
-    def __init__(self, comPort):
+    def __init__(self, comPort, streaming=False, streamRate=100):
         '''
         Initializes the Sparton AHRS thread (starts thread process).
         
         **Parameters**: \n
         * **comPort** - Serial port number that the Sparton AHRS is connected to.
+        * **streaming** - If True, heading, pitch and roll are requested back to back at *streamRate* without waiting on replies, 
+          and replies are handled as soon as they arrive.
+        * **streamRate** - Samples per second to request when streaming (100 hz is the fastest for Sparton).
         
         **Return**: \n
         * **No Return.**\n
@@ -554,13 +558,25 @@ class SpartonAhrsResponse(threading.Thread):
         self.comPort = comPort
         self.spartonAhrs = SpartonAhrsDataPacket(comPort) 
         self.runThread = True
-        self.requestTime = 0.02 #How often I request data packets from device (100 hz/0.01 seconds is the fastest for Sparton)
+        self.streaming = streaming
+        if self.streaming:
+            self.requestTime = 1.0/streamRate
+        else:
+            self.requestTime = 0.02 #How often I request data packets from device (100 hz/0.01 seconds is the fastest for Sparton)
+        self.nextRequestTime = 0 #Each AHRS keeps its own request schedule when streaming instead of sharing reqestTimer
+        
+        self.latestData = utilities.LatestValue() #Newest [heading, pitch, roll], older readings are never needed
         
-        self.getList = []
+        self.receiveBuffer = bytearray() #Bytes of data packets that haven't fully arrived yet
+        self.arrivalTime = None #When the bytes of the last read came in
+        self.headingData = None #Heading waiting to be paired up with the next pitch and roll
+        
+        self.samplesReceived = 0
+        self.framingErrors = 0 #Bytes thrown away because they weren't part of a good data packet
         
     def run(self):
         '''
-        Obtains heading, roll, and pitch data from the AHRS and appends it to the instance's list attribute.
+        Obtains heading, roll, and pitch data from the AHRS and puts it in the instance's mailbox attribute.
         
         **Parameters**: \n
         * **comPort** - Serial port number that the Sparton AHRS is connected to.
@@ -570,54 +586,100 @@ class SpartonAhrsResponse(threading.Thread):
         '''
         while self.runThread:
             
+            if self.streaming:
+                currentTime = time.time()
+                if currentTime >= self.nextRequestTime:
+                    self.requestData()
+                    self.nextRequestTime = max(self.nextRequestTime + self.requestTime, currentTime) #Don't burst requests after falling behind
+                    
+                self.handleData()
+                time.sleep(0.001) #Short enough that replies are handled as they arrive instead of one request period later
+                continue
+            
             time.sleep(0.02) #Slows down thread to save some power
             
             netRequestTimer = reqestTimer.netTimer(reqestTimer.cpuClockTimeInSeconds())
             if netRequestTimer >= self.requestTime:
-                self.spartonAhrs.trueHeadingGet()
-                self.spartonAhrs.pitchAndRollGet()
+                self.requestData()
                 reqestTimer.restartTimer()
             
+            self.handleData()
             
-            
-            headingDataPacket = self.unpack()
-            pitchRollDataPacket = self.unpack()
-            
+    def requestData(self):
+        '''
+        Requests heading, pitch and roll from the AHRS. Called by run or by a serial_reactor timer.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Return**: \n
+        * **No Return.**\n
+        '''
+        self.spartonAhrs.trueHeadingGet()
+        self.spartonAhrs.pitchAndRollGet()
+        
+    def handleData(self):
+        '''
+        Reads in every complete data packet waiting on the port. Each heading is paired with the pitch and roll that follows it and 
+        put in the instance's mailbox attribute, time stamped with when its bytes arrived. Called by run or by a serial_reactor when 
+        the port becomes readable.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Return**: \n
+        * **No Return.**\n
+        '''
+        for dataPacket in self.unpack():
             try:
-                if headingDataPacket != None or pitchRollDataPacket != None:
-                    headingData = self.spartonAhrs.extractSensorData(headingDataPacket)
-                    pitchRollData = self.spartonAhrs.extractSensorData(pitchRollDataPacket)
-
-                    self.getList.append([headingData[1], pitchRollData[1], pitchRollData[2]])
+                sensorData = self.spartonAhrs.extractSensorData(dataPacket)
+                if sensorData[0] == 0x02: #True heading
+                    self.headingData = sensorData
+                elif sensorData[0] == 0x06 and self.headingData != None: #Pitch and roll
+                    self.latestData.put([self.headingData[1], sensorData[1], sensorData[2]], self.arrivalTime)
+                    self.headingData = None
+                    self.samplesReceived += 1
             except:
                 pass
                 print "Couldn't get AHRS data packet."
     
     def unpack(self):
         '''
-        Reads in the raw transmission and extracts all bytes of the packet
+        Reads in everything waiting on the port and extracts all complete packets. The legacy protocol has no checksum, so a 
+        packet is only accepted if it starts with 0xA4, has a known frame ID and ends with 0xA0. Otherwise the first byte is 
+        thrown away and the search starts over from the next one.
         
         **Parameters**: \n
         * **No Input Parameters.**
          
         **Returns**: \n
-        * **dataPacketIn** - The raw transmission packet.\n
+        * **dataPackets** - List of raw transmission packets.\n
         '''
-        dataPacketIn = []
-        if self.spartonAhrs.SPARTON_AHRS.inWaiting() != 0:
-            dataPacketIn.append(ord(self.spartonAhrs.SPARTON_AHRS.read()))
-            dataPacketIn.append(ord(self.spartonAhrs.SPARTON_AHRS.read()))
+        dataPackets = []
+        bytesWaiting = self.spartonAhrs.SPARTON_AHRS.inWaiting()
+        if bytesWaiting != 0:
+            self.receiveBuffer.extend(self.spartonAhrs.SPARTON_AHRS.read(bytesWaiting))
+            self.arrivalTime = time.time()
             
-            for x in range(0, 18):
-                if self.spartonAhrs.locationArray[x][0] == dataPacketIn[1]: # Determines which type of transmission it is (the size of the entire transmission).
-                    for y in range(0, self.spartonAhrs.locationArray[x][1]-2): # Reads in the transmission
-                        dataPacketIn.append(ord(self.spartonAhrs.SPARTON_AHRS.read()))
-                    break
-                
-            if dataPacketIn[0] != 0xA4: #Checks if the data packet is good
-                dataPacketIn = None
-
-            return dataPacketIn
+        while len(self.receiveBuffer) >= 2:
+            packetLength = self.spartonAhrs.frameLengths.get(self.receiveBuffer[1]) # Determines which type of transmission it is (the size of the entire transmission).
+            if self.receiveBuffer[0] != 0xA4 or packetLength == None: #Not the start of a data packet
+                del self.receiveBuffer[0]
+                self.framingErrors += 1
+                continue
+            
+            if len(self.receiveBuffer) < packetLength: #Rest of the data packet hasn't arrived yet
+                break
+            
+            if self.receiveBuffer[packetLength-1] != 0xA0: #Checks if the data packet is good
+                del self.receiveBuffer[0]
+                self.framingErrors += 1
+                continue
+            
+            dataPackets.append(list(self.receiveBuffer[:packetLength]))
+            del self.receiveBuffer[:packetLength]
+            
+        return dataPackets
             
     def killThread(self):
         '''
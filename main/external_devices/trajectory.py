@@ -0,0 +1,199 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: trajectory
+   :synopsis: Minimum jerk setpoints between waypoints.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Instead of handing the PID controllers the waypoint itself, which saturates the thrusters and overshoots, a
+              navigation mission follows a minimum jerk trajectory from where the Sub started to the waypoint. Every segment
+              works out its duration and coefficients once, from how far it has to go and how fast the Sub is allowed to
+              move and turn, so the setpoint for a tick is a handful of multiplications. Whole mission paths can be sampled
+              at once with NumPy for previewing them in the GUI.
+'''
+
+import time
+import numpy
+
+def angleDifference(angle1, angle2):
+    '''
+    Signed distance from angle2 to angle1, going the short way around.
+
+    **Parameters**: \n
+    * **angle1** - Degrees.
+    * **angle2** - Degrees.
+
+    **Returns**: \n
+    * **difference** - Degrees from -180 to 180.\n
+    '''
+    return (angle1 - angle2 + 180) % 360 - 180
+
+class TrajectorySegment:
+    '''
+    Minimum jerk move from one [east, up, north, yaw] pose to another. Every axis follows
+    start + distance*(10s^3 - 15s^4 + 6s^5), where s goes from 0 to 1 over the duration, so the Sub starts and stops with
+    no velocity or acceleration.
+    '''
+    def __init__(self, startPose, endPose, startTime, maxSpeed=1.5, maxYawRate=30.0, minDuration=1.0):
+        '''
+        Works out the duration and coefficients of the segment.
+
+        **Parameters**: \n
+        * **startPose** - [east, up, north, yaw] the segment starts at, in feet and degrees.
+        * **endPose** - [east, up, north, yaw] the segment ends at.
+        * **startTime** - time.time() the segment starts at.
+        * **maxSpeed** - Fastest the Sub should move, in feet per second.
+        * **maxYawRate** - Fastest the Sub should turn, in degrees per second.
+        * **minDuration** - Shortest a segment can take, in seconds.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.startPose = list(startPose)
+        self.endPose = list(endPose)
+        self.startTime = startTime
+
+        self.distances = [endPose[axis] - startPose[axis] for axis in range(3)] + [angleDifference(endPose[3], startPose[3])] #Yaw turns the short way around
+        distance = sum(axisDistance**2 for axisDistance in self.distances[:3])**0.5
+
+        #The fastest part of a minimum jerk move is 1.875 times its average speed
+        self.duration = max(1.875*distance/maxSpeed, 1.875*abs(self.distances[3])/maxYawRate, minDuration)
+        self.endTime = startTime + self.duration
+
+    def blend(self, elapsedTime):
+        '''
+        How far along the segment the setpoint is.
+
+        **Parameters**: \n
+        * **elapsedTime** - Seconds since the segment started.
+
+        **Returns**: \n
+        * **blend** - 0 at the start to 1 at the end.\n
+        '''
+        s = min(max(elapsedTime/self.duration, 0.0), 1.0)
+        return s*s*s*(10 + s*(-15 + 6*s))
+
+    def evaluate(self, currentTime=None):
+        '''
+        Setpoint at one time.
+
+        **Parameters**: \n
+        * **currentTime** - time.time() (defaults to now).
+
+        **Returns**: \n
+        * **setpoint** - [east, up, north, yaw].\n
+        '''
+        if currentTime == None:
+            currentTime = time.time()
+        blend = self.blend(currentTime - self.startTime)
+        startPose, distances = self.startPose, self.distances
+        return [startPose[0] + distances[0]*blend, startPose[1] + distances[1]*blend, startPose[2] + distances[2]*blend,
+                (startPose[3] + distances[3]*blend) % 360]
+
+    def evaluateBatch(self, times):
+        '''
+        Setpoints at many times.
+
+        **Parameters**: \n
+        * **times** - Array of time.time() values.
+
+        **Returns**: \n
+        * **setpoints** - Array with one [east, up, north, yaw] row per time.\n
+        '''
+        s = numpy.clip((numpy.asarray(times, dtype=float) - self.startTime)/self.duration, 0.0, 1.0)
+        blend = s*s*s*(10 + s*(-15 + 6*s))
+        setpoints = numpy.add(self.startPose, numpy.outer(blend, self.distances))
+        setpoints[:, 3] %= 360
+        return setpoints
+
+    def finished(self, currentTime=None):
+        '''
+        Whether the setpoint has reached the end of the segment.
+
+        **Parameters**: \n
+        * **currentTime** - time.time() (defaults to now).
+
+        **Returns**: \n
+        * **finished** - True once the segment's duration has gone by.\n
+        '''
+        if currentTime == None:
+            currentTime = time.time()
+        return currentTime >= self.endTime
+
+class TrajectoryPlanner:
+    '''
+    Makes segments with the same speed limits, and keeps the segments between waypoints so a mission path is only planned
+    once.
+    '''
+    def __init__(self, maxSpeed=1.5, maxYawRate=30.0, minDuration=1.0):
+        '''
+        Initializes the planner with no segments.
+
+        **Parameters**: \n
+        * **maxSpeed** - Fastest the Sub should move, in feet per second.
+        * **maxYawRate** - Fastest the Sub should turn, in degrees per second.
+        * **minDuration** - Shortest a segment can take, in seconds.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.maxSpeed = maxSpeed
+        self.maxYawRate = maxYawRate
+        self.minDuration = minDuration
+        self.segments = {} #(startPose, endPose): segment starting at time 0
+
+    def segment(self, startPose, endPose, startTime=None):
+        '''
+        Segment from the Sub's current pose to a waypoint.
+
+        **Parameters**: \n
+        * **startPose** - [east, up, north, yaw].
+        * **endPose** - [east, up, north, yaw].
+        * **startTime** - time.time() the segment starts at (defaults to now).
+
+        **Returns**: \n
+        * **segment** - TrajectorySegment.\n
+        '''
+        if startTime == None:
+            startTime = time.time()
+        return TrajectorySegment(startPose, endPose, startTime, self.maxSpeed, self.maxYawRate, self.minDuration)
+
+    def cachedSegment(self, startPose, endPose):
+        '''
+        Segment between two waypoints starting at time 0, planned the first time it is asked for.
+
+        **Parameters**: \n
+        * **startPose** - [east, up, north, yaw].
+        * **endPose** - [east, up, north, yaw].
+
+        **Returns**: \n
+        * **segment** - TrajectorySegment.\n
+        '''
+        key = (tuple(startPose), tuple(endPose))
+        if key not in self.segments:
+            self.segments[key] = self.segment(startPose, endPose, 0.0)
+        return self.segments[key]
+
+    def previewPath(self, poses, sampleTime=0.1):
+        '''
+        Samples the whole path through a list of poses, one segment after another, for drawing it in the GUI.
+
+        **Parameters**: \n
+        * **poses** - List of [east, up, north, yaw], starting with where the Sub is.
+        * **sampleTime** - Seconds between samples.
+
+        **Returns**: \n
+        * **times** - Array of seconds since the start of the path.
+        * **setpoints** - Array with one [east, up, north, yaw] row per time.\n
+        '''
+        times, setpoints = [numpy.zeros(1)], [numpy.array([poses[0]], dtype=float) % [1, 1, 1, 360]]
+        pathTime = 0.0
+        for startPose, endPose in zip(poses[:-1], poses[1:]):
+            segment = self.cachedSegment(startPose, endPose)
+            segmentTimes = numpy.arange(sampleTime, segment.duration + sampleTime, sampleTime)
+            segmentTimes[-1] = min(segmentTimes[-1], segment.duration) #Always end exactly on the waypoint
+            times.append(pathTime + segmentTimes)
+            setpoints.append(segment.evaluateBatch(segmentTimes))
+            pathTime += segment.duration
+        return numpy.concatenate(times), numpy.concatenate(setpoints)
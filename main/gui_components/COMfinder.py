@@ -275,7 +275,7 @@ class COMScript():
                     if not repThr == None:
                         while not len(repThr.getList):
                             pass
-                        self.window.listOfDataPackets.append(repThr.getList.pop())
+                        self.window.listOfDataPackets.append(repThr.getList.latest())
                 self.window.rTime += time.time() - rTimeStart
                 
             def startHzLoop(startTimeOfLoop, increment):
@@ -0,0 +1,621 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: board_simulators
+   :synopsis: Pseudo-terminal simulators for every device the navigation process talks to.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Each simulator opens a pseudo-terminal (POSIX only) and answers the same frame IDs as the real board with payloads
+              encoded the way _navigation_management_system_ decodes them. Output rates, reply jitter and byte corruption are
+              configurable so the whole navigation process can be load tested and profiled without any hardware.
+'''
+
+import os
+import pty
+import tty
+import time
+import math
+import heapq
+import random
+import select
+import struct
+import threading
+import main.external_devices.data_packet_generator as data_packet_generator
+import main.external_devices.dvl as dvl
+
+class VehicleState:
+    '''
+    Very rough model of the sub that the simulators share, so the sensors react to the thruster commands the navigation process sends.
+    '''
+    def __init__(self):
+        '''
+        Starts the sub at the surface, pointing north, at the origin.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.lock = threading.Lock()
+        self.thrusterPWMs = [0, 0, 0, 0, 0, 0, 0, 0] #Signed, same order as NavigationManagementSystem.thrusterPWMs
+        self.powerStatus = 1
+        self.heading, self.pitch, self.roll, self.depth = 0.0, 0.0, 0.0, 0.0 #Degrees, feet
+        self.north, self.east, self.up = 0.0, 0.0, 0.0 #Feet
+        self.forwardVelocity, self.sideVelocity, self.verticalVelocity = 0.0, 0.0, 0.0 #Feet/s
+        self.lastUpdateTime = time.time()
+
+    def setThrusterPWM(self, thrusterIndex, pwm):
+        '''
+        Records a thruster command.
+
+        **Parameters**: \n
+        * **thrusterIndex** - Thruster 0-7.
+        * **pwm** - Signed PWM.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        with self.lock:
+            self.thrusterPWMs[thrusterIndex] = pwm
+
+    def update(self):
+        '''
+        Moves the sub forward in time using the current thruster commands.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        with self.lock:
+            currentTime = time.time()
+            dt = min(currentTime - self.lastUpdateTime, 0.5)
+            self.lastUpdateTime = currentTime
+
+            pwm = [value/204.0 for value in self.thrusterPWMs]
+            if self.powerStatus == 0:
+                pwm = [0]*8
+
+            self.forwardVelocity = 0.8*self.forwardVelocity + 0.2*(-pwm[6] - pwm[7])*2.0
+            self.sideVelocity = 0.8*self.sideVelocity + 0.2*(-pwm[4] + pwm[5])*1.0
+            self.verticalVelocity = 0.8*self.verticalVelocity + 0.2*(-sum(pwm[0:4]))*0.5
+
+            self.heading = (self.heading + (pwm[6] - pwm[7])*30.0*dt) % 360
+            self.pitch = 0.9*self.pitch + 0.1*(pwm[0] + pwm[1] - pwm[2] - pwm[3])*10.0
+            self.roll = 0.9*self.roll + 0.1*(pwm[0] - pwm[1] + pwm[2] - pwm[3])*10.0
+            self.depth = max(0.0, self.depth - self.verticalVelocity*dt)
+
+            headingRad = math.radians(self.heading)
+            self.north += (self.forwardVelocity*math.cos(headingRad) - self.sideVelocity*math.sin(headingRad))*dt
+            self.east += (self.forwardVelocity*math.sin(headingRad) + self.sideVelocity*math.cos(headingRad))*dt
+            self.up = -self.depth
+
+    def batteryCurrent(self):
+        '''
+        Current drawn from the dirty power battery.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **amps** - Battery current in amps.\n
+        '''
+        if self.powerStatus == 0:
+            return 0.2
+        return 1.5 + sum([abs(value) for value in self.thrusterPWMs])/204.0*1.5
+
+class SimulatedDevice(threading.Thread):
+    '''
+    Pseudo-terminal backed serial device. Anything the navigation process writes to *portName* is handed to receive, and anything
+    passed to send comes out of the port after the reply delay plus a random jitter, possibly with a corrupted byte.
+    '''
+    def __init__(self, vehicleState, outputRate=0, jitter=0.0, corruption=0.0, responseDelay=0.001, seed=None):
+        '''
+        Opens the pseudo-terminal (does not start the thread).
+
+        **Parameters**: \n
+        * **vehicleState** - Shared VehicleState.
+        * **outputRate** - Unsolicited outputs per second (0 means the device only answers requests).
+        * **jitter** - Largest random extra delay in seconds added to every reply and output.
+        * **corruption** - Chance (0-1) that a sent data packet gets one bit flipped.
+        * **responseDelay** - Time in seconds the device takes to answer a request.
+        * **seed** - Random seed so a run can be repeated.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self.vehicleState = vehicleState
+        self.masterFd, self.slaveFd = pty.openpty()
+        tty.setraw(self.slaveFd) #No echo or line editing, bytes go through untouched
+        self.portName = os.ttyname(self.slaveFd)
+
+        self.outputPeriod = None
+        if outputRate > 0:
+            self.outputPeriod = 1.0/outputRate
+        self.nextOutputTime = time.time()
+        self.jitter = jitter
+        self.corruption = corruption
+        self.responseDelay = responseDelay
+        self.random = random.Random(seed)
+
+        self.pendingWrites = [] #Heap of [sendTime, writeNumber, data]
+        self.writeNumber = 0
+
+        self.runThread = True
+
+        self.bytesReceived = 0
+        self.bytesSent = 0
+        self.dataPacketsReceived = 0
+        self.dataPacketsSent = 0
+        self.dataPacketsCorrupted = 0
+
+    def run(self):
+        '''
+        Waits for bytes from the navigation process, unsolicited outputs and delayed replies until the thread is killed.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        while self.runThread:
+            currentTime = time.time()
+            waitTime = 0.1
+            if self.outputPeriod != None:
+                waitTime = min(waitTime, self.nextOutputTime - currentTime)
+            if len(self.pendingWrites) > 0:
+                waitTime = min(waitTime, self.pendingWrites[0][0] - currentTime)
+
+            readable = select.select([self.masterFd], [], [], max(0, waitTime))[0]
+            if readable:
+                try:
+                    data = os.read(self.masterFd, 4096)
+                except OSError:
+                    data = ''
+                self.bytesReceived += len(data)
+                if len(data) > 0:
+                    self.receive(bytearray(data))
+
+            currentTime = time.time()
+            if self.outputPeriod != None and currentTime >= self.nextOutputTime:
+                self.output()
+                self.nextOutputTime = max(self.nextOutputTime + self.outputPeriod, currentTime)
+
+            while len(self.pendingWrites) > 0 and self.pendingWrites[0][0] <= currentTime:
+                data = heapq.heappop(self.pendingWrites)[2]
+                try:
+                    os.write(self.masterFd, str(data))
+                    self.bytesSent += len(data)
+                except OSError as msg:
+                    print "%s simulator couldn't write:" % self.__class__.__name__, msg
+
+    def send(self, data):
+        '''
+        Queues a data packet to come out of the port after the reply delay and jitter, corrupting it if it's unlucky.
+
+        **Parameters**: \n
+        * **data** - Bytes of the data packet.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        data = bytearray(data)
+        if self.corruption > 0 and self.random.random() < self.corruption:
+            data[self.random.randrange(len(data))] ^= 1 << self.random.randrange(8)
+            self.dataPacketsCorrupted += 1
+        sendTime = time.time() + self.responseDelay + self.random.uniform(0, self.jitter)
+        heapq.heappush(self.pendingWrites, [sendTime, self.writeNumber, data])
+        self.writeNumber += 1
+        self.dataPacketsSent += 1
+
+    def receive(self, data):
+        '''
+        Handles bytes written by the navigation process. Overridden by each device.
+
+        **Parameters**: \n
+        * **data** - Bytearray of everything that was read.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        pass
+
+    def output(self):
+        '''
+        Sends one unsolicited output. Overridden by streaming devices.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        pass
+
+    def killThread(self):
+        '''
+        Ends thread process.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.runThread = False
+
+class F0F4BoardSimulator(SimulatedDevice):
+    '''
+    Base for the STM32 boards that use [byte count, frame ID, payload, CRC32] data packets. If *outputRate* is set the board also
+    pushes its telemetry frames unsolicited at that rate, which lets the navigation process be loaded past real sensor rates.
+    '''
+    streamFrameIDs = []
+
+    def __init__(self, vehicleState, **kwargs):
+        '''
+        Opens the pseudo-terminal and sets up the packet framer.
+
+        **Parameters**: \n
+        * **vehicleState** - Shared VehicleState.
+        * **kwargs** - SimulatedDevice options.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        SimulatedDevice.__init__(self, vehicleState, **kwargs)
+        self.packetFramer = data_packet_generator.PacketFramer(None)
+
+    def receive(self, data):
+        '''
+        Answers every complete request.
+
+        **Parameters**: \n
+        * **data** - Bytearray of everything that was read.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.packetFramer.feed(data)
+        for dataPacket in self.packetFramer.extractDataPackets():
+            self.dataPacketsReceived += 1
+            self.handleFrame(dataPacket[1], list(dataPacket[2:-4]))
+
+    def output(self):
+        '''
+        Pushes every telemetry frame as if it had been requested.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        for frameID in self.streamFrameIDs:
+            self.handleFrame(frameID, [])
+
+    def sendFrame(self, frameID, payload):
+        '''
+        Builds a data packet with a CRC32 and sends it.
+
+        **Parameters**: \n
+        * **frameID** - Frame ID of the reply.
+        * **payload** - List of payload bytes.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        dataPacket = bytearray([len(payload) + 6, frameID] + [int(byte) & 0xFF for byte in payload])
+        dataPacket.extend(struct.pack('<L', data_packet_generator.CRC32(str(dataPacket))))
+        self.send(dataPacket)
+
+    def handleFrame(self, frameID, payload):
+        '''
+        Answers one request. Overridden by each board.
+
+        **Parameters**: \n
+        * **frameID** - Frame ID of the request.
+        * **payload** - List of payload bytes.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        pass
+
+class TCBSimulator(F0F4BoardSimulator):
+    '''
+    Thruster control board. Frames 1-4 get motor data, frames 161-164 set motor direction and speed, frame 0xA5 sets all four
+    motors at once.
+    '''
+    streamFrameIDs = [1, 2, 3, 4]
+    setAllSupported = True
+
+    def __init__(self, vehicleState, thrusterOffset, **kwargs):
+        '''
+        Opens the pseudo-terminal.
+
+        **Parameters**: \n
+        * **vehicleState** - Shared VehicleState.
+        * **thrusterOffset** - 0 for TCB1 (thrusters 1-4) or 4 for TCB2 (thrusters 5-8).
+        * **kwargs** - SimulatedDevice options.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        F0F4BoardSimulator.__init__(self, vehicleState, **kwargs)
+        self.thrusterOffset = thrusterOffset
+        self.motors = [[0, 0], [0, 0], [0, 0], [0, 0]] #[direction, pwm]
+
+    def handleFrame(self, frameID, payload):
+        if 1 <= frameID <= 4:
+            direction, pwm = self.motors[frameID-1]
+            hallEffect = pwm*12 #RPM-ish
+            self.sendFrame(frameID, [direction, direction, pwm, pwm, hallEffect & 0xFF, hallEffect >> 8])
+        elif 161 <= frameID <= 164 and len(payload) >= 2:
+            self.setMotor(frameID-161, payload[0], payload[1])
+        elif frameID == 0xA5 and self.setAllSupported and len(payload) >= 8:
+            for motorIndex in range(4):
+                self.setMotor(motorIndex, payload[2*motorIndex], payload[2*motorIndex+1])
+
+    def setMotor(self, motorIndex, direction, pwm):
+        '''
+        Records a motor command from the navigation process.
+
+        **Parameters**: \n
+        * **motorIndex** - Motor 0-3 on this board.
+        * **direction** - 1 for reverse.
+        * **pwm** - PWM 0-255.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.motors[motorIndex] = [direction, pwm]
+        self.vehicleState.setThrusterPWM(self.thrusterOffset + motorIndex, -pwm if direction == 1 else pwm)
+
+class SIBSimulator(F0F4BoardSimulator):
+    '''
+    Sensor interface board. Frames 0x6A-0x6F return temperature, pressure, humidity and depth.
+    '''
+    streamFrameIDs = [0x6F, 0x6A, 0x6B, 0x6C]
+
+    def handleFrame(self, frameID, payload):
+        self.vehicleState.update()
+        noise = self.random.uniform
+
+        def twoBytes(*values):
+            data = []
+            for value in values:
+                value = int(value) & 0xFFFF
+                data.extend([value & 0xFF, value >> 8])
+            return data
+
+        if frameID == 0x6A: #Digital temperature (deg C * 128)
+            self.sendFrame(frameID, twoBytes((30 + noise(-0.2, 0.2))*128, (30 + noise(-0.2, 0.2))*128))
+        elif frameID == 0x6B: #Digital internal pressure (* 128)
+            self.sendFrame(frameID, twoBytes((14.7 + noise(-0.05, 0.05))*128, (14.7 + noise(-0.05, 0.05))*128))
+        elif frameID == 0x6C: #Digital internal humidity (* 128)
+            self.sendFrame(frameID, twoBytes((35 + noise(-1, 1))*128, (35 + noise(-1, 1))*128))
+        elif frameID == 0x6D: #Analog temperature (thermistor ADC counts)
+            self.sendFrame(frameID, twoBytes(512 + noise(-3, 3), 512 + noise(-3, 3), 512 + noise(-3, 3)))
+        elif frameID == 0x6E: #Analog internal pressure (ADC counts)
+            self.sendFrame(frameID, twoBytes(600 + noise(-3, 3), 600 + noise(-3, 3), 600 + noise(-3, 3)))
+        elif frameID == 0x6F: #External pressure, encoded so the navigation process decodes the simulated depth in feet
+            depth = self.vehicleState.depth + noise(-0.02, 0.02)
+            relativeADC = (depth*0.4335 + 14.7)*1023/84.0
+            absoluteADC = (depth*0.4444 + 15.0)*1023/30.0
+            self.sendFrame(frameID, twoBytes(relativeADC, absoluteADC, relativeADC))
+
+class PMUDSimulator(F0F4BoardSimulator):
+    '''
+    Power management board. Frames 0x25-0x27 get power status and battery data, frame 0xC5 sets the power status.
+    '''
+    streamFrameIDs = [0x25, 0x26, 0x27]
+
+    def handleFrame(self, frameID, payload):
+        if frameID == 0x25:
+            self.sendFrame(37, [self.vehicleState.powerStatus])
+        elif frameID == 0x26 or frameID == 0x27:
+            voltage = 16.2 + self.random.uniform(-0.05, 0.05)
+            current = self.vehicleState.batteryCurrent() if frameID == 0x27 else 0.8 #Battery 2 runs the thrusters
+            rawVoltage = min(int(voltage/(102.4/65536.0)), 0xFFFF)
+            rawCurrent = min(int(current/((0.1024/65536.0)/0.005)), 0xFFFF)
+            self.sendFrame(frameID, [rawVoltage & 0xFF, rawVoltage >> 8, rawCurrent & 0xFF, rawCurrent >> 8])
+        elif frameID == 0xC5 and len(payload) >= 1:
+            self.vehicleState.powerStatus = payload[0]
+
+class HydrasSimulator(F0F4BoardSimulator):
+    '''
+    Hydrophone board. Frame 0x62 gets pinger 1 heading, frame 0x61 gets pinger 2 heading, angle of incidence and confidence.
+    '''
+    streamFrameIDs = [0x62, 0x61]
+
+    def __init__(self, vehicleState, **kwargs):
+        F0F4BoardSimulator.__init__(self, vehicleState, **kwargs)
+        self.speedOfSound, self.frequency = 1482, 25
+
+    def handleFrame(self, frameID, payload):
+        heading = int(self.random.uniform(40, 50))
+        if frameID == 0x62:
+            self.sendFrame(98, [heading & 0xFF, heading >> 8])
+        elif frameID == 0x61:
+            self.sendFrame(97, [heading & 0xFF, heading >> 8, 30, 0, 80])
+        elif frameID == 0xF0 and len(payload) >= 3:
+            self.speedOfSound, self.frequency = payload[0] << 8 | payload[1], payload[2]
+
+class WCBSimulator(F0F4BoardSimulator):
+    '''
+    Weapons control board. Frames 0x22 and 0x23 get claw status, the rest fire claws, torpedos and droppers.
+    '''
+    streamFrameIDs = [0x22, 0x23]
+    actuationFrameIDs = [0xC1, 0xC2, 0xB3, 0xC4, 0xB4, 0xC6]
+
+    def __init__(self, vehicleState, **kwargs):
+        F0F4BoardSimulator.__init__(self, vehicleState, **kwargs)
+        self.clawStatus = [0, 0]
+        self.actuations = []
+
+    def handleFrame(self, frameID, payload):
+        if frameID == 0x22 or frameID == 0x23:
+            self.sendFrame(frameID, [self.clawStatus[frameID-0x22]])
+        elif frameID in self.actuationFrameIDs:
+            self.actuations.append([time.time(), frameID, payload])
+            if frameID == 0xC1 or frameID == 0xC2:
+                self.clawStatus[frameID-0xC1] = 1
+
+class DVLSimulator(SimulatedDevice):
+    '''
+    Doppler velocity log streaming PD5 ensembles. "BS" on the command port resets the position back to 0.
+    '''
+    ensembleLength = 88
+
+    def __init__(self, vehicleState, outputRate=8, **kwargs):
+        SimulatedDevice.__init__(self, vehicleState, outputRate=outputRate, **kwargs)
+        self.commandBuffer = bytearray()
+        self.origin = [0.0, 0.0, 0.0]
+
+    def receive(self, data):
+        self.commandBuffer.extend(data)
+        if self.commandBuffer.find('BS') != -1:
+            self.vehicleState.update()
+            self.origin = [self.vehicleState.north, self.vehicleState.east, self.vehicleState.up]
+        del self.commandBuffer[:max(0, len(self.commandBuffer)-1)] #Keep the last byte in case a command is split across reads
+
+    def output(self):
+        state = self.vehicleState
+        state.update()
+        feetToMM = 1/dvl.MM_TO_FEET
+        headingRad = math.radians(state.heading)
+        eastVelocity = state.forwardVelocity*math.sin(headingRad) + state.sideVelocity*math.cos(headingRad)
+        northVelocity = state.forwardVelocity*math.cos(headingRad) - state.sideVelocity*math.sin(headingRad)
+
+        ensemble = bytearray(self.ensembleLength)
+        dvl.PD5_STRUCT.pack_into(ensemble, 0,
+                                 int(eastVelocity*feetToMM), int(northVelocity*feetToMM), int(state.verticalVelocity*feetToMM), 0, #Velocities, elevation
+                                 1482, 2000, #Speed of sound, water temperature (hundredths)
+                                 int(state.depth*30.48), int(state.pitch*100), int(state.roll*100), int(state.heading*100) % 36000,
+                                 int((state.east - self.origin[1])*feetToMM), int((state.north - self.origin[0])*feetToMM), int((state.up - self.origin[2])*feetToMM), 10)
+        ensemble[0], ensemble[1] = 0x7D, 1 #PD5
+        ensemble[2], ensemble[3] = (self.ensembleLength-2) & 0xFF, (self.ensembleLength-2) >> 8 #Byte count leaves out the checksum
+        checksum = dvl.ensembleChecksum(ensemble, self.ensembleLength-2)
+        ensemble[-2], ensemble[-1] = checksum & 0xFF, checksum >> 8
+        self.send(ensemble)
+
+class SpartonAhrsSimulator(SimulatedDevice):
+    '''
+    Sparton AHRS answering legacy protocol requests for true heading (0x02) and pitch and roll (0x06).
+    '''
+    def __init__(self, vehicleState, headingOffset=0.0, **kwargs):
+        SimulatedDevice.__init__(self, vehicleState, **kwargs)
+        self.headingOffset = headingOffset #Gives each unit its own small error like the real ones
+        self.requestBuffer = bytearray()
+
+    def receive(self, data):
+        self.requestBuffer.extend(data)
+        while len(self.requestBuffer) >= 3:
+            if self.requestBuffer[0] != 0xA4:
+                del self.requestBuffer[0]
+                continue
+            end = self.requestBuffer.find('\xa0', 2)
+            if end == -1:
+                break
+            frameID = self.requestBuffer[1]
+            del self.requestBuffer[:end+1]
+            self.dataPacketsReceived += 1
+
+            self.vehicleState.update()
+            if frameID == 0x02 or frameID == 0x09:
+                heading = int(((self.vehicleState.heading + self.headingOffset + self.random.uniform(-0.3, 0.3)) % 360)*4096/360.0) & 0xFFFF
+                self.send([0xA4, frameID, heading >> 8, heading & 0xFF, 0xA0])
+            elif frameID == 0x06:
+                pitch = int((self.vehicleState.pitch + self.random.uniform(-0.2, 0.2))*4096/90.0) & 0xFFFF
+                roll = int((self.vehicleState.roll + self.random.uniform(-0.2, 0.2))*4096/180.0) & 0xFFFF
+                self.send([0xA4, 0x06, pitch >> 8, pitch & 0xFF, roll >> 8, roll & 0xFF, 0xA0])
+
+class DVLAhrsSimulator(SimulatedDevice):
+    '''
+    The DVL's side of the fake TRAX AHRS link. Asks for the module info once and then for AHRS data at *outputRate*.
+    '''
+    def __init__(self, vehicleState, outputRate=10, **kwargs):
+        SimulatedDevice.__init__(self, vehicleState, outputRate=outputRate, **kwargs)
+        self.modInfoRequested = False
+        self.replyBuffer = bytearray()
+
+    def output(self):
+        frameID = 4 #kGetData
+        if not self.modInfoRequested:
+            frameID = 1 #kGetModInfo
+            self.modInfoRequested = True
+        request = bytearray([0x00, 0x05, frameID])
+        request.extend(struct.pack('>H', data_packet_generator.CRC16(str(request))))
+        self.send(request)
+
+    def receive(self, data):
+        self.replyBuffer.extend(data)
+        while len(self.replyBuffer) >= 2:
+            byteCount = self.replyBuffer[0] << 8 | self.replyBuffer[1]
+            if byteCount < 5 or len(self.replyBuffer) < byteCount:
+                if byteCount < 5:
+                    del self.replyBuffer[0]
+                    continue
+                break
+            del self.replyBuffer[:byteCount]
+            self.dataPacketsReceived += 1
+
+class ArduinoSimulator(SimulatedDevice):
+    '''
+    Sink for the bytes the missions write to the Arduino.
+    '''
+    def receive(self, data):
+        self.dataPacketsReceived += 1
+
+def createSimulators(rateScale=1.0, boardStreamRate=0, jitter=0.0, corruption=0.0, seed=None):
+    '''
+    Creates (but does not start) a simulator for every device the navigation process opens.
+
+    **Parameters**: \n
+    * **rateScale** - Multiplies the DVL ensemble rate and DVL AHRS request rate.
+    * **boardStreamRate** - Unsolicited telemetry bursts per second from each STM32 board (0 means request/response only).
+    * **jitter** - Largest random extra delay in seconds on every reply.
+    * **corruption** - Chance (0-1) that a sent data packet gets one bit flipped.
+    * **seed** - Random seed so a run can be repeated.
+
+    **Returns**: \n
+    * **simulators** - Dictionary of comPortList key: simulator.\n
+    '''
+    vehicleState = VehicleState()
+    options = {'jitter': jitter, 'corruption': corruption, 'seed': seed}
+    boardOptions = dict(options, outputRate=boardStreamRate)
+
+    return {"TCB1": TCBSimulator(vehicleState, 0, **boardOptions),
+            "TCB2": TCBSimulator(vehicleState, 4, **boardOptions),
+            "SIB": SIBSimulator(vehicleState, **boardOptions),
+            "PMUD": PMUDSimulator(vehicleState, **boardOptions),
+            "WCB": WCBSimulator(vehicleState, **boardOptions),
+            "HYDRAS": HydrasSimulator(vehicleState, **boardOptions),
+            "DVL": DVLSimulator(vehicleState, outputRate=8*rateScale, **options),
+            "DVLAHRS": DVLAhrsSimulator(vehicleState, outputRate=10*rateScale, **options),
+            "AHRS1": SpartonAhrsSimulator(vehicleState, headingOffset=0.5, **options),
+            "AHRS2": SpartonAhrsSimulator(vehicleState, headingOffset=-0.5, **options),
+            "AHRS3": SpartonAhrsSimulator(vehicleState, headingOffset=0.0, **options),
+            "ARDUINO": ArduinoSimulator(vehicleState, **options)}
+
+def comPortMap(simulators):
+    '''
+    Builds the comPortList NavigationManagementSystem.start expects, pointing every device at its simulator.
+
+    **Parameters**: \n
+    * **simulators** - Dictionary from createSimulators.
+
+    **Returns**: \n
+    * **comPortList** - Dictionary of device name: pseudo-terminal path, plus TCBSETALL if the simulated TCBs take frame 0xA5.\n
+    '''
+    comPortList = dict((name, simulator.portName) for name, simulator in simulators.items())
+    comPortList["AUX"] = comPortList["ARDUINO"]
+    comPortList["TCBSETALL"] = simulators["TCB1"].setAllSupported and simulators["TCB2"].setAllSupported
+    return comPortList
@@ -81,9 +81,11 @@ class AHRSDummyCommunicator(data_packet_generator.DataPacket):
        
 dvl = AHRSDummyCommunicator()
 
+ahrsDataSeq = 0
+
 while True:
-    while len(spartonResponseThread.getList) > 0:
-        ahrsData = spartonResponseThread.getList.pop(0)
+    if spartonResponseThread.latestData.changedSince(ahrsDataSeq):
+        ahrsData, timestamp, ahrsDataSeq = spartonResponseThread.latestData.read()
         headingToInts = [int(ord(b)) for b in struct.pack('>f', ahrsData[0])]
         pitchToInts = [int(ord(b)) for b in struct.pack('>f', ahrsData[1])]
         rollToInts = [int(ord(b)) for b in struct.pack('>f', ahrsData[2])]
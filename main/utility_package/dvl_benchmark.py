@@ -0,0 +1,106 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: dvl_benchmark
+   :synopsis: Times the DVL PD5 decoders against the old field by field decode.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Stand-alone program (run from the repository root with "python -m main.utility_package.dvl_benchmark") that builds
+              synthetic PD5 ensembles, checks that every decoder agrees, and prints how long each one takes per ensemble.
+'''
+
+import struct
+import random
+import timeit
+import main.external_devices.dvl as dvl
+
+NUMBER_OF_ENSEMBLES = 20000
+ENSEMBLE_LENGTH = 88 #Bytes in a PD5 ensemble including the 4 header bytes
+
+def makeEnsemble():
+    '''
+    Builds one raw PD5 ensemble with random field values.
+
+    **Parameters**: \n
+    * **No Input Parameters.**
+
+    **Returns**: \n
+    * **ensemble** - Raw ensemble bytes.\n
+    '''
+    ensemble = bytearray(ENSEMBLE_LENGTH)
+    ensemble[0], ensemble[1], ensemble[2], ensemble[3] = 0x7D, 1, (ENSEMBLE_LENGTH-2) & 0xFF, (ENSEMBLE_LENGTH-2) >> 8
+    values = [random.randint(-30000, 30000) for x in range(9)] + [random.randint(0, 35999)] + [random.randint(-2000000, 2000000) for x in range(4)]
+    dvl.PD5_STRUCT.pack_into(ensemble, 0, *values)
+    return str(ensemble)
+
+def legacyDecode(ensemble):
+    '''
+    The field by field decode the navigation process used before dvl.decodePD5, working on a list of ints.
+
+    **Parameters**: \n
+    * **ensemble** - Ensemble as [ID string, ints...].
+
+    **Returns**: \n
+    * **[position, velocity, orientation, miscData]** - Decoded DVL data.\n
+    '''
+    northPosition = (struct.unpack('i', struct.pack('I', ensemble[61] << 24 | ensemble[60] << 16 | ensemble[59] << 8 | ensemble[58]))[0])*0.00328084 #mm to feet
+    eastPosition = (struct.unpack('i', struct.pack('I', ensemble[57] << 24 | ensemble[56] << 16 | ensemble[55] << 8 | ensemble[54]))[0])*0.00328084 #mm to feet
+    upPosition = (struct.unpack('i', struct.pack('I', ensemble[65] << 24 | ensemble[64] << 16 | ensemble[63] << 8 | ensemble[62]))[0])*0.00328084 #mm to feet
+    positionError = struct.unpack('i', struct.pack('I', ensemble[69] << 24 | ensemble[68] << 16 | ensemble[67] << 8 | ensemble[66]))[0]
+
+    xVel = (struct.unpack('h', struct.pack('H', ensemble[6] << 8 | ensemble[5]))[0])*0.00328084 #mm/s to feet/s
+    yVel = (struct.unpack('h', struct.pack('H', ensemble[8] << 8 | ensemble[7]))[0])*0.00328084 #mm/s to feet/s
+    zVel = (struct.unpack('h', struct.pack('H', ensemble[10] << 8 | ensemble[9]))[0])*0.00328084 #mm/s to feet/s
+
+    heading = (ensemble[53] << 8 | ensemble[52])/100.0
+    pitch = struct.unpack('h', struct.pack('H', ensemble[49] << 8 | ensemble[48]))[0]/100.0
+    roll = struct.unpack('h', struct.pack('H', ensemble[51] << 8 | ensemble[50]))[0]/100.0
+    depth = struct.unpack('h', struct.pack('H', ensemble[47] << 8 | ensemble[46]))[0]/100.0
+
+    elevation = struct.unpack('h', struct.pack('H', ensemble[12] << 8 | ensemble[11]))[0]
+    speedOfSound = struct.unpack('h', struct.pack('H', ensemble[42] << 8 | ensemble[41]))[0]
+    waterTemp = struct.unpack('h', struct.pack('H', ensemble[44] << 8 | ensemble[43]))[0]/100.0 #deg c
+
+    return [[northPosition, eastPosition, upPosition, positionError], [xVel, yVel, zVel], [heading, pitch, roll, depth], [elevation, speedOfSound, waterTemp]]
+
+def timePerEnsemble(function, *args):
+    '''
+    Runs a function once and times it.
+
+    **Parameters**: \n
+    * **function** - Function to time.
+    * **args** - Arguments for the function.
+
+    **Returns**: \n
+    * **microseconds** - Time per ensemble in microseconds.\n
+    '''
+    startTime = timeit.default_timer()
+    function(*args)
+    return (timeit.default_timer() - startTime)*1e6/NUMBER_OF_ENSEMBLES
+
+rawEnsembles = [makeEnsemble() for x in range(NUMBER_OF_ENSEMBLES)]
+legacyEnsembles = [[hex(ord(ensemble[0]))] + [ord(byte) for byte in ensemble[1:]] for ensemble in rawEnsembles] #What DVLResponse used to hand over
+
+#Make sure every decoder agrees before timing them
+records = dvl.decodePD5Batch(rawEnsembles)
+for index in range(0, NUMBER_OF_ENSEMBLES, 997):
+    legacy = legacyDecode(legacyEnsembles[index])
+    single = dvl.decodePD5(rawEnsembles[index])
+    batch = records[index]
+    new = [[single.northPosition, single.eastPosition, single.upPosition, single.positionError], [single.xVel, single.yVel, single.zVel],
+           [single.heading, single.pitch, single.roll, single.depth], [single.elevation, single.speedOfSound, single.waterTemp]]
+    for legacyGroup, newGroup in zip(legacy, new):
+        for legacyValue, newValue in zip(legacyGroup, newGroup):
+            assert abs(legacyValue - newValue) < 1e-9, (legacy, new)
+    for name in dvl.PD5_FIELDS:
+        assert abs(batch[name] - getattr(single, name)) < 1e-9, (name, batch[name], getattr(single, name))
+
+legacyTime = timePerEnsemble(lambda: [legacyDecode(ensemble) for ensemble in legacyEnsembles])
+singleTime = timePerEnsemble(lambda: [dvl.decodePD5(ensemble) for ensemble in rawEnsembles])
+batchTime = timePerEnsemble(dvl.decodePD5Batch, rawEnsembles)
+
+print "Decoded %d PD5 ensembles, all decoders agree" % NUMBER_OF_ENSEMBLES
+print "Field by field (old):  %.2f us/ensemble" % legacyTime
+print "decodePD5 (struct):    %.2f us/ensemble (%.1fx)" % (singleTime, legacyTime/singleTime)
+print "decodePD5Batch (NumPy): %.2f us/ensemble (%.1fx)" % (batchTime, legacyTime/batchTime)
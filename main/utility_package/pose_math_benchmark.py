@@ -0,0 +1,93 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: pose_math_benchmark
+   :synopsis: Times the closed form pose error and rotation against the old matrix chain.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Stand-alone program (run from the repository root with "python -m main.utility_package.pose_math_benchmark") that
+              builds random poses, checks that AdvancedMath.worldToBody agrees with the matrix chain advancedMove used to build
+              every tick, and that AdvancedMath.Rot agrees with the old skew matrix Rot, then prints how long each one takes.
+'''
+
+import math
+import random
+import timeit
+import numpy
+import main.utility_package.utilities as utilities
+
+NUMBER_OF_POSES = 2000
+
+advM = utilities.AdvancedMath()
+e1, e2, e3 = advM.e1, advM.e2, advM.e3
+
+def legacyRot(k, angle):
+    '''
+    The Rot AdvancedMath had before fillRot, building skew matrices and appending a row and column.
+
+    **Parameters**: \n
+    * **k** - The unit vector to rotate about.
+    * **angle** - The angle in degrees.
+
+    **Returns**: \n
+    * **numpy.round(R, 8)** - 4x4 rotation matrix.\n
+    '''
+    I = numpy.eye(3, dtype=int)
+    R = I + numpy.dot(math.sin(math.radians(angle)), advM.skew(k)) + (1-math.cos(math.radians(angle))) * numpy.dot(advM.skew(k), advM.skew(k))
+    R = numpy.append(R, [[0, 0, 0]], axis = 0)
+    R = numpy.append(R, [[0], [0], [0], [1]], axis = 1)
+
+    return numpy.round(R, 8)
+
+def matrixChain(yaw, eastError, upError, northError):
+    '''
+    The position error advancedMove worked out every tick before worldToBody.
+
+    **Parameters**: \n
+    * **yaw** - Current yaw in degrees.
+    * **eastError** - Position error in the East/West direction.
+    * **upError** - Position error in the Up/Down direction.
+    * **northError** - Position error in the North/South direction.
+
+    **Returns**: \n
+    * **error** - [x, y, z] position error.\n
+    '''
+    T = advM.matrixMultiply(advM.inv(legacyRot(e2, yaw)), advM.Trans(e1, eastError), advM.Trans(e2, upError), advM.Trans(e3, northError), legacyRot(e2, yaw))
+    rot, pos = advM.extractData(T)
+    return [pos[0][0], pos[1][0], pos[2][0]]
+
+def timePerPose(function):
+    '''
+    Runs a function on every pose and times it.
+
+    **Parameters**: \n
+    * **function** - Function taking yaw, eastError, upError, northError.
+
+    **Returns**: \n
+    * **microseconds** - Time per pose in microseconds.\n
+    '''
+    startTime = timeit.default_timer()
+    for pose in poses:
+        function(*pose)
+    return (timeit.default_timer() - startTime)*1e6/NUMBER_OF_POSES
+
+poses = [[random.uniform(0, 360), random.uniform(-50, 50), random.uniform(-15, 0), random.uniform(-50, 50)] for x in range(NUMBER_OF_POSES)]
+
+#Make sure the old and new math agree before timing them
+for yaw, eastError, upError, northError in poses:
+    old, new = matrixChain(yaw, eastError, upError, northError), advM.worldToBody(yaw, eastError, upError, northError)
+    for oldValue, newValue in zip(old, new):
+        assert abs(oldValue - newValue) < 1e-6, (old, new) #The chain rounds to 8 decimals after every product
+    assert numpy.array_equal(legacyRot(e2, yaw), advM.Rot(e2, yaw)), yaw
+
+chainTime = timePerPose(matrixChain)
+worldToBodyTime = timePerPose(advM.worldToBody)
+legacyRotTime = timePerPose(lambda yaw, eastError, upError, northError: legacyRot(e2, yaw))
+rotTime = timePerPose(lambda yaw, eastError, upError, northError: advM.Rot(e2, yaw))
+
+print "Checked %d random poses, old and new math agree" % NUMBER_OF_POSES
+print "Pose error, matrix chain (old): %7.2f us/tick" % chainTime
+print "Pose error, worldToBody:        %7.2f us/tick (%.1fx)" % (worldToBodyTime, chainTime/worldToBodyTime)
+print "Rot(e2, yaw), skew (old):       %7.2f us" % legacyRotTime
+print "Rot(e2, yaw), fillRot:          %7.2f us (%.1fx)" % (rotTime, legacyRotTime/rotTime)
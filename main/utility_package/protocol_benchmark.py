@@ -0,0 +1,463 @@
+'''
+Copyright 2026, SDSU Mechatronics, All rights reserved.
+
+.. module:: protocol_benchmark
+   :synopsis: Measures how fast every board command is built and every board reply is decoded.
+
+:Author: SDSU Mechatronics <sdsumechatronics@gmail.com>
+:Date: Created on Oct 18, 2026
+:Description: Stand-alone program (run from the repository root with "python -m main.utility_package.protocol_benchmark") that
+              drives every outgoing command class and every decode path against an in-memory serial port, and reports packets
+              per second and memory use per packet. Results can be saved as JSON and compared against a run from another commit:
+
+              python -m main.utility_package.protocol_benchmark --output before.json
+              (check out the other commit)
+              python -m main.utility_package.protocol_benchmark --compare before.json
+'''
+
+import gc
+import os
+import sys
+import json
+import time
+import struct
+import timeit
+import argparse
+import platform
+import subprocess
+import serial
+import main.external_devices.data_packet_generator as data_packet_generator
+import main.external_devices.microcontroller_tcb as microcontroller_tcb
+import main.external_devices.microcontroller_sib as microcontroller_sib
+import main.external_devices.microcontroller_pmud as microcontroller_pmud
+import main.external_devices.microcontroller_hydras as microcontroller_hydras
+import main.external_devices.microcontroller_wcb as microcontroller_wcb
+import main.external_devices.sparton_ahrs as sparton_ahrs
+import main.external_devices.dvl as dvl
+import main.external_devices.dynamixel_comm.dynamixel as dynamixel
+import main.external_devices.dynamixel_comm.ax_series as ax_series
+
+try:
+    import tracemalloc #Built in from Python 3.4, pytracemalloc on 2.7
+except ImportError:
+    tracemalloc = None
+
+RESULTS_VERSION = 1
+
+class NullSerial:
+    '''
+    Stands in for a serial.Serial port. Writes are counted and thrown away, and reads come out of a buffer loaded with *load*.
+    '''
+    def __init__(self):
+        '''
+        Starts with nothing to read.
+
+        **Parameters**: \n
+        * **No Input Parameters.**
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.readBuffer = ''
+        self.readIndex = 0
+        self.bytesWritten = 0
+        self.writes = 0
+
+    def load(self, data):
+        '''
+        Replaces the bytes waiting to be read.
+
+        **Parameters**: \n
+        * **data** - String of bytes.
+
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.readBuffer = data
+        self.readIndex = 0
+
+    def write(self, data):
+        self.bytesWritten += len(data)
+        self.writes += 1
+        return len(data)
+
+    def inWaiting(self):
+        return len(self.readBuffer) - self.readIndex
+
+    def read(self, size=1):
+        data = self.readBuffer[self.readIndex:self.readIndex+size]
+        self.readIndex += len(data)
+        return data
+
+    def flushInput(self):
+        pass
+
+    def getPort(self):
+        return "NULL"
+
+class NoSleep:
+    '''
+    Replaces the time module inside dynamixel so the 5 ms bus turnaround sleep after every write doesn't hide the encode time.
+    '''
+    time = staticmethod(time.time)
+
+    @staticmethod
+    def sleep(seconds):
+        pass
+
+def f0f4Frame(frameID, payload):
+    '''
+    Builds an F0/F4 reply the way the boards send it.
+
+    **Parameters**: \n
+    * **frameID** - Frame ID.
+    * **payload** - List of payload bytes.
+
+    **Returns**: \n
+    * **dataPacket** - String of bytes including the CRC32.\n
+    '''
+    dataPacket = str(bytearray([len(payload) + 6, frameID] + payload))
+    return dataPacket + struct.pack('<L', data_packet_generator.CRC32(dataPacket))
+
+def trax16Frame(frameID, payload):
+    '''
+    Builds a request from the DVL to the fake TRAX AHRS.
+
+    **Parameters**: \n
+    * **frameID** - Frame ID.
+    * **payload** - List of payload bytes.
+
+    **Returns**: \n
+    * **dataPacket** - String of bytes including the big endian CRC16.\n
+    '''
+    dataPacket = str(bytearray([0, len(payload) + 5, frameID] + payload))
+    return dataPacket + struct.pack('>H', data_packet_generator.CRC16(dataPacket))
+
+def pd5Ensemble():
+    '''
+    Builds a PD5 ensemble with typical values.
+
+    **Parameters**: \n
+    * **No Input Parameters.**
+
+    **Returns**: \n
+    * **ensemble** - String of 88 bytes.\n
+    '''
+    ensemble = bytearray(88)
+    dvl.PD5_STRUCT.pack_into(ensemble, 0, 120, -45, 3, 0, 1482, 2150, 305, 150, -220, 27310, 1524, -3048, -610, 12)
+    ensemble[0], ensemble[1], ensemble[2], ensemble[3] = 0x7D, 1, 86, 0
+    checksum = dvl.ensembleChecksum(ensemble, 86)
+    ensemble[86], ensemble[87] = checksum & 0xFF, checksum >> 8
+    return str(ensemble)
+
+def decodeRunner(serialObject, data, handler):
+    '''
+    Makes a benchmark operation that loads *data* on the port and lets *handler* read and decode it.
+
+    **Parameters**: \n
+    * **serialObject** - NullSerial the handler reads from.
+    * **data** - Bytes of one reply.
+    * **handler** - Function with no parameters that reads the port.
+
+    **Returns**: \n
+    * **operation** - Function with no parameters.\n
+    '''
+    load = serialObject.load
+    def operation():
+        load(data)
+        handler()
+    return operation
+
+def encodeBenchmarks():
+    '''
+    Builds an operation for every outgoing command.
+
+    **Parameters**: \n
+    * **No Input Parameters.**
+
+    **Returns**: \n
+    * **benchmarks** - List of [name, operation].\n
+    '''
+    port = NullSerial()
+    tcb = microcontroller_tcb.TCBDataPackets(port)
+    sib = microcontroller_sib.SIBDataPackets(port)
+    pmud = microcontroller_pmud.PMUDDataPackets(port)
+    hydras = microcontroller_hydras.HydrasDataPackets(port)
+    wcb = microcontroller_wcb.WCBDataPackets(port)
+
+    dynamixelPort = serial.Serial() #Dynamixel only accepts a real Serial object, an unopened one is pointed at a NullSerial
+    dynamixelPort.write = NullSerial().write
+    servo = ax_series.AXCommands(dynamixelPort)
+    dvlAhrs = dvl.AHRSDummyCommunicator(port)
+
+    return [["encode.tcb.getMotorData", lambda: tcb.getMotorData(1)],
+            ["encode.tcb.setMotorDirectionSpeed", lambda: tcb.setMotorDirectionSpeed(2, 1, 180)],
+            ["encode.sib.getAnalogExternalPressure", sib.getAnalogExternalPressure],
+            ["encode.sib.getDigitalTemperature", sib.getDigitalTemperature],
+            ["encode.sib.getDigitalInternalPressure", sib.getDigitalInternalPressure],
+            ["encode.sib.getDigitalInternalHumidity", sib.getDigitalInternalHumidity],
+            ["encode.pmud.getPowerStatus", pmud.getPowerStatus],
+            ["encode.pmud.getBattery1Data", pmud.getBattery1Data],
+            ["encode.pmud.getBattery2Data", pmud.getBattery2Data],
+            ["encode.pmud.setPowerStatus", lambda: pmud.setPowerStatus(1)],
+            ["encode.hydras.getPingerHeading1", hydras.getPingerHeading1],
+            ["encode.hydras.getPingerHeading2", hydras.getPingerHeading2],
+            ["encode.hydras.setInitialData", lambda: hydras.setInitialData(1482, 25)],
+            ["encode.wcb.getClaw1Status", wcb.getClaw1Status],
+            ["encode.wcb.getClaw2Status", wcb.getClaw2Status],
+            ["encode.wcb.setClaw1Close", wcb.setClaw1Close],
+            ["encode.wcb.setTorpedo1Launch", lambda: wcb.setTorpedo1Launch(1)],
+            ["encode.wcb.setDropper1Launch", wcb.setDropper1Launch],
+            ["encode.dvlahrs.sendID", dvlAhrs.sendID],
+            ["encode.dvlahrs.sendAHRSData", dvlAhrs.sendAHRSData],
+            ["encode.dynamixel.getPresentPosition", lambda: servo.getPresentPosition(1)],
+            ["encode.dynamixel.setGoalPosition", lambda: servo.sendDataPacket(1, servo.WRITE_DATA, 0x1E, 0x00, 0x02)]]
+
+def decodeBenchmarks():
+    '''
+    Builds an operation for every decode path, each fed one well formed reply per call.
+
+    **Parameters**: \n
+    * **No Input Parameters.**
+
+    **Returns**: \n
+    * **benchmarks** - List of [name, operation].\n
+    '''
+    benchmarks = []
+    helper = data_packet_generator.DataPacket()
+
+    tcbFrame = f0f4Frame(2, [1, 1, 180, 178, 0x10, 0x27])
+    sibFrame = f0f4Frame(0x6F, [0x40, 0x02, 0x20, 0x02, 0x40, 0x02])
+    benchmarks.append(["decode.crc.calcCRC32In", lambda dataPacket=[ord(byte) for byte in tcbFrame]: helper.calcCRC32In(dataPacket)])
+    benchmarks.append(["decode.crc.calcCRC16In", lambda dataPacket=[ord(byte) for byte in trax16Frame(4, [])]: helper.calcCRC16In(dataPacket)])
+    packetFramer = data_packet_generator.PacketFramer(None)
+    def framerOperation():
+        packetFramer.feed(sibFrame)
+        packetFramer.extractDataPackets()
+    benchmarks.append(["decode.crc.PacketFramer", framerOperation])
+
+    boards = [["tcb", microcontroller_tcb.TCBResponse, tcbFrame],
+              ["sib", microcontroller_sib.SIBResponse, sibFrame],
+              ["pmud", microcontroller_pmud.PMUDResponse, f0f4Frame(0x27, [0x40, 0x28, 0x00, 0x10])],
+              ["hydras", microcontroller_hydras.HydrasResponse, f0f4Frame(97, [45, 0, 30, 0, 80])],
+              ["wcb", microcontroller_wcb.WCBResponse, f0f4Frame(0x22, [1])]]
+    for name, responseClass, frame in boards:
+        port = NullSerial()
+        response = responseClass(port)
+        benchmarks.append(["decode.%s.handleData" % name, decodeRunner(port, frame, response.handleData)])
+
+    spartonPort = NullSerial()
+    spartonResponse = sparton_ahrs.SpartonAhrsResponse(None) #An unopened Serial, swapped for a NullSerial below
+    spartonResponse.spartonAhrs.SPARTON_AHRS = spartonPort
+    spartonSample = str(bytearray([0xA4, 0x02, 0x08, 0x00, 0xA0, 0xA4, 0x06, 0x01, 0x20, 0xFE, 0x10, 0xA0]))
+    benchmarks.append(["decode.sparton.handleData", decodeRunner(spartonPort, spartonSample, spartonResponse.handleData)])
+
+    ensemble = pd5Ensemble()
+    dvlPort = NullSerial()
+    dvlResponse = dvl.DVLResponse(dvlPort)
+    benchmarks.append(["decode.dvl.handleData", decodeRunner(dvlPort, ensemble, dvlResponse.handleData)])
+    benchmarks.append(["decode.dvl.decodePD5", lambda: dvl.decodePD5(ensemble)])
+
+    dvlAhrsPort = NullSerial()
+    dvlAhrs = dvl.AHRSDummyCommunicator(dvlAhrsPort)
+    benchmarks.append(["decode.dvlahrs.handleData", decodeRunner(dvlAhrsPort, trax16Frame(4, []), dvlAhrs.handleData)])
+
+    dynamixelPort = serial.Serial()
+    dynamixelNullPort = NullSerial()
+    dynamixelPort.inWaiting, dynamixelPort.read = dynamixelNullPort.inWaiting, dynamixelNullPort.read
+    servo = ax_series.AXCommands(dynamixelPort)
+    statusPacket = [0xFF, 0xFF, 1, 4, 0, 0x00, 0x02]
+    statusPacket.append(~sum(statusPacket[2:]) & 0xFF)
+    benchmarks.append(["decode.dynamixel.recieveDataPacket", decodeRunner(dynamixelNullPort, str(bytearray(statusPacket)), servo.recieveDataPacket)])
+
+    return benchmarks
+
+def timeOperation(operation, duration, repeat):
+    '''
+    Finds how many times per second an operation can run, using the best of several runs.
+
+    **Parameters**: \n
+    * **operation** - Function with no parameters.
+    * **duration** - Rough time in seconds for each run.
+    * **repeat** - Number of runs.
+
+    **Returns**: \n
+    * **packetsPerSecond** - Best rate seen.\n
+    '''
+    iterations = 1
+    while True: #Find an iteration count that takes about *duration*
+        startTime = timeit.default_timer()
+        for x in xrange(iterations):
+            operation()
+        elapsedTime = timeit.default_timer() - startTime
+        if elapsedTime >= duration/4.0 or iterations >= 10**7:
+            break
+        iterations *= 4
+    iterations = max(1, int(iterations*duration/max(elapsedTime, 1e-9)))
+
+    bestTime = None
+    for run in range(repeat):
+        startTime = timeit.default_timer()
+        for x in xrange(iterations):
+            operation()
+        elapsedTime = timeit.default_timer() - startTime
+        if bestTime == None or elapsedTime < bestTime:
+            bestTime = elapsedTime
+    return iterations/max(bestTime, 1e-9)
+
+def measureMemory(operation, samples=500):
+    '''
+    Measures memory per packet. Net objects is how many garbage collected objects each call leaves behind (growth, not churn).
+    Peak bytes is the most memory a single call had allocated at once, only available when tracemalloc is.
+
+    **Parameters**: \n
+    * **operation** - Function with no parameters.
+    * **samples** - Number of calls to average over.
+
+    **Returns**: \n
+    * **[netObjectsPerPacket, peakBytesPerPacket]** - Peak bytes is None without tracemalloc.\n
+    '''
+    gcWasEnabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        startCount = gc.get_count()[0]
+        for x in xrange(samples):
+            operation()
+        netObjects = (gc.get_count()[0] - startCount)/float(samples)
+    finally:
+        if gcWasEnabled:
+            gc.enable()
+
+    peakBytes = None
+    if tracemalloc != None:
+        total = 0
+        for x in xrange(samples):
+            tracemalloc.start()
+            startBytes = tracemalloc.get_traced_memory()[0]
+            operation()
+            total += tracemalloc.get_traced_memory()[1] - startBytes
+            tracemalloc.stop()
+        peakBytes = total/float(samples)
+
+    return [netObjects, peakBytes]
+
+def gitRevision():
+    '''
+    Finds the commit the benchmark is running on.
+
+    **Parameters**: \n
+    * **No Input Parameters.**
+
+    **Returns**: \n
+    * **revision** - Short commit hash with "-dirty" if there are uncommitted changes, or "unknown".\n
+    '''
+    repositoryPath = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        revision = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=repositoryPath).strip()
+        if subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repositoryPath).strip():
+            revision += "-dirty"
+        return revision
+    except Exception:
+        return "unknown"
+
+def runBenchmarks(nameFilter=None, duration=0.2, repeat=3):
+    '''
+    Runs every benchmark whose name contains *nameFilter*.
+
+    **Parameters**: \n
+    * **nameFilter** - Part of a benchmark name, or None for all of them.
+    * **duration** - Rough time in seconds for each timing run.
+    * **repeat** - Timing runs per benchmark.
+
+    **Returns**: \n
+    * **results** - Dictionary ready to be saved as JSON.\n
+    '''
+    originalTime = dynamixel.time
+    dynamixel.time = NoSleep
+    try:
+        benchmarks = encodeBenchmarks() + decodeBenchmarks()
+        results = {}
+        for name, operation in benchmarks:
+            if nameFilter != None and nameFilter not in name:
+                continue
+            operation() #Warm up and make sure it works before timing it
+            packetsPerSecond = timeOperation(operation, duration, repeat)
+            netObjects, peakBytes = measureMemory(operation)
+            results[name] = {"packetsPerSecond": packetsPerSecond, "usPerPacket": 1e6/packetsPerSecond,
+                             "netObjectsPerPacket": netObjects, "peakBytesPerPacket": peakBytes}
+    finally:
+        dynamixel.time = originalTime
+
+    return {"version": RESULTS_VERSION, "revision": gitRevision(), "python": platform.python_version(),
+            "platform": platform.platform(), "date": time.strftime("%Y-%m-%d %H:%M:%S"), "benchmarks": results}
+
+def printResults(results):
+    '''
+    Prints a table of results.
+
+    **Parameters**: \n
+    * **results** - Dictionary from runBenchmarks.
+
+    **Returns**: \n
+    * **No Return.**\n
+    '''
+    print "Revision %s, Python %s" % (results["revision"], results["python"])
+    print "%-42s %12s %10s %10s %12s" % ("Benchmark", "packets/s", "us/packet", "net objs", "peak bytes")
+    for name in sorted(results["benchmarks"]):
+        result = results["benchmarks"][name]
+        peakBytes = "-" if result["peakBytesPerPacket"] == None else "%.0f" % result["peakBytesPerPacket"]
+        print "%-42s %12.0f %10.2f %10.2f %12s" % (name, result["packetsPerSecond"], result["usPerPacket"], result["netObjectsPerPacket"], peakBytes)
+
+def compareResults(baseline, results, tolerance):
+    '''
+    Prints the speedup of every benchmark against a baseline run.
+
+    **Parameters**: \n
+    * **baseline** - Dictionary loaded from an earlier --output file.
+    * **results** - Dictionary from runBenchmarks.
+    * **tolerance** - Fraction slower than the baseline that still counts as unchanged.
+
+    **Returns**: \n
+    * **regressions** - Names of the benchmarks that got slower than the tolerance allows.\n
+    '''
+    regressions = []
+    print "Compared with %s (Python %s)" % (baseline["revision"], baseline["python"])
+    print "%-42s %12s %12s %8s" % ("Benchmark", "before/s", "after/s", "speedup")
+    for name in sorted(results["benchmarks"]):
+        if name not in baseline["benchmarks"]:
+            print "%-42s %12s %12.0f %8s" % (name, "-", results["benchmarks"][name]["packetsPerSecond"], "new")
+            continue
+        before = baseline["benchmarks"][name]["packetsPerSecond"]
+        after = results["benchmarks"][name]["packetsPerSecond"]
+        speedup = after/before
+        flag = ""
+        if speedup < 1 - tolerance:
+            flag = " SLOWER"
+            regressions.append(name)
+        print "%-42s %12.0f %12.0f %7.2fx%s" % (name, before, after, speedup, flag)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark board protocol encoding and decoding.")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this")
+    parser.add_argument("--duration", type=float, default=0.2, help="Seconds per timing run")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per benchmark (best is kept)")
+    parser.add_argument("--output", default=None, help="Save the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="JSON file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Slowdown allowed before --compare fails")
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.filter, args.duration, args.repeat)
+    printResults(results)
+
+    if args.output != None:
+        with open(args.output, "w") as resultsFile:
+            json.dump(results, resultsFile, indent=2, sort_keys=True)
+
+    if args.compare != None:
+        with open(args.compare) as baselineFile:
+            baseline = json.load(baselineFile)
+        print
+        if compareResults(baseline, results, args.tolerance):
+            sys.exit(1)
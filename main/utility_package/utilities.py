@@ -14,11 +14,269 @@ import datetime
 import time
 import numpy
 import math
+import sys
+import ctypes
+import ctypes.util
 
             
+def findMonotonicTime():
+    '''
+    Picks the best clock that never jumps when the system time is changed: time.monotonic on Python 3, clock_gettime 
+    (CLOCK_MONOTONIC) on Linux, and time.clock (QueryPerformanceCounter) on Windows. Falls back to time.time.
+    
+    **Parameters**: \n
+    * **No Input Parameters.**
+    
+    **Returns**: \n
+    * **monotonicTime** - Function returning the time in seconds from an arbitrary starting point.\n
+    '''
+    if hasattr(time, "monotonic"):
+        return time.monotonic
+    
+    if sys.platform.startswith("linux"):
+        class Timespec(ctypes.Structure):
+            _fields_ = [("seconds", ctypes.c_long), ("nanoseconds", ctypes.c_long)]
+        
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("rt") or ctypes.util.find_library("c"), use_errno=True)
+            clockGettime = libc.clock_gettime
+        except (OSError, AttributeError):
+            clockGettime = None
+        
+        if clockGettime != None:
+            clockGettime.argtypes = [ctypes.c_int, ctypes.POINTER(Timespec)]
+            
+            def monotonicTime():
+                timespec = Timespec() #One per call, response threads read the clock too
+                if clockGettime(1, ctypes.byref(timespec)) != 0: #1 is CLOCK_MONOTONIC
+                    raise OSError(ctypes.get_errno(), "clock_gettime failed")
+                return timespec.seconds + timespec.nanoseconds*1e-9
+            return monotonicTime
+    
+    if sys.platform.startswith("win"):
+        return time.clock
+    
+    return time.time
+
+monotonicTime = findMonotonicTime()
+
+class MonotonicClock:
+    '''
+    The real clock: monotonicTime and time.sleep.
+    '''
+    def __init__(self):
+        '''
+        Initializes the clock.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.now = monotonicTime
+        self.sleep = time.sleep
+        
+    def sleepUntil(self, deadline, spinTime=0.0):
+        '''
+        Sleeps until just before *deadline*, then checks the clock until it passes.
+        
+        **Parameters**: \n
+        * **deadline** - now() to wait for.
+        * **spinTime** - The last part of the wait, in seconds, that is spent checking the clock instead of sleeping, because 
+          sleep can overshoot by about a millisecond.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        sleepTime = deadline - monotonicTime() - spinTime
+        if sleepTime > 0:
+            time.sleep(sleepTime)
+        while monotonicTime() < deadline:
+            pass
+
+monotonicClock = MonotonicClock() #Default clock of everything that takes one
+
+class SimulatedClock:
+    '''
+    Clock that only moves when told to, so a control loop can run faster than real time in a simulation and tests can 
+    step through time exactly. Sleeping moves it forward instead of waiting.
+    '''
+    def __init__(self, startTime=0.0):
+        '''
+        Initializes the clock.
+        
+        **Parameters**: \n
+        * **startTime** - Seconds the clock starts at.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.currentTime = startTime
+        
+    def now(self):
+        '''
+        The simulated time.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **currentTime** - Seconds.\n
+        '''
+        return self.currentTime
+    
+    def sleep(self, seconds):
+        '''
+        Moves the clock forward instead of waiting.
+        
+        **Parameters**: \n
+        * **seconds** - Seconds to move forward (ignored if negative).
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if seconds > 0:
+            self.currentTime += seconds
+    
+    advance = sleep
+    
+    def sleepUntil(self, deadline, spinTime=0.0):
+        '''
+        Moves the clock forward to *deadline* instead of waiting.
+        
+        **Parameters**: \n
+        * **deadline** - now() to move to.
+        * **spinTime** - Unused, a simulated clock never overshoots.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.currentTime = max(self.currentTime, deadline)
+
+class Deadline:
+    '''
+    Measures time from when it was started on a monotonic clock. Replaces Timer: *netTimer*, *cpuClockTimeInSeconds* and 
+    *restartTimer* behave like Timer's, so a call site can move over by only changing the constructor, and then to 
+    *elapsed*, *expired* and *every*.
+    '''
+    def __init__(self, clock=None):
+        '''
+        Starts the deadline.
+        
+        **Parameters**: \n
+        * **clock** - Object with now(), like SimulatedClock (defaults to monotonicClock).
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if clock == None:
+            clock = monotonicClock
+        self.clock = clock
+        self.startTime = clock.now()
+        self.nextDeadline = None #Next time every() fires
+        
+    def restart(self):
+        '''
+        Starts measuring from now again.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.startTime = self.clock.now()
+        self.nextDeadline = None
+        
+    def elapsed(self):
+        '''
+        Seconds since the deadline was started.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **elapsed** - Seconds.\n
+        '''
+        return self.clock.now() - self.startTime
+    
+    def expired(self, period):
+        '''
+        Whether *period* seconds have gone by since the deadline was started.
+        
+        **Parameters**: \n
+        * **period** - Seconds.
+        
+        **Returns**: \n
+        * **expired** - True if they have.\n
+        '''
+        return self.clock.now() - self.startTime >= period
+    
+    def every(self, period):
+        '''
+        True once every *period* seconds. The deadlines stay on a fixed grid from the start, so calling late doesn't make 
+        every later deadline late too, and a caller that fell more than a period behind gets one True instead of a burst.
+        
+        **Parameters**: \n
+        * **period** - Seconds.
+        
+        **Returns**: \n
+        * **due** - True if a deadline passed since the last True.\n
+        '''
+        currentTime = self.clock.now()
+        if self.nextDeadline == None:
+            self.nextDeadline = self.startTime + period
+        if currentTime < self.nextDeadline:
+            return False
+        
+        self.nextDeadline += period
+        if currentTime >= self.nextDeadline:
+            self.nextDeadline += ((currentTime - self.nextDeadline)//period + 1)*period
+        return True
+    
+    def cpuClockTimeInSeconds(self):
+        '''
+        The clock's time, for call sites written for Timer.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **currentTime** - Seconds.\n
+        '''
+        return self.clock.now()
+    
+    def netTimer(self, currentTime=None):
+        '''
+        Seconds since the deadline was started, for call sites written for Timer. There is no wrap around to correct for.
+        
+        **Parameters**: \n
+        * **currentTime** - The clock's time (defaults to now).
+        
+        **Returns**: \n
+        * **elapsed** - Seconds.\n
+        '''
+        if currentTime == None:
+            currentTime = self.clock.now()
+        return currentTime - self.startTime
+    
+    def restartTimer(self):
+        '''
+        Same as restart, for call sites written for Timer.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.restart()
+
 class Timer:
     '''
-    Provides useful timer information.
+    Provides useful timer information. Based on the system time, so it jumps when the time is changed; new code should use 
+    Deadline.
     '''
     def __init__(self):
         '''
@@ -122,6 +380,64 @@ class AdvancedMath:
         self.k = numpy.array([[0], [0], [0]])
         self.angle = 0
         
+        self.trigAngle = 0.0 #Last angle sinCos was asked for, in degrees
+        self.trigSin = 0.0
+        self.trigCos = 1.0
+        
+    def sinCos(self, angle):
+        '''
+        Sine and cosine of an angle. The last answer is kept, since every transform in a tick uses the same yaw.
+        
+        **Parameters**: \n
+        * **angle** - Degrees.
+        
+        **Returns**: \n
+        * **sin** - Sine of the angle.
+        * **cos** - Cosine of the angle.\n
+        '''
+        if angle != self.trigAngle:
+            radians = math.radians(angle)
+            self.trigAngle, self.trigSin, self.trigCos = angle, math.sin(radians), math.cos(radians)
+        return self.trigSin, self.trigCos
+    
+    def fillRot(self, R, k, angle):
+        '''
+        Writes a rotation into the top left 3x3 of an existing 3x3 or 4x4 matrix, using the closed form of the rodrigues 
+        formula instead of building skew matrices.
+        
+        **Parameters**: \n
+        * **R** - 3x3 or 4x4 float matrix that gets overwritten. The rest of a 4x4 is left alone.
+        * **k** - The unit vector to rotate about.
+        * **angle** - The angle in degrees.
+        
+        **Returns**: \n
+        * **R** - The same matrix.\n
+        '''
+        s, c = self.sinCos(angle)
+        t = 1 - c
+        x, y, z = float(k[0, 0]), float(k[1, 0]), float(k[2, 0])
+        R[0, 0], R[0, 1], R[0, 2] = c + t*x*x, t*x*y - s*z, t*x*z + s*y
+        R[1, 0], R[1, 1], R[1, 2] = t*x*y + s*z, c + t*y*y, t*y*z - s*x
+        R[2, 0], R[2, 1], R[2, 2] = t*x*z - s*y, t*y*z + s*x, c + t*z*z
+        return R
+    
+    def worldToBody(self, yaw, eastError, upError, northError):
+        '''
+        Turns a position error in NESW coordinates into the Sub's X (right), Y (up) and Z (front) coordinates. This is the 
+        translation part of inv(Rot(e2, yaw))*Trans(e1, east)*Trans(e2, up)*Trans(e3, north)*Rot(e2, yaw) without any matrices.
+        
+        **Parameters**: \n
+        * **yaw** - Current yaw in degrees.
+        * **eastError** - Position error in the East/West direction.
+        * **upError** - Position error in the Up/Down direction.
+        * **northError** - Position error in the North/South direction.
+        
+        **Returns**: \n
+        * **error** - [x, y, z] position error.\n
+        '''
+        s, c = self.sinCos(yaw)
+        return [c*eastError - s*northError, upError, s*eastError + c*northError]
+        
     def matrixMultiply(self, *matricies):
         '''
         Dot multiplies the given matrices.
@@ -171,10 +487,7 @@ class AdvancedMath:
         **Returns**: \n
         * **numpy.round(T, 8)** - Matrix indicating the angle.\n
         '''
-        I = numpy.eye(3, dtype=int)
-        R = I + numpy.dot(math.sin(math.radians(angle)), self.skew(k)) + (1-math.cos(math.radians(angle))) * numpy.dot(self.skew(k), self.skew(k))
-        R = numpy.append(R, [[0, 0, 0]], axis = 0)
-        R = numpy.append(R, [[0], [0], [0], [1]], axis = 1)
+        R = self.fillRot(numpy.eye(4), k, angle)
         
         return numpy.round(R, 8)
     
@@ -189,8 +502,7 @@ class AdvancedMath:
         **Returns**: \n
         * **numpy.round(T, 8)** - Matrix indicating the angle.\n
         '''
-        I = numpy.eye(3, dtype=int)
-        R = I + numpy.dot(math.sin(math.radians(angle)), self.skew(k)) + (1-math.cos(math.radians(angle))) * numpy.dot(self.skew(k), self.skew(k))
+        R = self.fillRot(numpy.empty((3, 3)), k, angle)
         
         return numpy.round(R, 8)
     
@@ -290,3 +602,193 @@ class AdvancedMath:
         m = numpy.linalg.inv(a)
         
         return m
+    
+class RingBuffer:
+    '''
+    Fixed size single producer/single consumer queue used to pass data packets from a response thread to the navigation process. 
+    The producer only ever moves the write index and the consumer only ever moves the read index, so no lock is needed. When the 
+    buffer is full it either overwrites the oldest item or drops the newest one, so a stalled consumer can't grow memory forever.
+    '''
+    def __init__(self, capacity=256, policy="overwrite"):
+        '''
+        Preallocates the buffer.
+        
+        **Parameters**: \n
+        * **capacity** - Maximum number of items held at once.
+        * **policy** - "overwrite" to overwrite the oldest item when full, or "drop" to throw away the newest item.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if policy not in ("overwrite", "drop"):
+            raise ValueError("RingBuffer policy must be 'overwrite' or 'drop', not %r" % (policy,))
+        
+        self.capacity = capacity
+        self.policy = policy
+        self.slots = [None]*capacity
+        
+        self.writeIndex = 0 #Total number of items ever appended (only changed by the producer)
+        self.fillingIndex = 0 #writeIndex + 1 while the producer is filling a slot, so the consumer knows that slot can't be trusted
+        self.readIndex = 0 #Total number of items ever consumed or skipped (only changed by the consumer)
+        
+        self.overwritten = 0 #Items the consumer never saw because the producer lapped it
+        self.dropped = 0 #Items the producer threw away because the buffer was full
+        
+    def append(self, item):
+        '''
+        Adds an item to the buffer. Only call from the producer thread.
+        
+        **Parameters**: \n
+        * **item** - Anything.
+        
+        **Returns**: \n
+        * **True or False** - False if the item was dropped because the buffer was full.\n
+        '''
+        if self.policy == "drop" and self.writeIndex - self.readIndex >= self.capacity:
+            self.dropped += 1
+            return False
+        
+        self.fillingIndex = self.writeIndex + 1
+        self.slots[self.writeIndex % self.capacity] = item
+        self.writeIndex += 1 #Publish the item only after the slot is filled
+        return True
+    
+    def drain(self, maxItems=None):
+        '''
+        Removes and returns every waiting item (oldest first) in one call. Only call from the consumer thread.
+        
+        **Parameters**: \n
+        * **maxItems** - Most items to return, or None for all of them.
+        
+        **Returns**: \n
+        * **items** - List of items, empty if nothing was waiting.\n
+        '''
+        writeIndex = self.writeIndex
+        readIndex = self.readIndex
+        if writeIndex - readIndex > self.capacity: #Producer lapped the consumer, the oldest items are gone
+            self.overwritten += writeIndex - self.capacity - readIndex
+            readIndex = writeIndex - self.capacity
+        if maxItems != None:
+            writeIndex = min(writeIndex, readIndex + maxItems)
+            
+        items = [self.slots[index % self.capacity] for index in xrange(readIndex, writeIndex)]
+        
+        if self.policy == "drop": #The producer never fills a slot that hasn't been drained
+            self.readIndex = writeIndex
+            return items
+        
+        lappedIndex = self.fillingIndex - self.capacity #Anything older than this was overwritten while copying, or is being overwritten now
+        if lappedIndex > readIndex:
+            self.overwritten += lappedIndex - readIndex #Including items lapped past the snapshot, which the read index skips
+            items = items[min(lappedIndex, writeIndex) - readIndex:]
+            
+        self.readIndex = max(writeIndex, lappedIndex)
+        return items
+    
+    def latest(self):
+        '''
+        Drains the buffer and returns only the newest item. Only call from the consumer thread.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **item** - Newest item, or None if nothing was waiting.\n
+        '''
+        items = self.drain()
+        if len(items) > 0:
+            return items[-1]
+        return None
+    
+    def __len__(self):
+        '''
+        Number of items waiting to be drained.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **length** - Number of items waiting.\n
+        '''
+        return min(self.writeIndex - self.readIndex, self.capacity)
+    
+class LatestValue:
+    '''
+    Mailbox that only holds the newest sample from a sensor along with when it arrived and a sequence number. The producer 
+    overwrites it and the consumer reads it in O(1), so a consumer that falls behind never has to work through a backlog of stale 
+    samples. The value, timestamp and sequence number are swapped in as one tuple so a reader never sees a torn sample.
+    '''
+    def __init__(self, value=None):
+        '''
+        Initializes the mailbox.
+        
+        **Parameters**: \n
+        * **value** - Value returned before the first sample is put in (sequence number 0).
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        self.sample = (value, None, 0) #(value, timestamp, sequence number)
+        
+    def put(self, value, timestamp=None):
+        '''
+        Overwrites the mailbox with a new sample. Only call from the producer thread.
+        
+        **Parameters**: \n
+        * **value** - The new sample.
+        * **timestamp** - When the sample arrived in seconds. Defaults to now.
+        
+        **Returns**: \n
+        * **No Return.**\n
+        '''
+        if timestamp == None:
+            timestamp = time.time()
+        self.sample = (value, timestamp, self.sample[2] + 1)
+        
+    def get(self):
+        '''
+        The newest value.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **value** - The newest value.\n
+        '''
+        return self.sample[0]
+    
+    def read(self):
+        '''
+        The newest value along with when it arrived and its sequence number.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **(value, timestamp, seq)** - The newest sample. Timestamp is None until the first sample is put in.\n
+        '''
+        return self.sample
+    
+    def seq(self):
+        '''
+        Sequence number of the newest sample. Goes up by one for every put.
+        
+        **Parameters**: \n
+        * **No Input Parameters.**
+        
+        **Returns**: \n
+        * **seq** - Sequence number.\n
+        '''
+        return self.sample[2]
+    
+    def changedSince(self, seq):
+        '''
+        Checks if a new sample has been put in since the given sequence number was read.
+        
+        **Parameters**: \n
+        * **seq** - Sequence number from an earlier read.
+        
+        **Returns**: \n
+        * **True or False** - True if there is a newer sample.\n
+        '''
+        return self.sample[2] != seq